@@ -1,17 +1,76 @@
-from .__version__ import __version__
-from .atom import generate as to_atom_string
-from .atom import parse_file as from_atom_file
-from .atom import parse_text as from_atom_text
-from .atom import parse_url as from_atom_url
-from .feed import Feed, FeedItem
-from .rdf import generate as to_rdf_string
-from .rdf import parse_file as from_rdf_file
-from .rdf import parse_text as from_rdf_text
-from .rdf import parse_url as from_rdf_url
-from .rss import generate as to_rss_string
-from .rss import parse_file as from_rss_file
-from .rss import parse_text as from_rss_text
-from .rss import parse_url as from_rss_url
+import importlib
+from typing import TYPE_CHECKING
+
+# Exports are imported at their first use, to keep `import feedendum` fast.
+_EXPORTS = {
+    "__version__": (".__version__", "__version__"),
+    "to_atom_string": (".atom", "generate"),
+    "to_atom_bytes": (".atom", "generate_bytes"),
+    "from_atom_file": (".atom", "parse_file"),
+    "from_atom_text": (".atom", "parse_text"),
+    "from_atom_url": (".atom", "parse_url"),
+    "to_atom_file": (".atom", "write_file"),
+    "Feed": (".feed", "Feed"),
+    "FeedItem": (".feed", "FeedItem"),
+    "generate_all": (".multi", "generate_all"),
+    "to_rdf_string": (".rdf", "generate"),
+    "to_rdf_bytes": (".rdf", "generate_bytes"),
+    "from_rdf_file": (".rdf", "parse_file"),
+    "from_rdf_text": (".rdf", "parse_text"),
+    "from_rdf_url": (".rdf", "parse_url"),
+    "to_rdf_file": (".rdf", "write_file"),
+    "to_rss_string": (".rss", "generate"),
+    "to_rss_bytes": (".rss", "generate_bytes"),
+    "from_rss_file": (".rss", "parse_file"),
+    "from_rss_text": (".rss", "parse_text"),
+    "from_rss_url": (".rss", "parse_url"),
+    "to_rss_file": (".rss", "write_file"),
+}
+
+if TYPE_CHECKING:
+    from .__version__ import __version__
+    from .atom import generate as to_atom_string
+    from .atom import generate_bytes as to_atom_bytes
+    from .atom import parse_file as from_atom_file
+    from .atom import parse_text as from_atom_text
+    from .atom import parse_url as from_atom_url
+    from .atom import write_file as to_atom_file
+    from .feed import Feed, FeedItem
+    from .multi import generate_all
+    from .rdf import generate as to_rdf_string
+    from .rdf import generate_bytes as to_rdf_bytes
+    from .rdf import parse_file as from_rdf_file
+    from .rdf import parse_text as from_rdf_text
+    from .rdf import parse_url as from_rdf_url
+    from .rdf import write_file as to_rdf_file
+    from .rss import generate as to_rss_string
+    from .rss import generate_bytes as to_rss_bytes
+    from .rss import parse_file as from_rss_file
+    from .rss import parse_text as from_rss_text
+    from .rss import parse_url as from_rss_url
+    from .rss import write_file as to_rss_file
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module, attr = _EXPORTS[name]
+        value = getattr(importlib.import_module(module, __name__), attr)
+    elif not name.startswith("_"):
+        try:
+            value = importlib.import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
+
 
 __all__ = [
     "rss",
@@ -27,8 +86,15 @@ __all__ = [
     "from_atom_url",
     "from_atom_text",
     "to_rss_string",
+    "to_rss_bytes",
+    "to_rss_file",
     "to_atom_string",
+    "to_atom_bytes",
+    "to_atom_file",
     "to_rdf_string",
+    "to_rdf_bytes",
+    "to_rdf_file",
+    "generate_all",
     "Feed",
     "FeedItem",
 ]
@@ -2,6 +2,6 @@ import importlib.metadata
 
 __version__ = "dev"
 try:
-    importlib.metadata.version("feedendum")
+    __version__ = importlib.metadata.version("feedendum")
 except importlib.metadata.PackageNotFoundError:
     pass
@@ -1,69 +1,128 @@
 """Module to handle Atom feeds."""
 
 from datetime import datetime as dt
+from typing import TYPE_CHECKING, overload
 
 import lxml.etree as ET
 
-from .exceptions import FeedParseError, FeedXMLError, RemoteFeedError
+from . import extensions, media
+from .compression import open_input, open_output
+from .exceptions import FeedParseError, FeedXMLError
 from .feed import Feed, FeedItem
+from .limits import Limits, parse_bytes, parse_stream
+from .remote import fetch_root
 from .utils import (
     NS,
-    add_content_element,
-    add_text_element,
+    PreparedFeed,
+    PreparedItem,
+    add_clean_content_element,
+    add_clean_element,
     dict_append_etree,
-    etree_to_dict,
+    element_data,
     get_attribute,
     get_text,
+    prepare_feed,
+    serialize,
     set_attribute,
+    write_tree,
 )
 
-try:
-    import requests
-except ModuleNotFoundError:
-    requests = None  # type: ignore
+if TYPE_CHECKING:
+    from .fetcher import Fetcher
+    from .fragments import FragmentCache
+    from .parsecache import ParseCache
 
 
-def parse_text(text: str) -> Feed:
+def parse_text(
+    text: str,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from an Atom string.
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an Atom feed.
     """
+    if cache is not None:
+        return cache.parse(text.encode("utf-8"), to_feed, compact_ns, limits)
+    if limits is not None:
+        return to_feed(parse_bytes(text.encode("utf-8"), limits), compact_ns)
     try:
         tree = ET.fromstring(text.encode("utf-8"))
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree)
+    return to_feed(tree, compact_ns)
 
 
-def parse_file(file) -> Feed:
+def parse_file(
+    file,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from an Atom file.
 
+    The file can be compressed with gzip, bz2 or xz.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an Atom feed."""
+    if cache is not None:
+        return cache.parse_file(file, to_feed, compact_ns, limits)
     try:
-        tree = ET.parse(file)
+        with open_input(file) as f:
+            root = ET.parse(f).getroot() if limits is None else parse_stream(f, limits)
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree.getroot())
+    return to_feed(root, compact_ns)
 
 
-def parse_url(url, **extra) -> Feed:
+def parse_url(
+    url,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+    fetcher: "Fetcher | None" = None,
+    **extra,
+) -> Feed:
     """Utility method to generate a :class:`.feed.Feed` from a Atom URL.
 
+    The body is parsed while it is downloaded, or after with a `cache`.
+
+    :param max_bytes: Maximum size of the body.
+    :param timeout: Maximum seconds for the whole download.
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :param fetcher: Download again only what changed since the last call with the same fetcher.
+    :param extra: Passed to `requests.get`.
     :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If one of `limits` is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an Atom feed."""
-    if not requests:
-        raise ModuleNotFoundError(
-            "No module named 'requests' found, please install it to use this feature"
+    if fetcher is not None:
+        return fetcher.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
         )
-    r = requests.get(url)
-    try:
-        r.raise_for_status()
-    except requests.HTTPError as e:
-        raise RemoteFeedError() from e
-    return parse_text(r.text)
+    if cache is not None:
+        return cache.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
+        )
+    root = fetch_root(url, max_bytes=max_bytes, timeout=timeout, limits=limits, **extra)
+    return to_feed(root, compact_ns)
 
 
 def __parse_iso_datetime(elem: ET.Element, name: str) -> dt | None:
@@ -78,9 +137,10 @@ def __parse_iso_datetime(elem: ET.Element, name: str) -> dt | None:
     return None
 
 
-def to_feed(root) -> Feed:
+def to_feed(root, compact_ns: bool = False) -> Feed:
     """Generate a :class:`.feed.Feed` from a root XML element of an Atom document.
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
     :raises FeedXMLError: If string is not a valid xml.
 
     :raises FeedParseError: If the xml is not an Atom feed.
@@ -99,57 +159,166 @@ def to_feed(root) -> Feed:
             link.getparent().remove(link)
             break
     for item in root.findall("atom:entry", NS):
-        fitem = FeedItem()
-        for link in item.findall("atom:link", NS):
-            rel = link.get("rel")
-            if not rel or rel == "alternate":
-                fitem.url = link.get("href")
-                link.getparent().remove(link)
-                break
-        fitem.title = get_text(item, "atom:title")
-        fitem.id = get_text(item, "atom:id")
-        fitem.content_type = get_attribute(item, "atom:content", "type")
-        fitem.content = get_text(item, "atom:content")
-        fitem.update = __parse_iso_datetime(item, "atom:updated") or __parse_iso_datetime(
-            item, "atom:published"
-        )
-        for link in item.findall("atom:category", NS):
-            term = link.get("term")
-            if term:
-                fitem.categories.append(term)
-                item.remove(link)
-        fitem._data = etree_to_dict(item)["{http://www.w3.org/2005/Atom}entry"] or {}
-        feed.items.append(fitem)
+        feed.items.append(to_item(item, compact_ns))
         root.remove(item)
-    feed._data = etree_to_dict(root)["{http://www.w3.org/2005/Atom}feed"] or {}
+    feed._data = element_data(root, compact_ns) or {}
     return feed
 
 
-def generate(feed) -> str:
-    """Returns a string Atom rappresentation of a feed."""
+def to_item(item: ET.Element, compact_ns: bool = False) -> FeedItem:
+    """Generate a :class:`.feed.FeedItem` from an Atom entry element, consuming its children.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+
+    :meta private:"""
+    fitem = FeedItem()
+    for link in item.findall("atom:link", NS):
+        rel = link.get("rel")
+        if not rel or rel == "alternate":
+            fitem.url = link.get("href")
+            link.getparent().remove(link)
+            break
+    fitem.title = get_text(item, "atom:title")
+    fitem.id = get_text(item, "atom:id")
+    fitem.content_type = get_attribute(item, "atom:content", "type")
+    fitem.content = get_text(item, "atom:content")
+    fitem.update = __parse_iso_datetime(item, "atom:updated") or __parse_iso_datetime(
+        item, "atom:published"
+    )
+    for link in item.findall("atom:category", NS):
+        term = link.get("term")
+        if term:
+            fitem.categories.append(term)
+            item.remove(link)
+    media.extract(item, fitem, atom=True)
+    extensions.REGISTRY.extract(item, fitem)
+    fitem._data = element_data(item, compact_ns) or {}
+    return fitem
+
+
+def build_channel(prepared: PreparedFeed) -> tuple[ET.Element, ET.Element]:
+    """Build the Atom root element, without entries.
+    The root is also the container of the entries.
+
+    :meta private:"""
     nsmap = {None: NS["atom"]}
     ns = f"{{{NS['atom']}}}"
     root = ET.Element(f"{ns}feed", nsmap=nsmap)
-    add_text_element(root, f"{ns}title", feed.title)
-    add_text_element(root, f"{ns}subtitle", feed.description)
-    add_text_element(root, f"{ns}updated", feed.update, lambda x: dt.isoformat(x))
-    if feed.url:
+    add_clean_element(root, f"{ns}title", prepared.title)
+    add_clean_element(root, f"{ns}subtitle", prepared.description)
+    add_clean_element(root, f"{ns}updated", prepared.iso)
+    if prepared.url:
         elink = ET.SubElement(root, f"{ns}link")
-        elink.set("href", feed.url)
-    dict_append_etree(feed._data, root)
-    for fitem in feed.items:
-        entry = ET.SubElement(root, f"{ns}entry")
-        add_text_element(entry, f"{ns}title", fitem.title)
-        add_text_element(entry, f"{ns}id", fitem.id)
-        add_text_element(entry, f"{ns}updated", fitem.update, lambda x: dt.isoformat(x))
-        if fitem.url:
-            elink = ET.SubElement(entry, f"{ns}link")
-            elink.set("href", fitem.url)
-        elem = add_content_element(entry, f"{ns}content", fitem.content)
-        set_attribute(elem, "type", fitem.content_type)
-        for fcategory in fitem.categories:
-            elink = ET.SubElement(entry, f"{ns}category")
-            elink.set("term", fcategory)
-        dict_append_etree(fitem._data, entry)
+        elink.set("href", prepared.url)
+    dict_append_etree(prepared.data, root)
+    return root, root
+
+
+def add_item(root: ET.Element, pitem: PreparedItem) -> ET.Element:
+    """Append to `root` the Atom entry of a prepared item.
+
+    :meta private:"""
+    ns = f"{{{NS['atom']}}}"
+    entry = ET.SubElement(root, f"{ns}entry")
+    add_clean_element(entry, f"{ns}title", pitem.title)
+    add_clean_element(entry, f"{ns}id", pitem.id)
+    add_clean_element(entry, f"{ns}updated", pitem.iso)
+    if pitem.url:
+        elink = ET.SubElement(entry, f"{ns}link")
+        elink.set("href", pitem.url)
+    elem = add_clean_content_element(entry, f"{ns}content", pitem.content, pitem.content_cdata)
+    set_attribute(elem, "type", pitem.content_type)
+    for fcategory in pitem.categories:
+        elink = ET.SubElement(entry, f"{ns}category")
+        elink.set("term", fcategory)
+    media.append(entry, pitem.source, atom=True)
+    extensions.REGISTRY.append(entry, pitem.source)
+    dict_append_etree(pitem.data, entry)
+    return entry
+
+
+def build_tree(prepared: PreparedFeed) -> ET.Element:
+    """Build the Atom root element of a prepared feed.
+
+    :meta private:"""
+    root, container = build_channel(prepared)
+    for pitem in prepared.items:
+        add_item(container, pitem)
     ET.cleanup_namespaces(root)
-    return ET.tostring(root, encoding="UTF-8", xml_declaration=True).decode("utf-8")
+    return root
+
+
+def generate_bytes(
+    feed,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> bytes:
+    """Returns the UTF-8 encoded Atom rappresentation of a feed.
+
+    :param cache: If not `None`, reuse the items serialized in previous calls.
+    :param pretty_print: Indent the document, not supported with `cache`.
+    :param with_data: Write also the not managed attributes, in `_data`.
+    :raises ValueError: If both `cache` and `pretty_print` are used."""
+    if cache is not None:
+        if pretty_print:
+            raise ValueError("pretty_print is not supported with a cache")
+        return cache.generate(feed, "atom", build_channel, add_item, with_data)
+    return serialize(build_tree(prepare_feed(feed, with_data=with_data)), pretty_print)
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    file: None = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> str: ...
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    *,
+    file,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None: ...
+
+
+def generate(feed, cache=None, file=None, pretty_print=False, with_data=True):
+    """Returns a string Atom rappresentation of a feed.
+
+    See :func:`generate_bytes` for the parameters.
+
+    :param file: Write the encoded document to `file` instead, see :func:`write_file`."""
+    if file is not None:
+        write_file(feed, file, cache=cache, pretty_print=pretty_print, with_data=with_data)
+        return None
+    return generate_bytes(feed, cache, pretty_print, with_data).decode("utf-8")
+
+
+def write_file(
+    feed,
+    file,
+    compression: str | None = None,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None:
+    """Write the Atom rappresentation of a feed to `file` (a path or a binary file object).
+
+    See :func:`generate_bytes` for the other parameters.
+
+    :param compression: `gzip`, `bz2`, `xz` or `None`.
+        If `file` is a path, by default it is guessed from its suffix."""
+    if cache is not None:
+        data = generate_bytes(feed, cache, pretty_print, with_data)
+        with open_output(file, compression) as f:
+            f.write(data)
+        return
+    root = build_tree(prepare_feed(feed, with_data=with_data))
+    with open_output(file, compression) as f:
+        write_tree(root, f, pretty_print)
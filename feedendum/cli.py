@@ -0,0 +1,359 @@
+"""Command line tool to convert, validate, merge and inspect many feed files at once,
+and to measure the download of feeds."""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import multi
+from .compression import SUFFIXES
+from .feed import Feed
+
+_OUTPUT_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def expand(patterns: Iterable[str], stdin=None) -> list[str]:
+    """Returns the files matching `patterns`, in order and without repetitions.
+
+    A pattern `-` (or no pattern) reads one pattern per line from `stdin`.
+
+    :meta private:"""
+    patterns = list(patterns) or ["-"]
+    result: dict[str, None] = {}
+    for pattern in patterns:
+        if pattern == "-":
+            lines = (line.strip() for line in (stdin or sys.stdin))
+            for path in expand((line for line in lines if line and line != "-"), stdin):
+                result[path] = None
+            continue
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else []
+        for path in matches or [pattern]:
+            result[path] = None
+    return list(result)
+
+
+def output_path(path: str, fmt: str, output_dir: str | None, compression: str | None) -> str:
+    """Returns the path of the conversion of `path` to `fmt`.
+
+    :meta private:"""
+    target = Path(path)
+    if target.suffix.lower() in SUFFIXES:
+        target = target.with_suffix("")
+    target = target.with_suffix(f".{fmt}")
+    if compression:
+        target = target.with_name(target.name + _OUTPUT_SUFFIXES[compression])
+    if output_dir is not None:
+        target = Path(output_dir) / target.name
+    return str(target)
+
+
+def output_collisions(
+    paths: list[str], fmt: str, output_dir: str | None, compression: str | None
+) -> dict[str, Exception]:
+    """Returns the errors of the paths that would be converted to the same output file.
+
+    :meta private:"""
+    sources: dict[str, list[str]] = {}
+    for path in paths:
+        target = os.path.abspath(output_path(path, fmt, output_dir, compression))
+        sources.setdefault(target, []).append(path)
+    errors: dict[str, Exception] = {}
+    for target, same in sources.items():
+        if len(same) > 1:
+            for path in same:
+                errors[path] = FileExistsError(
+                    f"Output '{target}' would be written by {', '.join(same)}"
+                )
+    return errors
+
+
+def _read(path: str) -> tuple[str, Feed]:
+    root = multi.parse_root(path)
+    fmt = multi.detect_format(root)
+    return fmt, multi.FORMATS[fmt].to_feed(root)
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def convert_one(path: str, fmt: str, output_dir: str | None, compression: str | None) -> str:
+    """Worker of the `convert` command.
+
+    :meta private:"""
+    target = output_path(path, fmt, output_dir, compression)
+    if os.path.abspath(target) == os.path.abspath(path):
+        raise OSError(f"Output would overwrite the input '{path}'")
+    _, feed = _read(path)
+    multi.FORMATS[fmt].write_file(feed, target, compression)
+    return f"{path}\t{target}\t{len(feed.items)}"
+
+
+def validate_one(path: str) -> str:
+    """Worker of the `validate` command.
+
+    :meta private:"""
+    fmt, feed = _read(path)
+    return f"{path}\t{fmt}\t{len(feed.items)}"
+
+
+def stats_one(path: str) -> str:
+    """Worker of the `stats` command.
+
+    :meta private:"""
+    fmt, feed = _read(path)
+    updates = [fitem.update for fitem in feed.items if fitem.update]
+    try:
+        newest = max(updates).isoformat() if updates else ""
+    except TypeError:  # naive and aware dates
+        newest = ""
+    categories = {c for fitem in feed.items for c in fitem.categories}
+    return (
+        f"{path}\t{fmt}\t{_size(path)}\t{len(feed.items)}\t{len(updates)}"
+        f"\t{len(categories)}\t{newest}"
+    )
+
+
+def load_one(path: str) -> Feed:
+    """Worker of the `merge` command.
+
+    :meta private:"""
+    return _read(path)[1]
+
+
+def run(func: Callable, paths: list[str], jobs: int, *args) -> Iterator[tuple[str, object]]:
+    """Call `func(path, *args)` for every path in a pool of `jobs` processes.
+
+    Yields `(path, result)` as soon as every call completes,
+    the result is the exception for failed calls: a failure never stops the other files.
+
+    :meta private:"""
+    if jobs <= 1:
+        for path in paths:
+            try:
+                yield path, func(path, *args)
+            except Exception as e:
+                yield path, e
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(func, path, *args): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+class _Report:
+    def __init__(self, paths: list[str], quiet: bool):
+        self.quiet = quiet
+        self.total = len(paths)
+        self.size = sum(_size(path) for path in paths)
+        self.failed = 0
+        self.start = time.perf_counter()
+
+    def error(self, path: str, error: BaseException) -> None:
+        self.failed += 1
+        print(f"{path}: {type(error).__name__}: {error}", file=sys.stderr, flush=True)
+
+    def close(self) -> int:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        if not self.quiet:
+            print(
+                f"{self.total} files, {self.failed} failed in {elapsed:.2f}s "
+                f"({self.total / elapsed:.1f} files/s, {self.size / elapsed / 1e6:.2f} MB/s)",
+                file=sys.stderr,
+            )
+        return 1 if self.failed else 0
+
+
+def _stream(args, func: Callable, *extra) -> int:
+    paths = expand(args.files)
+    report = _Report(paths, args.quiet)
+    if func is stats_one:
+        print("file\tformat\tbytes\titems\tdated\tcategories\tnewest", flush=True)
+    errors = output_collisions(paths, *extra) if func is convert_one else {}
+    for path, error in errors.items():
+        report.error(path, error)
+    paths = [path for path in paths if path not in errors]
+    for path, result in run(func, paths, args.jobs, *extra):
+        if isinstance(result, BaseException):
+            report.error(path, result)
+        else:
+            print(result, flush=True)
+    return report.close()
+
+
+def _utc(date: datetime) -> datetime:
+    """Returns `date`, in UTC if naive, to compare dates of different files."""
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+
+
+def _merge(args) -> int:
+    paths = expand(args.files)
+    report = _Report(paths, args.quiet)
+    loaded: dict[str, Feed] = {}
+    for path, result in run(load_one, paths, args.jobs):
+        if isinstance(result, Feed):
+            loaded[path] = result
+        else:
+            report.error(path, result)  # type: ignore[arg-type]
+    feeds = [loaded[path] for path in paths if path in loaded]
+    merged = Feed(
+        title=args.title or (feeds[0].title if feeds else None),
+        url=args.url or (feeds[0].url if feeds else None),
+        description=args.description,
+        items=[fitem for feed in feeds for fitem in feed.items],
+    )
+    merged.unique_items_by_url()
+    merged.sort_items(key=lambda fitem: fitem.update and _utc(fitem.update))
+    merged.update = max((i.update for i in merged.items if i.update), key=_utc, default=None)
+    module = multi.FORMATS[args.to]
+    if args.output == "-":
+        sys.stdout.write(module.generate(merged))
+        sys.stdout.write("\n")
+    else:
+        module.write_file(merged, args.output)
+    return report.close()
+
+
+def _items(value: str) -> tuple[int, int]:
+    low, _, high = value.partition(":")
+    try:
+        return int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of items '{value}'") from None
+
+
+def _loadtest(args) -> int:
+    from .loadtest import Profile, run
+
+    profile = Profile(
+        feeds=args.feeds,
+        formats=tuple(args.formats.split(",")),
+        items=args.items,
+        content_size=args.content_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        etag=not args.no_etag,
+        delta=not args.no_delta,
+        change_rate=args.change_rate,
+        error_rate=args.error_rate,
+        drip=args.drip,
+        drip_size=args.drip_size,
+        seed=args.seed,
+    )
+    for report in run(
+        profile, args.mode, args.rounds, args.workers, args.timeout, args.url, args.memory
+    ):
+        print(report, flush=True)
+    return 0
+
+
+class _VersionAction(argparse.Action):
+    """Print the version, reading the package metadata only when asked."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from .__version__ import __version__
+
+        parser.exit(message=f"{__version__}\n")
+
+
+def parser() -> argparse.ArgumentParser:
+    """Returns the parser of the command line arguments.
+
+    :meta private:"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "files", nargs="*", help="files or glob patterns, '-' or nothing to read them from stdin"
+    )
+    common.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of worker processes"
+    )
+    common.add_argument("-q", "--quiet", action="store_true", help="do not print the summary")
+    formats = sorted(multi.FORMATS)
+
+    result = argparse.ArgumentParser(prog="feedendum", description=__doc__)
+    result.add_argument(
+        "--version", action=_VersionAction, nargs=0, help="show the version and exit"
+    )
+    commands = result.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser(
+        "convert", parents=[common], help="convert files to another format"
+    )
+    convert.add_argument("-t", "--to", choices=formats, required=True, help="output format")
+    convert.add_argument("-o", "--output-dir", help="directory of the output files")
+    convert.add_argument(
+        "-c", "--compression", choices=sorted(_OUTPUT_SUFFIXES), help="compress the output files"
+    )
+    commands.add_parser("validate", parents=[common], help="check that files are valid feeds")
+    commands.add_parser("stats", parents=[common], help="print a summary of every file")
+    merge = commands.add_parser(
+        "merge", parents=[common], help="merge the items of files, naive dates are in UTC"
+    )
+    merge.add_argument("-t", "--to", choices=formats, default="atom", help="output format")
+    merge.add_argument("-o", "--output", default="-", help="output file, '-' for stdout")
+    merge.add_argument("--title", help="title of the merged feed")
+    merge.add_argument("--url", help="url of the merged feed")
+    merge.add_argument("--description", help="description of the merged feed")
+    load = commands.add_parser(
+        "loadtest", help="measure downloads and parsing against a local server of synthetic feeds"
+    )
+    load.add_argument("--feeds", type=int, default=1000, help="number of feeds")
+    load.add_argument(
+        "--formats", default="rss,atom,rdf", help="comma separated formats of the feeds"
+    )
+    load.add_argument("--items", type=_items, default=(10, 100), help="items of a feed, as MIN:MAX")
+    load.add_argument(
+        "--content-size", type=int, default=1000, help="characters of the item contents"
+    )
+    load.add_argument("--latency", type=float, default=0.0, help="seconds before a response")
+    load.add_argument("--jitter", type=float, default=0.0, help="random seconds +/- latency")
+    load.add_argument("--no-etag", action="store_true", help="do not answer 304 Not Modified")
+    load.add_argument("--no-delta", action="store_true", help="do not answer 226 IM Used")
+    load.add_argument(
+        "--change-rate", type=float, default=0.0, help="probability of a new item per request"
+    )
+    load.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 responses")
+    load.add_argument(
+        "--drip", type=float, default=0.0, help="seconds between the chunks of a body"
+    )
+    load.add_argument("--drip-size", type=int, default=4096, help="bytes of a chunk of a body")
+    load.add_argument("--seed", type=int, default=0, help="seed of the random choices")
+    load.add_argument(
+        "--mode", choices=["parse_url", "fetcher"], default="parse_url", help="fetch API to drive"
+    )
+    load.add_argument("--rounds", type=int, default=1, help="downloads of every feed")
+    load.add_argument("--workers", type=int, default=16, help="concurrent downloads")
+    load.add_argument("--timeout", type=float, default=30, help="seconds of a download")
+    load.add_argument("--url", help="base URL of a synthetic server already running")
+    load.add_argument(
+        "--memory", action="store_true", help="measure the memory of the feeds, slower"
+    )
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the `feedendum` command.
+
+    Results are printed as soon as every file is done, failures go to standard error.
+    Returns 1 if any file failed."""
+    args = parser().parse_args(argv)
+    if args.command == "convert":
+        return _stream(args, convert_one, args.to, args.output_dir, args.compression)
+    if args.command == "validate":
+        return _stream(args, validate_one)
+    if args.command == "stats":
+        return _stream(args, stats_one)
+    if args.command == "loadtest":
+        return _loadtest(args)
+    return _merge(args)
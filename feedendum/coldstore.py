@@ -0,0 +1,208 @@
+"""Module to keep the rarely read texts of items compressed in memory."""
+
+import lzma
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from .feed import Feed, FeedItem
+
+_CODECS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class Compressed:
+    """A compressed text, decompressed by `str()` and compared as its text.
+
+    :meta private:"""
+
+    __slots__ = ("data", "codec", "store", "hot")
+
+    def __init__(self, data: bytes, codec: str, store: "ColdStore | None" = None):
+        self.data = data
+        self.codec = codec
+        self.store = store
+        self.hot: str | None = None
+
+    def decompress(self) -> str:
+        return _CODECS[self.codec][1](self.data).decode("utf-8")
+
+    def __str__(self) -> str:
+        hot = self.hot
+        if hot is not None:
+            store = self.store
+            if store is not None:
+                store._touch(self)
+            return hot
+        if self.store is not None:
+            return self.store._load(self)
+        return self.decompress()
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Compressed):
+            return str(self) == str(other)
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __reduce__(self):
+        # the store (and its lock) is not pickled
+        return (Compressed, (self.data, self.codec))
+
+
+class CompressedData(dict):
+    """The `_data` of an item with some texts compressed,
+    decompressed when read by key, by `get`, `items` and `values`.
+
+    :meta private:"""
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        return str(value) if type(value) is Compressed else value
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        return str(value) if type(value) is Compressed else value
+
+    def items(self):  # type: ignore[override]
+        return [(k, str(v) if type(v) is Compressed else v) for k, v in super().items()]
+
+    def values(self):  # type: ignore[override]
+        return [str(v) if type(v) is Compressed else v for v in super().values()]
+
+    def __reduce__(self):
+        return (CompressedData, (dict(super().items()),))
+
+
+class ColdStore:
+    """Keep the long `content` of items, and optionally the long texts of their `_data`,
+    compressed in memory.
+
+    The fields are still read as strings: they are decompressed at every access,
+    except the `hot_size` most recently read, kept decompressed in a LRU.
+    Texts assigned after :meth:`compress` are kept as they are.
+
+    :param codec: `zlib` or `lzma`.
+    :param level: Compression level, or preset of `lzma`, by default the one of the codec.
+    :param min_size: Shortest text, in characters, to compress.
+    :param hot_size: Number of texts kept decompressed.
+    :param data: Compress also the top level texts of `_data`.
+    :raises ValueError: If the codec is not supported.
+    """
+
+    def __init__(
+        self,
+        codec: str = "zlib",
+        level: int | None = None,
+        min_size: int = 512,
+        hot_size: int = 64,
+        data: bool = False,
+    ):
+        if codec not in _CODECS:
+            raise ValueError(f"Unsupported codec '{codec}'")
+        self.codec = codec
+        self.level = level
+        self.min_size = min_size
+        self.hot_size = hot_size
+        self.data = data
+        self.hits = 0
+        """Number of reads of a text kept decompressed."""
+        self.misses = 0
+        """Number of decompressions."""
+        self.raw_bytes = 0
+        """UTF-8 size of the texts compressed."""
+        self.compressed_bytes = 0
+        """Size of the texts compressed, after compression."""
+        self._hot: OrderedDict[int, Compressed] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compress(self, text: str) -> str | Compressed:
+        raw = text.encode("utf-8")
+        compress = _CODECS[self.codec][0]
+        if self.level is None:
+            data = compress(raw)
+        elif self.codec == "lzma":
+            data = lzma.compress(raw, preset=self.level)
+        else:
+            data = zlib.compress(raw, self.level)
+        if len(data) >= len(raw):
+            return text
+        with self._lock:
+            self.raw_bytes += len(raw)
+            self.compressed_bytes += len(data)
+        return Compressed(data, self.codec, self)
+
+    def _touch(self, value: Compressed) -> None:
+        with self._lock:
+            self.hits += 1
+            if id(value) in self._hot:
+                self._hot.move_to_end(id(value))
+
+    def _load(self, value: Compressed) -> str:
+        text = value.decompress()
+        with self._lock:
+            self.misses += 1
+            if self.hot_size <= 0:
+                return text
+            value.hot = text
+            self._hot[id(value)] = value
+            while len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)[1].hot = None
+        return text
+
+    def compress_item(self, fitem: FeedItem) -> int:
+        """Compress the long texts of `fitem`, returns how many."""
+        count = 0
+        content = fitem.__dict__.get("content")
+        if type(content) is str and len(content) >= self.min_size:
+            value = self._compress(content)
+            if value is not content:
+                fitem.__dict__["content"] = value
+                count += 1
+        if self.data and fitem._data:
+            data = CompressedData(dict.items(fitem._data))
+            compressed = 0
+            for key, text in dict.items(data):
+                if type(text) is str and len(text) >= self.min_size:
+                    value = self._compress(text)
+                    if value is not text:
+                        dict.__setitem__(data, key, value)
+                        compressed += 1
+            if compressed:
+                fitem._data = data
+                count += compressed
+        return count
+
+    def compress(self, feed: Feed | Iterable[FeedItem]) -> int:
+        """Compress the long texts of the items of `feed`, returns how many."""
+        items: Iterable[FeedItem] = feed.items if isinstance(feed, Feed) else feed
+        return sum(self.compress_item(fitem) for fitem in items)
+
+    def decompress(self, feed: Feed | Iterable[FeedItem]) -> None:
+        """Store again as plain strings the texts of the items of `feed`."""
+        items: Iterable[FeedItem] = feed.items if isinstance(feed, Feed) else feed
+        for fitem in items:
+            fitem.content = fitem.content
+            if type(fitem._data) is CompressedData:
+                fitem._data = dict(fitem._data.items())
+
+    def clear(self) -> None:
+        """Drop the decompressed texts, statistics are kept."""
+        with self._lock:
+            for value in self._hot.values():
+                value.hot = None
+            self._hot.clear()
+
+    @property
+    def ratio(self) -> float:
+        """Size after compression over size before, of all the texts compressed."""
+        return self.compressed_bytes / self.raw_bytes if self.raw_bytes else 1.0
@@ -0,0 +1,209 @@
+"""Module to export feed items as columns, for bulk analysis with NumPy."""
+
+import dataclasses
+import datetime
+from collections.abc import Iterable
+
+from .feed import Feed, FeedItem
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None  # type: ignore
+
+
+def _check_numpy() -> None:
+    if not np:
+        raise ModuleNotFoundError(
+            "No module named 'numpy' found, please install it to use this feature"
+        )
+
+
+@dataclasses.dataclass(kw_only=True)
+class StringColumn:
+    """Strings stored as one UTF-8 buffer and the offsets of every value.
+
+    The value `i` is ``data[offsets[i]:offsets[i + 1]]``, `None` where `valid` is false."""
+
+    offsets: "np.ndarray"
+    """Start of every value in `data`, plus the end of the last one (`int64`)."""
+    data: "np.ndarray"
+    """The UTF-8 encoded values (`uint8`)."""
+    valid: "np.ndarray"
+    """False for `None` values (`bool`)."""
+
+    @classmethod
+    def from_list(cls, values: list[str | None]) -> "StringColumn":
+        encoded = [v.encode("utf-8") if v is not None else b"" for v in values]
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(
+            offsets=offsets,
+            data=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            valid=np.array([v is not None for v in values], dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, i: int) -> str | None:
+        if not self.valid[i]:
+            return None
+        return self.data[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def lengths(self) -> "np.ndarray":
+        """Size in bytes of every value."""
+        return np.diff(self.offsets)
+
+    def to_list(self) -> list[str | None]:
+        return [self[i] for i in range(len(self))]
+
+
+@dataclasses.dataclass(kw_only=True)
+class CategoryColumn:
+    """Lists of strings, dictionary encoded.
+
+    The categories of the item `i` are ``dictionary[codes[offsets[i]:offsets[i + 1]]]``."""
+
+    dictionary: list[str]
+    """Every distinct category."""
+    codes: "np.ndarray"
+    """Indexes in `dictionary` (`int32`)."""
+    offsets: "np.ndarray"
+    """Start of the codes of every item, plus the end of the last one (`int64`)."""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> list[str]:
+        return [self.dictionary[c] for c in self.codes[self.offsets[i] : self.offsets[i + 1]]]
+
+    def item_index(self) -> "np.ndarray":
+        """The item of every code."""
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    def counts(self) -> "np.ndarray":
+        """How many items have every category of `dictionary`."""
+        return np.bincount(self.codes, minlength=len(self.dictionary))
+
+
+@dataclasses.dataclass(kw_only=True)
+class Columns:
+    """Items of many feeds, as columns. Feed level values are in the `feed_*` columns."""
+
+    feed: "np.ndarray"
+    """Index of the feed of every item (`int32`)."""
+    title: StringColumn
+    url: StringColumn
+    id: StringColumn
+    content: StringColumn
+    content_type: StringColumn
+    update: "np.ndarray"
+    """Update of every item in UTC (`datetime64[us]`), `NaT` if missing."""
+    update_aware: "np.ndarray"
+    """True if the update of the item had a timezone (`bool`)."""
+    categories: CategoryColumn
+    feed_title: StringColumn
+    feed_url: StringColumn
+    feed_description: StringColumn
+    feed_update: "np.ndarray"
+    """Update of every feed in UTC (`datetime64[us]`), `NaT` if missing."""
+    feed_update_aware: "np.ndarray"
+    """True if the update of the feed had a timezone (`bool`)."""
+
+    def __len__(self) -> int:
+        return len(self.feed)
+
+
+def _to_datetime64(values: list[datetime.datetime | None]) -> tuple["np.ndarray", "np.ndarray"]:
+    aware = np.array([v is not None and v.tzinfo is not None for v in values], dtype=bool)
+    utc = [
+        None
+        if v is None
+        else v.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        if v.tzinfo is not None
+        else v
+        for v in values
+    ]
+    return np.array(utc, dtype="datetime64[us]"), aware
+
+
+def _from_datetime64(value, aware: bool) -> datetime.datetime | None:
+    if np.isnat(value):
+        return None
+    result = value.astype("datetime64[us]").item()
+    if aware:
+        result = result.replace(tzinfo=datetime.timezone.utc)
+    return result
+
+
+def to_columns(feeds: Iterable[Feed]) -> Columns:
+    """Returns the items of `feeds` as :class:`Columns`.
+
+    `_data` and the media fields are not exported.
+
+    :raises ModuleNotFoundError: If `numpy` is not available."""
+    _check_numpy()
+    feeds = list(feeds)
+    items = [(n, fitem) for n, feed in enumerate(feeds) for fitem in feed.items]
+    dictionary: dict[str, int] = {}
+    codes: list[int] = []
+    category_offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    for i, (_, fitem) in enumerate(items):
+        for category in fitem.categories:
+            codes.append(dictionary.setdefault(category, len(dictionary)))
+        category_offsets[i + 1] = len(codes)
+    update, update_aware = _to_datetime64([fitem.update for _, fitem in items])
+    feed_update, feed_update_aware = _to_datetime64([feed.update for feed in feeds])
+    return Columns(
+        feed=np.array([n for n, _ in items], dtype=np.int32),
+        title=StringColumn.from_list([fitem.title for _, fitem in items]),
+        url=StringColumn.from_list([fitem.url for _, fitem in items]),
+        id=StringColumn.from_list([fitem.id for _, fitem in items]),
+        content=StringColumn.from_list([fitem.content for _, fitem in items]),
+        content_type=StringColumn.from_list([fitem.content_type for _, fitem in items]),
+        update=update,
+        update_aware=update_aware,
+        categories=CategoryColumn(
+            dictionary=list(dictionary),
+            codes=np.array(codes, dtype=np.int32),
+            offsets=category_offsets,
+        ),
+        feed_title=StringColumn.from_list([feed.title for feed in feeds]),
+        feed_url=StringColumn.from_list([feed.url for feed in feeds]),
+        feed_description=StringColumn.from_list([feed.description for feed in feeds]),
+        feed_update=feed_update,
+        feed_update_aware=feed_update_aware,
+    )
+
+
+def from_columns(columns: Columns, mask: "np.ndarray | None" = None) -> list[Feed]:
+    """Returns the feeds of `columns`, with only the items selected by the boolean `mask`.
+
+    Every feed is returned, even if none of its items is selected.
+
+    :raises ModuleNotFoundError: If `numpy` is not available."""
+    _check_numpy()
+    feeds = [
+        Feed(
+            title=columns.feed_title[n],
+            url=columns.feed_url[n],
+            description=columns.feed_description[n],
+            update=_from_datetime64(columns.feed_update[n], columns.feed_update_aware[n]),
+        )
+        for n in range(len(columns.feed_title))
+    ]
+    indexes = np.arange(len(columns)) if mask is None else np.flatnonzero(mask)
+    for i in indexes.tolist():
+        feeds[columns.feed[i]].items.append(
+            FeedItem(
+                title=columns.title[i],
+                url=columns.url[i],
+                id=columns.id[i],
+                content=columns.content[i],
+                content_type=columns.content_type[i],
+                update=_from_datetime64(columns.update[i], columns.update_aware[i]),
+                categories=columns.categories[i],
+            )
+        )
+    return feeds
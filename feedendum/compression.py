@@ -0,0 +1,152 @@
+"""Module to read and write compressed feed files."""
+
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import os
+import zlib
+from collections.abc import Iterator
+from typing import IO
+
+from .exceptions import FeedXMLError
+
+MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+}
+"""Magic bytes of the supported compression formats."""
+
+SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".bz2": "bz2", ".xz": "xz"}
+"""File name suffixes of the supported compression formats."""
+
+_MAGIC_LEN = max(len(m) for m in MAGIC)
+_ERRORS = (EOFError, OSError, lzma.LZMAError, zlib.error)
+
+
+def detect(head: bytes) -> str | None:
+    """Returns the compression format of a file starting with `head`,
+    `None` if not compressed."""
+    for magic, compression in MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _codec(fileobj, compression: str | None, mode: str = "rb"):
+    if compression is None:
+        return fileobj
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode=mode)
+    if compression == "bz2":
+        return bz2.BZ2File(fileobj, mode=mode)  # type: ignore[call-overload]
+    if compression == "xz":
+        return lzma.LZMAFile(fileobj, mode=mode)
+    raise ValueError(f"Unsupported compression '{compression}'")
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Give back the bytes already read from a not seekable stream."""
+
+    def __init__(self, head: bytes, fileobj: IO[bytes]):
+        self._head = head
+        self._fileobj = fileobj
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._fileobj.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+class _CheckedReader:
+    """Read a decompressed stream, raising :class:`.exceptions.FeedXMLError`
+    if the compressed data is truncated or corrupt."""
+
+    def __init__(self, fileobj, compression: str, name):
+        self._fileobj = fileobj
+        self._compression = compression
+        self._name = name
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            return self._fileobj.read(size)
+        except _ERRORS as e:
+            raise FeedXMLError(f"Invalid {self._compression} data in {self._name}") from e
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+
+
+def _uncompressed(fileobj, name=None):
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    if hasattr(fileobj, "peek"):
+        head = fileobj.peek(_MAGIC_LEN)[:_MAGIC_LEN]
+    elif hasattr(fileobj, "seekable") and fileobj.seekable():
+        position = fileobj.tell()
+        head = fileobj.read(_MAGIC_LEN)
+        fileobj.seek(position)
+    else:
+        head = fileobj.read(_MAGIC_LEN)
+        fileobj = io.BufferedReader(_PrefixedReader(head, fileobj))
+    if isinstance(head, str):
+        return fileobj
+    compression = detect(head)
+    if compression is None:
+        return fileobj
+    if name is None:
+        name = getattr(fileobj, "name", "the stream")
+    return _CheckedReader(_codec(fileobj, compression), compression, name)
+
+
+@contextlib.contextmanager
+def open_input(file) -> Iterator:
+    """Open `file` (a path or a file object) for reading,
+    decompressing it while read if it is compressed.
+
+    File objects are not closed. URLs are returned as they are.
+    Reading truncated or corrupt compressed data raises :class:`.exceptions.FeedXMLError`.
+
+    :meta private:"""
+    if isinstance(file, str) and "://" in file:
+        yield file
+    elif isinstance(file, str | os.PathLike):
+        with open(file, "rb") as f:
+            yield _uncompressed(f, os.fspath(file))
+    else:
+        yield _uncompressed(file)
+
+
+@contextlib.contextmanager
+def open_output(file, compression: str | None = None) -> Iterator[IO[bytes]]:
+    """Open `file` (a path or a binary file object) for writing, compressing what is written.
+
+    :param compression: `gzip`, `bz2`, `xz` or `None`.
+        If `file` is a path, by default it is guessed from its suffix.
+    :raises ValueError: If the compression is not supported.
+
+    :meta private:"""
+    if compression is not None and compression not in SUFFIXES.values():
+        raise ValueError(f"Unsupported compression '{compression}'")
+    if isinstance(file, str | os.PathLike):
+        if compression is None:
+            compression = SUFFIXES.get(os.path.splitext(file)[1].lower())
+        with open(file, "wb") as f, _codec(f, compression, "wb") as out:
+            yield out
+    else:
+        out = _codec(file, compression, "wb")
+        try:
+            yield out
+        finally:
+            if out is not file:
+                out.close()
@@ -0,0 +1,202 @@
+"""Module to clean, shorten and summarize the HTML content of items."""
+
+import dataclasses
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import lxml.etree as ET
+import lxml.html
+
+from .feed import Feed, FeedItem
+
+_WORD_END = re.compile(r"\S+")
+_PLAIN_TYPES = frozenset(["text", "text/plain"])
+_TEXT_TYPES = {"html": "text", "xhtml": "text", "text/html": "text/plain"}
+_BREAKS = frozenset(
+    """address article aside blockquote br dd details div dl dt figcaption figure footer
+    h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section summary table td th tr ul""".split()
+)
+
+
+def html_text(root: ET.Element) -> str:
+    """Returns the text of an HTML element, with spaces around blocks and line breaks,
+    so that the words of adjacent paragraphs are not joined.
+
+    `root` is changed: spaces are added to the text and the tail of those elements."""
+    for elem in root.iter(*_BREAKS):
+        elem.text = " " + elem.text if elem.text else " "
+        elem.tail = " " + elem.tail if elem.tail else " "
+    return root.text_content()
+
+
+def _cut(text: str, max_chars: int | None, max_words: int | None) -> str | None:
+    """Returns `text` cut at a word boundary within the limits, `None` if it fits.
+
+    The result is empty if the first word does not fit."""
+    end = len(text)
+    if max_words is not None:
+        for n, match in enumerate(_WORD_END.finditer(text)):
+            if n == max_words:
+                end = min(end, match.start())
+                break
+    if max_chars is not None and max_chars < end:
+        end = max_chars
+        if not text[end].isspace():
+            end = next((i for i in range(end - 1, 0, -1) if text[i].isspace()), 0)
+    if end >= len(text):
+        return None
+    return text[:end].rstrip()
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def _remove_following(elem: ET.Element, root: ET.Element, in_text: bool) -> None:
+    """Remove every node after the text (or the tail) of `elem`."""
+    if in_text:
+        for child in list(elem):
+            elem.remove(child)
+        if elem is not root:
+            elem.tail = None
+    node = elem
+    while node is not root:
+        parent = node.getparent()
+        for sibling in list(node.itersiblings()):
+            parent.remove(sibling)
+        if parent is not root:
+            parent.tail = None
+        node = parent
+
+
+class ContentPipeline:
+    """Clean and shorten the content of items.
+
+    Results are kept in a LRU cache, by the digest of the content and of the base URL,
+    so unchanged contents are parsed only once.
+
+    :param strip_tags: Returns only the text, with whitespaces collapsed.
+    :param max_chars: Maximum number of characters of text, cut at a word boundary.
+    :param max_words: Maximum number of words of text.
+    :param ellipsis: Appended to a shortened content.
+    :param drop: Elements removed with their content.
+    :param rewrite_links: Make relative links absolute, using the item URL as base.
+    :param maxsize: Maximum number of cached results.
+    """
+
+    def __init__(
+        self,
+        *,
+        strip_tags: bool = False,
+        max_chars: int | None = None,
+        max_words: int | None = None,
+        ellipsis: str = "…",
+        drop: tuple[str, ...] = ("script", "style", "img", "iframe", "object", "embed"),
+        rewrite_links: bool = True,
+        maxsize: int = 10_000,
+    ):
+        self.strip_tags = strip_tags
+        self.max_chars = max_chars
+        self.max_words = max_words
+        self.ellipsis = ellipsis
+        self.drop = drop
+        self.rewrite_links = rewrite_links
+        self.maxsize = maxsize
+        self.hits = 0
+        """Number of contents found in cache."""
+        self.misses = 0
+        """Number of contents processed."""
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _truncate_text(self, text: str) -> str:
+        cut = _cut(text, self.max_chars, self.max_words)
+        if cut is None:
+            return text
+        if not cut and self.max_chars:
+            cut = text[: self.max_chars]  # a single word longer than max_chars
+        return cut + self.ellipsis
+
+    def _truncate_tree(self, root: ET.Element) -> None:
+        chars, words = self.max_chars, self.max_words
+        for event, elem in ET.iterwalk(root, events=("start", "end")):
+            in_text = event == "start"
+            if not in_text and elem is root:
+                break
+            text = elem.text if in_text else elem.tail
+            if not text:
+                continue
+            cut = _cut(text, chars, words)
+            if cut is not None:
+                if in_text:
+                    elem.text = cut + self.ellipsis
+                else:
+                    elem.tail = cut + self.ellipsis
+                _remove_following(elem, root, in_text)
+                return
+            if chars is not None:
+                chars -= len(text)
+            if words is not None:
+                words -= _word_count(text)
+
+    def _process(self, content: str, plain: bool, base_url: str | None) -> str:
+        if plain:
+            text = " ".join(content.split()) if self.strip_tags else content
+            return self._truncate_text(text)
+        try:
+            root = lxml.html.fragment_fromstring(content, create_parent="div")
+        except (ET.ParserError, ValueError):
+            return self._truncate_text(content)
+        if self.drop:
+            for elem in list(root.iter(*self.drop)):
+                elem.drop_tree()
+        if self.strip_tags:
+            return self._truncate_text(" ".join(html_text(root).split()))
+        if self.rewrite_links and base_url:
+            root.make_links_absolute(base_url, handle_failures="ignore")
+        if self.max_chars is not None or self.max_words is not None:
+            self._truncate_tree(root)
+        html = lxml.html.tostring(root, encoding="unicode")
+        return html[len("<div>") : -len("</div>")]
+
+    def __call__(self, content: str, base_url: str | None = None, plain: bool = False) -> str:
+        """Returns the processed `content`.
+
+        :param base_url: Base of the relative links.
+        :param plain: `content` is text, not HTML."""
+        key = hashlib.blake2b(
+            f"{plain:d}{base_url or ''}\0{content}".encode("utf-8", "surrogatepass"),
+            digest_size=16,
+        ).digest()
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return result
+            self.misses += 1
+        result = self._process(content, plain, base_url)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return result
+
+    def item(self, fitem: FeedItem) -> FeedItem:
+        """Returns a copy of `fitem` with the processed content."""
+        if not fitem.content:
+            return fitem
+        plain = fitem.content_type in _PLAIN_TYPES
+        content = self(fitem.content, fitem.url, plain)
+        content_type = fitem.content_type
+        if self.strip_tags and content_type in _TEXT_TYPES:
+            content_type = _TEXT_TYPES[content_type]
+        return dataclasses.replace(fitem, content=content, content_type=content_type)
+
+    def apply(self, feed: Feed) -> Feed:
+        """Returns a copy of `feed` with the processed contents, to be passed to `generate`.
+
+        `feed` is not changed."""
+        return dataclasses.replace(feed, items=[self.item(fitem) for fitem in feed.items])
@@ -0,0 +1,163 @@
+"""Module to find near-duplicate items across feeds, with MinHash and LSH."""
+
+import hashlib
+from array import array
+from collections.abc import Hashable, Iterable
+
+from .feed import Feed, FeedItem
+from .search import strip_tags, tokenize
+
+_EMPTY = 0xFFFFFFFF
+
+
+def item_text(fitem: FeedItem) -> str:
+    """Returns the title and the content (without tags) of `fitem`."""
+    return f"{fitem.title or ''} {strip_tags(fitem.content) if fitem.content else ''}"
+
+
+def signature(text: str, num_perm: int = 64, shingle: int = 3) -> array | None:
+    """Returns the MinHash signature of the word `shingle`-grams of `text`,
+    `None` if `text` has no words.
+
+    Uses one permutation hashing: every hash goes in one of `num_perm` bins,
+    empty bins are filled from the next bin that is not empty."""
+    words = tokenize(text)
+    if not words:
+        return None
+    grams = {" ".join(words[i : i + shingle]) for i in range(max(1, len(words) - shingle + 1))}
+    sig = array("I", [_EMPTY]) * num_perm
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        i = h % num_perm
+        value = h >> 32
+        if value < sig[i]:
+            sig[i] = value
+    if _EMPTY in sig:
+        original = sig.tolist()
+        following = None
+        for i in range(2 * num_perm - 1, -1, -1):
+            value = original[i % num_perm]
+            if value != _EMPTY:
+                following = i
+            elif following is not None and i < num_perm:
+                sig[i] = (original[following % num_perm] + (following - i) * 0x9E3779B1) & (
+                    0xFFFFFFFE
+                )
+    return sig
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b, strict=True)) / len(a)
+
+
+class NearDuplicates:
+    """Cluster near-duplicate items, by the MinHash signature of their title and content.
+
+    Every signature is split in `bands`: items with an equal band are candidates,
+    and are clustered if their estimated similarity is at least `threshold`.
+    Only the signatures (`4 * num_perm` bytes per item) and the first item
+    of every band value are kept: the band values are most of the memory,
+    :meth:`forget` drops the ones of older items in long running processes.
+    Items without words are never duplicates.
+
+    :param num_perm: Size of the signatures, a multiple of `bands`.
+    :param bands: Number of bands, more bands find less similar candidates.
+    :param threshold: Minimum estimated Jaccard similarity of duplicates.
+    :param shingle: Number of words in every shingle.
+    """
+
+    def __init__(
+        self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, shingle: int = 3
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle = shingle
+        self._keys: list[Hashable] = []
+        self._signatures = array("I")
+        self._parent = array("I")
+        self._buckets: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, fitem: FeedItem, key: Hashable = None) -> int:
+        """Add `fitem`, identified by `key` (by default the item itself).
+
+        :returns: The index of the item."""
+        sig = signature(item_text(fitem), self.num_perm, self.shingle)
+        index = len(self._keys)
+        self._keys.append(fitem if key is None else key)
+        self._parent.append(index)
+        if sig is None:
+            self._signatures.extend(array("I", [_EMPTY]) * self.num_perm)
+            return index
+        self._signatures.extend(sig)
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            bucket = hash((band, *sig[band * rows : (band + 1) * rows]))
+            other = self._buckets.setdefault(bucket, index)
+            if other != index and self._find(other) != self._find(index):
+                if similarity(sig, self._signature(other)) >= self.threshold:
+                    self._union(other, index)
+        return index
+
+    def forget(self, before: int) -> int:
+        """Stop finding duplicates of the items added before index `before`.
+
+        Their clusters are kept, but their band values are dropped,
+        so later items are clustered only with the ones from `before` on.
+
+        :returns: The number of band values dropped."""
+        count = len(self._buckets)
+        self._buckets = {bucket: i for bucket, i in self._buckets.items() if i >= before}
+        return count - len(self._buckets)
+
+    def add_feed(self, feed: Feed) -> None:
+        """Add every item of `feed`."""
+        for fitem in feed.items:
+            self.add(fitem)
+
+    def _signature(self, index: int) -> array:
+        return self._signatures[index * self.num_perm : (index + 1) * self.num_perm]
+
+    def _find(self, index: int) -> int:
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            self._parent[max(a, b)] = min(a, b)
+
+    def cluster(self, index: int) -> int:
+        """Returns the index of the first item of the cluster of item `index`."""
+        return self._find(index)
+
+    def clusters(self) -> list[list[Hashable]]:
+        """Returns the keys of the clusters with more than one item, in order of addition."""
+        groups: dict[int, list[Hashable]] = {}
+        for index, key in enumerate(self._keys):
+            groups.setdefault(self._find(index), []).append(key)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def is_duplicate(self, index: int) -> bool:
+        """Returns `True` if the item `index` is not the first of its cluster."""
+        return self._find(index) != index
+
+
+def unique_items(feeds: Iterable[Feed], **params) -> list[FeedItem]:
+    """Returns the items of `feeds`, without the later near-duplicates.
+
+    :param params: Passed to :class:`NearDuplicates`."""
+    detector = NearDuplicates(**params)
+    items = [fitem for feed in feeds for fitem in feed.items]
+    for fitem in items:
+        detector.add(fitem)
+    return [fitem for i, fitem in enumerate(items) if not detector.is_duplicate(i)]
@@ -12,3 +12,7 @@ class FeedXMLError(FeedDocumentError):
 
 class RemoteFeedError(Exception):
     """HTTP status not ok"""
+
+
+class FeedLimitError(FeedDocumentError):
+    """Document exceeds a parsing limit."""
@@ -0,0 +1,217 @@
+"""Module to read and write the extension elements of the items with registered handlers."""
+
+import dataclasses
+from collections.abc import Callable
+from typing import Any
+
+import lxml.etree as ET
+
+from .utils import clark_name, clean_text, data_key
+
+
+def text(elem: ET.Element) -> str | None:
+    """Parse an element as its stripped text."""
+    return elem.text.strip() if elem.text and elem.text.strip() else None
+
+
+def integer(elem: ET.Element) -> int | None:
+    """Parse an element as an integer.
+
+    :raises ValueError: If the text is not an integer."""
+    value = text(elem)
+    return int(value) if value is not None else None
+
+
+def write_text(item: ET.Element, tag: str, value: Any) -> None:
+    """Append to `item` an element `tag` with `value` as text."""
+    ET.SubElement(item, tag).text = clean_text(str(value))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Handler:
+    """How an extension element is read and written."""
+
+    tag: str
+    """Tag of the element, in Clark notation, or a wildcard."""
+    name: str
+    """Key of the value in :attr:`.feed.FeedItem.extensions`."""
+    parse: Callable[[ET.Element], Any] | None
+    """Returns the value of an element, `None` to skip it."""
+    write: Callable[[ET.Element, str, Any], None] | None
+    """Appends an element of a value to an item."""
+    multiple: bool
+    """Collect the values of every element in a list."""
+
+
+class Registry:
+    """Handlers of the extension elements of the items, by tag.
+
+    When an item is read, the children with a handler are removed from the element
+    before the not managed ones are converted to `_data`: the value returned by
+    `parse` is stored in :attr:`.feed.FeedItem.extensions`, or nothing at all for
+    skipped elements. Elements whose `parse` returns `None` or raises `ValueError`
+    are left in `_data`. When an item is written, every value in `extensions`
+    with a handler is written by its `write` function.
+
+    Tags can be written with the prefixes of :data:`.utils.NS` (``slash:comments``),
+    in Clark notation (``{uri}comments``), or as wildcards: ``prefix:*`` or ``{uri}*``
+    for every element of a namespace and ``*`` for every element.
+    Elements matching a tag are preferred to the ones matching a wildcard.
+    """
+
+    def __init__(self):
+        self._tags: dict[str, Handler] = {}
+        self._names: dict[str, Handler] = {}
+        self._wildcards = False
+        self.version = 0
+        """Incremented at every change, used by the caches of parsed feeds."""
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def __contains__(self, tag: str) -> bool:
+        return clark_name(tag) in self._tags
+
+    def register(
+        self,
+        tag: str,
+        parse: Callable[[ET.Element], Any] | None = text,
+        write: Callable[[ET.Element, str, Any], None] | None = write_text,
+        name: str | None = None,
+        multiple: bool = False,
+    ) -> Handler:
+        """Register the handler of an element, replacing the previous one of the same tag.
+
+        :param parse: Returns the value of the element, by default its text.
+        :param write: Appends the element of a value to an item, by default as text.
+        :param name: Key of the value, by default the tag with the known namespace prefix.
+        :param multiple: Collect the values of every element in a list.
+        :raises ValueError: If a wildcard has a parse or write function."""
+        clark = clark_name(tag)
+        if clark.endswith("*") and (parse is not None or write is not None):
+            raise ValueError("Wildcards can only skip elements")
+        self.unregister(tag)
+        handler = Handler(clark, name or data_key(clark, True), parse, write, multiple)
+        self._tags[clark] = handler
+        if parse is not None or write is not None:
+            self._names[handler.name] = handler
+        self._wildcards = any(key.endswith("*") for key in self._tags)
+        self.version += 1
+        return handler
+
+    def skip(self, tag: str) -> Handler:
+        """Drop the elements `tag` while reading, without converting them to `_data`."""
+        return self.register(tag, None, None)
+
+    def unregister(self, tag: str) -> None:
+        """Remove the handler of `tag`, if any."""
+        handler = self._tags.pop(clark_name(tag), None)
+        if handler is None:
+            return
+        if self._names.get(handler.name) is handler:
+            del self._names[handler.name]
+        self._wildcards = any(key.endswith("*") for key in self._tags)
+        self.version += 1
+
+    def clear(self) -> None:
+        """Remove every handler."""
+        self._tags.clear()
+        self._names.clear()
+        self._wildcards = False
+        self.version += 1
+
+    def writers(self) -> tuple[Handler, ...]:
+        """Returns the handlers that write values.
+
+        :meta private:"""
+        return tuple(h for h in self._names.values() if h.write is not None)
+
+    def load(self, handlers: tuple[Handler, ...]) -> None:
+        """Replace the handlers that write values with `handlers`,
+        used by the worker processes.
+
+        :meta private:"""
+        if self.writers() == handlers:
+            return
+        for handler in self.writers():
+            self.unregister(handler.tag)
+        for handler in handlers:
+            self._tags[handler.tag] = handler
+            self._names[handler.name] = handler
+        self.version += 1
+
+    def _handler(self, tag: str) -> Handler | None:
+        handler = self._tags.get(tag)
+        if handler is None and self._wildcards:
+            if tag.startswith("{"):
+                handler = self._tags.get(tag[: tag.index("}") + 1] + "*")
+            if handler is None:
+                handler = self._tags.get("*")
+        return handler
+
+    def extract(self, item: ET.Element, fitem) -> None:
+        """Move from the XML element `item` to `fitem` the elements with a handler.
+
+        :meta private:"""
+        if not self._tags:
+            return
+        for child in list(item):
+            if not isinstance(child.tag, str):
+                continue
+            handler = self._handler(child.tag)
+            if handler is None:
+                continue
+            if handler.parse is not None:
+                try:
+                    value = handler.parse(child)
+                except ValueError:
+                    continue
+                if value is None:
+                    continue
+                if handler.multiple:
+                    fitem.extensions.setdefault(handler.name, []).append(value)
+                elif handler.name not in fitem.extensions:
+                    fitem.extensions[handler.name] = value
+                else:
+                    continue
+            item.remove(child)
+
+    def append(self, item: ET.Element, fitem) -> None:
+        """Add to the XML element `item` the extension values of `fitem` with a handler.
+
+        :meta private:"""
+        if not fitem.extensions:
+            return
+        for name, value in fitem.extensions.items():
+            handler = self._names.get(name)
+            if handler is None or handler.write is None or value is None:
+                continue
+            for v in value if handler.multiple else [value]:
+                handler.write(item, handler.tag, v)
+
+
+REGISTRY = Registry()
+"""The handlers used by every parser and generator."""
+
+
+def register(
+    tag: str,
+    parse: Callable[[ET.Element], Any] | None = text,
+    write: Callable[[ET.Element, str, Any], None] | None = write_text,
+    name: str | None = None,
+    multiple: bool = False,
+) -> Handler:
+    """Register a handler in :data:`REGISTRY`, see :meth:`Registry.register`.
+
+    :raises ValueError: If a wildcard has a parse or write function."""
+    return REGISTRY.register(tag, parse, write, name, multiple)
+
+
+def skip(tag: str) -> Handler:
+    """Skip the elements `tag` in :data:`REGISTRY`, see :meth:`Registry.skip`."""
+    return REGISTRY.skip(tag)
+
+
+def unregister(tag: str) -> None:
+    """Remove the handler of `tag` from :data:`REGISTRY`."""
+    REGISTRY.unregister(tag)
@@ -1,6 +1,9 @@
 import dataclasses
 import datetime
 from collections import OrderedDict
+from typing import Any
+
+from .media import Enclosure, ITunesInfo, MediaContent, MediaThumbnail
 
 
 @dataclasses.dataclass(kw_only=True)
@@ -24,6 +27,8 @@ class Feed:
 """
 
     def __getattr__(self, name):
+        if name.startswith("__") or name == "_data":
+            raise AttributeError(name)  # while copying or unpickling
         return self._data[name]
 
     def unique_items_by_url(self):
@@ -54,11 +59,28 @@ class Feed:
         return "Feed({})".format(", ".join([f"{k}={v!r}" for k, v in vars(self).items() if v]))
 
 
+class _Content:
+    """The `content` of an item, that can be held compressed by a :class:`.coldstore.ColdStore`.
+
+    :meta private:"""
+
+    def __get__(self, obj, objtype=None) -> str | None:
+        if obj is None:
+            return None  # default of the field
+        value = obj.__dict__.get("content")
+        if value is None or type(value) is str:
+            return value
+        return str(value)
+
+    def __set__(self, obj, value: str | None) -> None:
+        obj.__dict__["content"] = value
+
+
 @dataclasses.dataclass(kw_only=True)
 class FeedItem:
     """A feed entry, similar to an atom entry or a rss item."""
 
-    content: str | None = None
+    content: str | None = _Content()  # type: ignore[assignment]
     """The content of the item (usually a text or HTML)."""
     content_type: str | None = None
     """The type of the content."""
@@ -72,12 +94,24 @@ class FeedItem:
     """Last update."""
     categories: list[str] = dataclasses.field(default_factory=list)
     """The categories of the item."""
+    enclosures: list[Enclosure] = dataclasses.field(default_factory=list)
+    """The files attached to the item."""
+    media: list[MediaContent] = dataclasses.field(default_factory=list)
+    """The Media RSS contents of the item."""
+    thumbnails: list[MediaThumbnail] = dataclasses.field(default_factory=list)
+    """The Media RSS thumbnails of the item."""
+    itunes: ITunesInfo | None = None
+    """The iTunes data of the item."""
+    extensions: dict[str, Any] = dataclasses.field(default_factory=dict)
+    """Values of the extension elements with a registered handler, see :mod:`.extensions`."""
     _data: dict = dataclasses.field(default_factory=dict)
     """Other attributes not managed.
 
         :meta public:"""
 
     def __getattr__(self, name):
+        if name.startswith("__") or name == "_data":
+            raise AttributeError(name)  # while copying or unpickling
         return self._data[name]
 
     def __repr__(self):
@@ -0,0 +1,178 @@
+"""Module to download feeds again with conditional requests and RFC 3229 feed deltas."""
+
+import dataclasses
+import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from . import extensions, multi
+from .exceptions import FeedDocumentError, FeedParseError, RemoteFeedError
+from .feed import Feed
+from .limits import Limits
+from .remote import CHUNK_SIZE, _open, _parse_chunks
+from .seen import item_key
+
+
+def merge(feed: Feed, delta: Feed, max_items: int | None = None) -> Feed:
+    """Returns `delta` followed by the items of `feed` that it does not replace.
+
+    Items are matched by id, or url, or title. The fields of the feed are the ones of `delta`.
+
+    :param max_items: Maximum number of items, the last ones are dropped."""
+    keys = {item_key(fitem) for fitem in delta.items}
+    keys.discard(None)
+    items = delta.items + [fitem for fitem in feed.items if item_key(fitem) not in keys]
+    if max_items is not None:
+        del items[max_items:]
+    delta.items = items
+    return delta
+
+
+@dataclasses.dataclass
+class _State:
+    etag: str | None
+    last_modified: str | None
+    feed: bytes
+    """The last feed, pickled."""
+
+
+class Fetcher:
+    """Download feeds again and again, transferring and parsing only what changed.
+
+    The validators and the last feed of every URL are remembered: the next requests are
+    conditional, a `304 Not Modified` returns the same feed without a body.
+    With `delta`, requests ask also for a RFC 3229 feed delta (`A-IM: feed`):
+    a `226 IM Used` response has only the new or changed items, that are merged
+    into the last feed with :func:`merge`.
+    Feeds are kept pickled, so every call returns a new :class:`.feed.Feed`.
+
+    :param delta: Ask for feed deltas.
+    :param max_items: Maximum number of items of a merged feed.
+    :param maxsize: Maximum number of URLs remembered.
+    """
+
+    def __init__(self, delta: bool = True, max_items: int | None = None, maxsize: int = 1024):
+        self.delta = delta
+        self.max_items = max_items
+        self.maxsize = maxsize
+        self.full = 0
+        """Number of complete documents received."""
+        self.deltas = 0
+        """Number of deltas received and merged."""
+        self.not_modified = 0
+        """Number of `304 Not Modified` responses."""
+        self.received = 0
+        """Bytes of the bodies received."""
+        self._states: OrderedDict[tuple, _State] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def clear(self) -> None:
+        """Forget every URL, statistics are kept."""
+        with self._lock:
+            self._states.clear()
+
+    def _count(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        read = 0
+        try:
+            for chunk in chunks:
+                read += len(chunk)
+                yield chunk
+        finally:
+            with self._lock:
+                self.received += read
+
+    def parse_url(
+        self,
+        url: str,
+        to_feed: Callable[..., Feed] | None = None,
+        compact_ns: bool = False,
+        limits: Limits | None = None,
+        max_bytes: int | None = None,
+        timeout: float | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        **extra,
+    ) -> Feed:
+        """Returns the current feed of `url`, parsed with the `to_feed` of a format,
+        by default of any supported format.
+
+        :param extra: Passed to `requests.get`.
+        :raises ModuleNotFoundError: If `requests` is not available.
+        :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+        :raises FeedLimitError: If one of `limits` is exceeded.
+        :raises FeedXMLError: If the body is not a valid xml.
+        :raises FeedParseError: If the xml is not a feed of the format."""
+        if to_feed is None:
+            to_feed = multi.to_feed
+        key = (url, to_feed.__module__, compact_ns, extensions.REGISTRY.version)
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+        headers = dict(extra.pop("headers", None) or {})
+        if state is not None:
+            if state.etag:
+                headers.setdefault("If-None-Match", state.etag)
+                if self.delta:
+                    headers.setdefault("A-IM", "feed")
+            if state.last_modified:
+                headers.setdefault("If-Modified-Since", state.last_modified)
+        with _open(url, max_bytes, timeout, chunk_size, limits, headers=headers, **extra) as (
+            r,
+            chunks,
+        ):
+            if r.status_code == 304:
+                if state is None:
+                    raise RemoteFeedError(f"{url} not modified, but never read")
+                with self._lock:
+                    self.not_modified += 1
+                return pickle.loads(state.feed)
+            delta = r.status_code == 226
+            if delta:
+                im = {token.strip().lower() for token in r.headers.get("IM", "").split(",")}
+                if "feed" not in im or state is None:
+                    raise RemoteFeedError(f"Unexpected delta of {url}")
+            root = _parse_chunks(self._count(chunks), limits)
+            etag = r.headers.get("ETag")
+            last_modified = r.headers.get("Last-Modified")
+        feed = to_feed(root, compact_ns)
+        if delta:
+            assert state is not None
+            feed = merge(pickle.loads(state.feed), feed, self.max_items)
+        with self._lock:
+            if delta:
+                self.deltas += 1
+            else:
+                self.full += 1
+            if etag or last_modified:
+                self._states[key] = _State(
+                    etag, last_modified, pickle.dumps(feed, pickle.HIGHEST_PROTOCOL)
+                )
+                self._states.move_to_end(key)
+                while len(self._states) > self.maxsize:
+                    self._states.popitem(last=False)
+            else:
+                self._states.pop(key, None)
+        return feed
+
+    def fetch_many(
+        self, urls: Iterable[str], workers: int = 8, **kwargs
+    ) -> dict[str, Feed | Exception]:
+        """Download `urls` concurrently with :meth:`parse_url`,
+        returns the feed, or the error, of every URL.
+
+        :param kwargs: Passed to :meth:`parse_url`."""
+
+        def fetch(url: str) -> Feed | Exception:
+            try:
+                return self.parse_url(url, **kwargs)
+            except (RemoteFeedError, FeedDocumentError, FeedParseError) as e:
+                return e
+
+        urls = list(urls)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(urls, executor.map(fetch, urls), strict=True))
@@ -0,0 +1,168 @@
+"""Module to generate feeds from serialized item fragments."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+import lxml.etree as ET
+
+from . import extensions
+from .utils import PreparedFeed, PreparedItem, prepare_feed, prepare_item, serialize
+
+_MARKER = "feedendum-items"
+
+
+def fingerprint(fitem) -> bytes:
+    """Returns a digest of the fields, extensions and `_data` of a :class:`.feed.FeedItem`."""
+    key = (
+        fitem.title,
+        fitem.id,
+        fitem.url,
+        fitem.content,
+        fitem.content_type,
+        fitem.update,
+        fitem.categories,
+        fitem.enclosures,
+        fitem.media,
+        fitem.thumbnails,
+        fitem.itunes,
+        fitem.extensions,
+        fitem._data,
+    )
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+
+class ItemSerializer:
+    """Serialize items one at a time, as they would be written inside `container`.
+
+    Fragments do not repeat the namespace declarations of the root element,
+    so they can be joined with :func:`splice`.
+
+    :meta private:"""
+
+    def __init__(
+        self, container: ET.Element, add_item: Callable[[ET.Element, PreparedItem], ET.Element]
+    ):
+        self._container = container
+        self._add_item = add_item
+        self._declarations: dict[str, tuple[bytes, bytes]] = {}
+
+    def __call__(self, pitem: PreparedItem) -> bytes:
+        elem = self._add_item(self._container, pitem)
+        data = ET.tostring(elem, encoding="UTF-8", with_tail=False)
+        self._container.remove(elem)
+        if elem.tag not in self._declarations:
+            probe = ET.SubElement(self._container, elem.tag)
+            declarations = ET.tostring(probe, encoding="UTF-8", with_tail=False)[:-2]
+            self._container.remove(probe)
+            self._declarations[elem.tag] = (declarations, declarations.split(b" ", 1)[0])
+        declarations, start = self._declarations[elem.tag]
+        if data.startswith(declarations):
+            data = start + data[len(declarations) :]
+        return data
+
+
+def envelope(root: ET.Element, container: ET.Element) -> tuple[bytes, bytes]:
+    """Serialize `root`, split where the last children of `container` would be.
+
+    :meta private:"""
+    marker = ET.Comment(_MARKER)
+    container.append(marker)
+    document = serialize(root)
+    container.remove(marker)
+    head, tail = document.split(f"<!--{_MARKER}-->".encode(), 1)
+    return head, tail
+
+
+def splice(root: ET.Element, container: ET.Element, fragments: Iterable[bytes]) -> bytes:
+    """Serialize `root`, with `fragments` as the last children of `container`.
+
+    :meta private:"""
+    head, tail = envelope(root, container)
+    return b"".join([head, *fragments, tail])
+
+
+class FragmentCache:
+    """A LRU cache of serialized items, shared by the `generate` functions.
+
+    An item is found only if its managed fields and its `_data` did not change,
+    see :func:`fingerprint`, and no extension handler was registered or removed since.
+
+    :param maxsize: Maximum number of fragments.
+    :param max_bytes: Maximum total size of the fragments, if not `None`.
+    """
+
+    def __init__(self, maxsize: int = 10_000, max_bytes: int | None = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        """Number of fragments found."""
+        self.misses = 0
+        """Number of fragments not found."""
+        self._fragments: OrderedDict[tuple[str, int, bytes], bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    @property
+    def size(self) -> int:
+        """Total size of the fragments."""
+        return self._bytes
+
+    def get(self, key: tuple[str, int, bytes]) -> bytes | None:
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._fragments.move_to_end(key)
+            return fragment
+
+    def put(self, key: tuple[str, int, bytes], fragment: bytes) -> None:
+        with self._lock:
+            old = self._fragments.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._fragments[key] = fragment
+            self._bytes += len(fragment)
+            while self._fragments and (
+                len(self._fragments) > self.maxsize
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, evicted = self._fragments.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+            self._bytes = 0
+
+    def generate(
+        self,
+        feed,
+        name: str,
+        build_channel: Callable[[PreparedFeed], tuple[ET.Element, ET.Element]],
+        add_item: Callable[[ET.Element, PreparedItem], ET.Element],
+        with_data: bool = True,
+    ) -> bytes:
+        """Returns the document of a feed, serializing only the items not in cache.
+
+        :meta private:"""
+        root, container = build_channel(prepare_feed(feed, items=False, with_data=with_data))
+        serializer = ItemSerializer(container, add_item)
+        if not with_data:
+            name += ":nodata"
+        version = extensions.REGISTRY.version
+        fragments = []
+        for fitem in feed.items:
+            key = (name, version, fingerprint(fitem))
+            fragment = self.get(key)
+            if fragment is None:
+                fragment = serializer(prepare_item(fitem, with_data))
+                self.put(key, fragment)
+            fragments.append(fragment)
+        return splice(root, container, fragments)
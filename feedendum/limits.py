@@ -0,0 +1,156 @@
+"""Module to limit the resources used to parse a document."""
+
+import dataclasses
+import time
+
+import lxml.etree as ET
+
+from .exceptions import FeedLimitError, FeedXMLError
+
+CHUNK_SIZE = 64 * 1024
+"""Size of the chunks passed to the parser."""
+
+_ITEMS = frozenset(["item", "{http://www.w3.org/2005/Atom}entry", "{http://purl.org/rss/1.0/}item"])
+_CHECK_EVERY = 1024
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class Limits:
+    """Limits checked while a document is parsed, `None` means no limit.
+
+    When a limit is exceeded :class:`.exceptions.FeedLimitError` is raised,
+    or, with `truncate`, the exceeding items are dropped and the long texts are cut.
+    """
+
+    max_bytes: int | None = None
+    """Maximum size of the document, after decompression."""
+    max_items: int | None = None
+    """Maximum number of items."""
+    max_text: int | None = None
+    """Maximum length of every text and attribute value."""
+    max_depth: int | None = None
+    """Maximum nesting of the elements, the root has depth 1.
+    It also limits the depth of the `_data` dictionaries."""
+    max_seconds: float | None = None
+    """Maximum time to read and parse the document."""
+    truncate: bool = False
+    """Drop the exceeding items and cut the long texts instead of raising."""
+
+
+class LimitedParser:
+    """A feed parser, like `lxml.etree.XMLParser`, checking `limits` after every chunk.
+
+    :meta private:"""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.read = 0
+        self.items = 0
+        self._depth = 0
+        self._events = 0
+        self._drop: set[ET.Element] = set()
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._deadline = None
+        if limits.max_seconds is not None:
+            self._deadline = time.monotonic() + limits.max_seconds
+
+    def _check_time(self) -> None:
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise FeedLimitError(f"Parsing takes more than {self.limits.max_seconds} seconds")
+
+    def _check_text(self, elem: ET.Element) -> None:
+        max_text = self.limits.max_text
+        if max_text is None:
+            return
+        if elem.text is not None and len(elem.text) > max_text:
+            if not self.limits.truncate:
+                raise FeedLimitError(f"Text of '{elem.tag}' longer than {max_text}")
+            elem.text = elem.text[:max_text]
+        for key, value in elem.attrib.items():
+            if len(value) > max_text:
+                if not self.limits.truncate:
+                    raise FeedLimitError(f"Attribute '{key}' longer than {max_text}")
+                elem.set(key, value[:max_text])
+
+    def _check_events(self) -> None:
+        limits = self.limits
+        for event, elem in self._parser.read_events():
+            self._events += 1
+            if self._events % _CHECK_EVERY == 0:
+                self._check_time()
+            if event == "start":
+                self._depth += 1
+                if limits.max_depth is not None and self._depth > limits.max_depth:
+                    raise FeedLimitError(f"Elements nested deeper than {limits.max_depth}")
+                if self._depth <= 3 and elem.tag in _ITEMS:
+                    self.items += 1
+                    if limits.max_items is not None and self.items > limits.max_items:
+                        if not limits.truncate:
+                            raise FeedLimitError(f"More than {limits.max_items} items")
+                        self._drop.add(elem)
+            else:
+                self._depth -= 1
+                self._check_text(elem)
+                if elem in self._drop:
+                    self._drop.discard(elem)
+                    elem.getparent().remove(elem)
+
+    def feed(self, data: bytes | str) -> None:
+        """Parse a chunk of the document.
+
+        :raises FeedLimitError: If a limit is exceeded.
+        :raises FeedXMLError: If the document is not a valid xml."""
+        self.read += len(data)
+        max_bytes = self.limits.max_bytes
+        if max_bytes is not None and self.read > max_bytes:
+            raise FeedLimitError(f"Document larger than {max_bytes} bytes")
+        self._check_time()
+        try:
+            self._parser.feed(data)
+        except ET.ParseError as e:
+            raise FeedXMLError("Not a valid XML document") from e
+        self._check_events()
+
+    def close(self) -> ET.Element:
+        """Returns the root element of the document.
+
+        :raises FeedLimitError: If a limit is exceeded.
+        :raises FeedXMLError: If the document is not a valid xml."""
+        try:
+            root = self._parser.close()
+        except ET.ParseError as e:
+            raise FeedXMLError("Not a valid XML document") from e
+        self._check_events()
+        return root
+
+
+def parse_bytes(data: bytes, limits: Limits, chunk_size: int = CHUNK_SIZE) -> ET.Element:
+    """Returns the root element of the document `data`, checking `limits`.
+
+    :raises FeedLimitError: If a limit is exceeded.
+    :raises FeedXMLError: If the document is not a valid xml.
+
+    :meta private:"""
+    if limits.max_bytes is not None and len(data) > limits.max_bytes:
+        raise FeedLimitError(f"Document larger than {limits.max_bytes} bytes")
+    parser = LimitedParser(limits)
+    view = memoryview(data)
+    for start in range(0, len(data), chunk_size):
+        parser.feed(bytes(view[start : start + chunk_size]))
+    return parser.close()
+
+
+def parse_stream(fileobj, limits: Limits, chunk_size: int = CHUNK_SIZE) -> ET.Element:
+    """Returns the root element of the document read from `fileobj`, checking `limits`.
+
+    :raises FeedLimitError: If a limit is exceeded.
+    :raises FeedXMLError: If the document is not a valid xml.
+    :raises ValueError: If `fileobj` is an URL.
+
+    :meta private:"""
+    if isinstance(fileobj, str):
+        raise ValueError("Limits are not supported reading URLs as files, use parse_url")
+    parser = LimitedParser(limits)
+    while chunk := fileobj.read(chunk_size):
+        parser.feed(chunk)
+    return parser.close()
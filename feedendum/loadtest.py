@@ -0,0 +1,396 @@
+"""Module to measure the download and parsing of feeds against a local server of synthetic feeds."""
+
+import contextlib
+import dataclasses
+import datetime
+import multiprocessing
+import random
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import multi
+from .exceptions import FeedDocumentError, FeedParseError, RemoteFeedError
+from .feed import Feed, FeedItem
+from .fetcher import Fetcher
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis nostrud "
+).split()
+_TEXT = " ".join(_WORDS * 4)
+_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+_ERRORS = (RemoteFeedError, FeedDocumentError, FeedParseError)
+
+
+@dataclasses.dataclass(kw_only=True, frozen=True)
+class Profile:
+    """How the synthetic feeds are served."""
+
+    feeds: int = 1000
+    """Number of feeds."""
+    formats: tuple[str, ...] = ("rss", "atom", "rdf")
+    """Formats of the feeds, in turn."""
+    items: tuple[int, int] = (10, 100)
+    """Minimum and maximum number of items of a feed."""
+    content_size: int = 1000
+    """Characters of the content of every item."""
+    latency: float = 0.0
+    """Seconds before the response."""
+    jitter: float = 0.0
+    """Maximum seconds randomly added to or removed from `latency`."""
+    etag: bool = True
+    """Send an `ETag` and answer `304 Not Modified` to a request with the current one."""
+    delta: bool = True
+    """Answer `226 IM Used` with the new items to a request with `A-IM: feed` and an old ETag."""
+    change_rate: float = 0.0
+    """Probability that a feed has a new item at every request."""
+    error_rate: float = 0.0
+    """Fraction of the responses that are `500 Internal Server Error`."""
+    drip: float = 0.0
+    """Seconds between the chunks of the body, to simulate slow servers."""
+    drip_size: int = 4096
+    """Bytes of the chunks of the body, with `drip`."""
+    seed: int = 0
+    """Seed of the random choices, the same seed serves the same feeds."""
+
+
+def synthetic_feed(
+    profile: Profile, number: int, version: int = 0, since: int | None = None
+) -> Feed:
+    """Returns the feed `number` of `profile` after `version` new items,
+    only with the items added after the version `since`, if given."""
+    rng = random.Random(f"{profile.seed}-{number}")
+    count = rng.randint(*profile.items)
+    size = max(profile.content_size, 0)
+    last = version + count - 1
+    first = version if since is None else max(version, since + count)
+    items = []
+    for k in range(last, first - 1, -1):
+        offset = (number + k) % 200
+        text = (_TEXT[offset:] + _TEXT) * (size // len(_TEXT) + 1)
+        items.append(
+            FeedItem(
+                id=f"urn:feed:{number}:item:{k}",
+                url=f"https://example.org/{number}/{k}",
+                title=f"Item {k} of feed {number}",
+                content=text[:size],
+                update=_EPOCH + datetime.timedelta(minutes=k),
+            )
+        )
+    return Feed(
+        title=f"Feed {number}",
+        url=f"https://example.org/{number}/",
+        description=f"Synthetic feed {number}",
+        update=_EPOCH + datetime.timedelta(minutes=last),
+        items=items,
+    )
+
+
+class SyntheticServer:
+    """An HTTP server of the synthetic feeds of a profile, at `/feed/<number>`.
+
+    Bodies are generated at the first request, the last `cache_size` are kept.
+
+    :param port: Port to listen on, `0` for a free one.
+    """
+
+    def __init__(self, profile: Profile, port: int = 0, cache_size: int = 4096):
+        self.profile = profile
+        self.cache_size = cache_size
+        self.requests = 0
+        """Number of requests received."""
+        self._versions = [0] * profile.feeds
+        self._rng = random.Random(profile.seed)
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self)
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 1024
+            daemon_threads = True
+
+        self._server = Server(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        """Base URL of the server."""
+
+    @property
+    def urls(self) -> list[str]:
+        """URLs of every feed."""
+        return urls(self.url, self.profile)
+
+    def _body(self, number: int, version: int, since: int | None) -> bytes:
+        key = (number, version, since)
+        with self._lock:
+            body = self._cache.get(key)
+        if body is None:
+            fmt = self.profile.formats[number % len(self.profile.formats)]
+            feed = synthetic_feed(self.profile, number, version, since)
+            body = multi.FORMATS[fmt].generate_bytes(feed)
+            with self._lock:
+                self._cache[key] = body
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return body
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        profile = self.profile
+        with self._lock:
+            self.requests += 1
+            error = self._rng.random() < profile.error_rate
+            delay = profile.latency + self._rng.uniform(-profile.jitter, profile.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        parts = handler.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "feed" or not parts[1].isdigit():
+            number = -1
+        else:
+            number = int(parts[1])
+        if not 0 <= number < profile.feeds:
+            handler.send_error(404)
+            return
+        if error:
+            handler.send_error(500)
+            return
+        with self._lock:
+            if profile.change_rate and self._rng.random() < profile.change_rate:
+                self._versions[number] += 1
+            version = self._versions[number]
+        etag = f'"{number}-{version}"'
+        known = handler.headers.get("If-None-Match", "")
+        if profile.etag and known == etag:
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.end_headers()
+            return
+        old = known.strip('"').partition("-")[2]
+        status, since = 200, None
+        if (
+            profile.etag
+            and profile.delta
+            and "feed" in handler.headers.get("A-IM", "")
+            and known.startswith(f'"{number}-')
+            and old.isdigit()
+            and int(old) < version
+        ):
+            status, since = 226, int(old)
+        body = self._body(number, version, since)
+        handler.send_response(status)
+        fmt = profile.formats[number % len(profile.formats)]
+        handler.send_header("Content-Type", f"application/{fmt}+xml")
+        handler.send_header("Content-Length", str(len(body)))
+        if profile.etag:
+            handler.send_header("ETag", etag)
+        if status == 226:
+            handler.send_header("IM", "feed")
+        handler.end_headers()
+        if not profile.drip:
+            handler.wfile.write(body)
+            return
+        for i in range(0, len(body), profile.drip_size):
+            handler.wfile.write(body[i : i + profile.drip_size])
+            handler.wfile.flush()
+            time.sleep(profile.drip)
+
+    def start(self) -> "SyntheticServer":
+        """Serve in a background thread, returns the server."""
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SyntheticServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def urls(base_url: str, profile: Profile) -> list[str]:
+    """Returns the URLs of every feed of `profile` served at `base_url`."""
+    return [f"{base_url}/feed/{number}" for number in range(profile.feeds)]
+
+
+def _serve(profile: Profile, conn, stop) -> None:
+    """Target of the server process, sends the base URL through `conn`.
+
+    :meta private:"""
+    with SyntheticServer(profile) as server:
+        conn.send(server.url)
+        stop.wait()
+
+
+@contextlib.contextmanager
+def serve_process(profile: Profile) -> Iterator[str]:
+    """Serve the feeds of `profile` from another process, yields the base URL.
+
+    The CPU and the memory of the server are not counted in the ones of the caller."""
+    parent, child = multiprocessing.Pipe()
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve, args=(profile, child, stop), daemon=True)
+    process.start()
+    try:
+        if not parent.poll(30):
+            raise RuntimeError("The synthetic server did not start")
+        yield parent.recv()
+    finally:
+        stop.set()
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+
+@dataclasses.dataclass(kw_only=True)
+class Report:
+    """Measures of a round of downloads."""
+
+    mode: str
+    """`parse_url` or `fetcher`."""
+    round: int
+    """Number of the round, from 1."""
+    requests: int
+    """Number of downloads."""
+    feeds: int
+    """Number of feeds read, from a body or not modified."""
+    errors: int
+    """Number of failed downloads."""
+    not_modified: int
+    """Number of `304 Not Modified`, only by a fetcher."""
+    deltas: int
+    """Number of `226 IM Used`, only by a fetcher."""
+    received: int
+    """Bytes of the bodies, by their `Content-Length`."""
+    elapsed: float
+    """Seconds of the round."""
+    latencies: list[float] = dataclasses.field(default_factory=list, repr=False)
+    """Seconds of every download."""
+    cpu: float
+    """CPU seconds of this process."""
+    memory: int | None = None
+    """Bytes allocated by the feeds read, kept until the end of the round,
+    if memory is traced."""
+
+    @property
+    def feeds_per_second(self) -> float:
+        return self.feeds / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Returns the latency in seconds below which `p` percent of the downloads are."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def __str__(self) -> str:
+        feeds = max(self.feeds, 1)
+        memory = f", {self.memory / feeds / 1024:.1f} KiB/feed" if self.memory is not None else ""
+        return (
+            f"{self.mode} round {self.round}: {self.feeds}/{self.requests} feeds"
+            f" ({self.errors} errors, {self.not_modified} not modified, {self.deltas} deltas)"
+            f" in {self.elapsed:.2f}s, {self.feeds_per_second:.1f} feeds/s,"
+            f" {self.received / 1e6:.2f} MB;"
+            f" latency p50 {self.percentile(50) * 1000:.1f} ms,"
+            f" p90 {self.percentile(90) * 1000:.1f} ms,"
+            f" p99 {self.percentile(99) * 1000:.1f} ms,"
+            f" max {max(self.latencies, default=0) * 1000:.1f} ms;"
+            f" CPU {self.cpu * 1000 / feeds:.2f} ms/feed{memory}"
+        )
+
+
+def run(
+    profile: Profile,
+    mode: str = "parse_url",
+    rounds: int = 1,
+    workers: int = 16,
+    timeout: float = 30,
+    base_url: str | None = None,
+    trace_memory: bool = False,
+) -> list[Report]:
+    """Download every feed of `profile` `rounds` times, returns the measures of every round.
+
+    :param mode: `parse_url` downloads every feed with :func:`.multi.parse_url`,
+        `fetcher` with a :class:`.fetcher.Fetcher` remembering every feed, shared by the rounds.
+    :param workers: Number of concurrent downloads.
+    :param base_url: URL of a server of `profile` already running,
+        by default one is started in another process.
+    :param trace_memory: Measure the memory of the feeds read, slower.
+    :raises ValueError: If the mode is not supported.
+    :raises ModuleNotFoundError: If `requests` is not available."""
+    if mode not in ("parse_url", "fetcher"):
+        raise ValueError(f"Unsupported mode '{mode}'")
+    if base_url is None:
+        with serve_process(profile) as url:
+            return run(profile, mode, rounds, workers, timeout, url, trace_memory)
+    fetcher = Fetcher(maxsize=max(profile.feeds, 1)) if mode == "fetcher" else None
+    targets = urls(base_url, profile)
+    received = [0]
+    lock = threading.Lock()
+
+    def count(response, *args, **kwargs) -> None:
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and response.status_code in (200, 226):
+            with lock:
+                received[0] += int(length)
+
+    def fetch(url: str) -> tuple[float, Feed | Exception]:
+        start = time.perf_counter()
+        result: Feed | Exception
+        try:
+            if fetcher is not None:
+                result = fetcher.parse_url(url, timeout=timeout, hooks={"response": count})
+            else:
+                result = multi.parse_url(url, timeout=timeout, hooks={"response": count})
+        except _ERRORS as e:
+            result = e
+        return time.perf_counter() - start, result
+
+    reports = []
+    for number in range(1, rounds + 1):
+        received[0] = 0
+        before = (fetcher.not_modified, fetcher.deltas) if fetcher is not None else (0, 0)
+        if trace_memory:
+            tracemalloc.start()
+        cpu = time.process_time()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(fetch, targets))
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        memory = None
+        if trace_memory:
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        errors = sum(1 for _, result in results if isinstance(result, Exception))
+        after = (fetcher.not_modified, fetcher.deltas) if fetcher is not None else (0, 0)
+        reports.append(
+            Report(
+                mode=mode,
+                round=number,
+                requests=len(results),
+                feeds=len(results) - errors,
+                errors=errors,
+                not_modified=after[0] - before[0],
+                deltas=after[1] - before[1],
+                received=received[0],
+                elapsed=elapsed,
+                latencies=[latency for latency, _ in results],
+                cpu=cpu,
+                memory=memory,
+            )
+        )
+        del results
+    return reports
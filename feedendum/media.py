@@ -0,0 +1,250 @@
+"""Module to handle enclosures and the Media RSS and iTunes extensions of items."""
+
+import dataclasses
+
+import lxml.etree as ET
+
+from .utils import NS, clean_text
+
+_MEDIA = f"{{{NS['media']}}}"
+_ITUNES = f"{{{NS['itunes']}}}"
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class Enclosure:
+    """A file attached to an item, like a RSS `enclosure` or an Atom `link rel="enclosure"`."""
+
+    url: str | None = None
+    """URL of the file."""
+    type: str | None = None
+    """MIME type of the file."""
+    length: int | None = None
+    """Size of the file in bytes."""
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class MediaContent:
+    """A `media:content` element."""
+
+    url: str | None = None
+    """URL of the media."""
+    type: str | None = None
+    """MIME type of the media."""
+    medium: str | None = None
+    """Kind of media, like `image`, `audio` or `video`."""
+    file_size: int | None = None
+    """Size of the media in bytes."""
+    duration: int | None = None
+    """Duration of the media in seconds."""
+    width: int | None = None
+    """Width of the media in pixels."""
+    height: int | None = None
+    """Height of the media in pixels."""
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class MediaThumbnail:
+    """A `media:thumbnail` element."""
+
+    url: str | None = None
+    """URL of the image."""
+    width: int | None = None
+    """Width of the image in pixels."""
+    height: int | None = None
+    """Height of the image in pixels."""
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class ITunesInfo:
+    """The `itunes:*` elements of an item."""
+
+    duration: int | None = None
+    """Duration of the episode in seconds."""
+    episode: int | None = None
+    """Number of the episode."""
+    season: int | None = None
+    """Number of the season."""
+    episode_type: str | None = None
+    """Type of episode: `full`, `trailer` or `bonus`."""
+    explicit: str | None = None
+    """Parental advisory information."""
+    image: str | None = None
+    """URL of the episode artwork."""
+    title: str | None = None
+    """Title of the episode."""
+    subtitle: str | None = None
+    """Short description of the episode."""
+    summary: str | None = None
+    """Description of the episode."""
+    author: str | None = None
+    """Author of the episode."""
+
+
+# (attribute, xml attribute, is int)
+_ENCLOSURE_ATTRS = (("url", "url", False), ("type", "type", False), ("length", "length", True))
+_LINK_ATTRS = (("url", "href", False), *_ENCLOSURE_ATTRS[1:])
+_CONTENT_ATTRS = (
+    ("url", "url", False),
+    ("type", "type", False),
+    ("medium", "medium", False),
+    ("file_size", "fileSize", True),
+    ("duration", "duration", True),
+    ("width", "width", True),
+    ("height", "height", True),
+)
+_THUMBNAIL_ATTRS = (("url", "url", False), ("width", "width", True), ("height", "height", True))
+# (attribute, tag, is int)
+_ITUNES_TEXTS = (
+    ("episode", "episode", True),
+    ("season", "season", True),
+    ("episode_type", "episodeType", False),
+    ("explicit", "explicit", False),
+    ("title", "title", False),
+    ("subtitle", "subtitle", False),
+    ("summary", "summary", False),
+    ("author", "author", False),
+)
+_ITUNES_TAGS = {xml: (name, is_int) for name, xml, is_int in _ITUNES_TEXTS}
+
+
+def _is_number(text: str) -> bool:
+    """Whether `text` is made only of ASCII digits, the ones accepted by `int`.
+
+    :meta private:"""
+    return text.isascii() and text.isdecimal()
+
+
+def parse_duration(text: str) -> int | None:
+    """Returns the seconds of a duration like `1800`, `30:00` or `0:30:00`,
+    `None` if not valid."""
+    parts = text.strip().split(":")
+    if len(parts) > 3 or not all(_is_number(p) for p in parts):
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def format_duration(seconds: int) -> str:
+    """Returns a duration like `30:00` or `1:30:00`."""
+    hours, rest = divmod(seconds, 3600)
+    if hours:
+        return f"{hours}:{rest // 60:02}:{rest % 60:02}"
+    return f"{rest // 60:02}:{rest % 60:02}"
+
+
+def _from_attributes(elem: ET.Element, cls, attrs, ignored: tuple[str, ...] = ()):
+    """Returns a `cls` from the attributes of `elem`,
+    `None` if `elem` has data that `cls` can not hold."""
+    if len(elem) or (elem.text and elem.text.strip()):
+        return None
+    known = {xml for _, xml, _ in attrs}.union(ignored)
+    if any(key not in known for key in elem.attrib):
+        return None
+    values = {}
+    for name, xml, is_int in attrs:
+        value = elem.get(xml)
+        if value is None:
+            continue
+        value = value.strip()
+        if is_int:
+            if not _is_number(value):
+                return None
+            values[name] = int(value)
+        else:
+            values[name] = value
+    return cls(**values)
+
+
+def _to_attributes(elem: ET.Element, obj, attrs) -> None:
+    for name, xml, _ in attrs:
+        value = getattr(obj, name)
+        if value is not None:
+            elem.set(xml, clean_text(str(value)))  # type: ignore
+
+
+def extract(item: ET.Element, fitem, atom: bool = False) -> None:
+    """Move from the XML element `item` to `fitem` enclosures, Media RSS and iTunes data.
+
+    Elements that can not be fully rappresented are left in `item`.
+
+    :param atom: Read enclosures from Atom links.
+
+    :meta private:"""
+    if atom:
+        links = item.findall(f"{{{NS['atom']}}}link[@rel='enclosure']")
+    else:
+        links = item.findall("enclosure")
+    for child in links:
+        if atom:
+            enclosure = _from_attributes(child, Enclosure, _LINK_ATTRS, ("rel",))
+        else:
+            enclosure = _from_attributes(child, Enclosure, _ENCLOSURE_ATTRS)
+        if enclosure is not None:
+            fitem.enclosures.append(enclosure)
+            item.remove(child)
+    for child in item.findall(f"{_MEDIA}content"):
+        content = _from_attributes(child, MediaContent, _CONTENT_ATTRS)
+        if content is not None:
+            fitem.media.append(content)
+            item.remove(child)
+    for child in item.findall(f"{_MEDIA}thumbnail"):
+        thumbnail = _from_attributes(child, MediaThumbnail, _THUMBNAIL_ATTRS)
+        if thumbnail is not None:
+            fitem.thumbnails.append(thumbnail)
+            item.remove(child)
+    info = ITunesInfo()
+    found = False
+    for child in list(item.iterchildren(f"{_ITUNES}*")):
+        if len(child):
+            continue
+        tag = child.tag[len(_ITUNES) :]
+        text = (child.text or "").strip()
+        value: str | int | None
+        if tag == "duration" and not child.attrib:
+            name, value = "duration", parse_duration(text)
+        elif tag == "image" and not text and list(child.attrib) == ["href"]:
+            name, value = "image", child.get("href").strip()
+        elif tag in _ITUNES_TAGS and not child.attrib:
+            name, is_int = _ITUNES_TAGS[tag]
+            value = (int(text) if _is_number(text) else None) if is_int else (text or None)
+        else:
+            continue
+        if value is None or getattr(info, name) is not None:
+            continue
+        setattr(info, name, value)
+        item.remove(child)
+        found = True
+    if found:
+        fitem.itunes = info
+
+
+def append(item: ET.Element, fitem, atom: bool = False) -> None:
+    """Add to the XML element `item` enclosures, Media RSS and iTunes data of `fitem`.
+
+    :param atom: Write enclosures as Atom links.
+
+    :meta private:"""
+    for enclosure in fitem.enclosures:
+        if atom:
+            elem = ET.SubElement(item, f"{{{NS['atom']}}}link")
+            elem.set("rel", "enclosure")
+            _to_attributes(elem, enclosure, _LINK_ATTRS)
+        else:
+            _to_attributes(ET.SubElement(item, "enclosure"), enclosure, _ENCLOSURE_ATTRS)
+    for content in fitem.media:
+        _to_attributes(ET.SubElement(item, f"{_MEDIA}content"), content, _CONTENT_ATTRS)
+    for thumbnail in fitem.thumbnails:
+        _to_attributes(ET.SubElement(item, f"{_MEDIA}thumbnail"), thumbnail, _THUMBNAIL_ATTRS)
+    info = fitem.itunes
+    if info is None:
+        return
+    if info.duration is not None:
+        ET.SubElement(item, f"{_ITUNES}duration").text = format_duration(info.duration)
+    if info.image is not None:
+        ET.SubElement(item, f"{_ITUNES}image").set("href", clean_text(info.image))  # type: ignore
+    for name, xml, _ in _ITUNES_TEXTS:
+        value = getattr(info, name)
+        if value is not None:
+            ET.SubElement(item, f"{_ITUNES}{xml}").text = clean_text(str(value))
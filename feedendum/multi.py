@@ -0,0 +1,128 @@
+"""Module to handle more than one feed format at once."""
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import lxml.etree as ET
+
+from . import atom, rdf, rss
+from .compression import open_input
+from .exceptions import FeedParseError, FeedXMLError
+from .feed import Feed
+from .limits import Limits, parse_stream
+from .remote import fetch_root
+from .utils import prepare_feed, serialize
+
+if TYPE_CHECKING:
+    from .fetcher import Fetcher
+    from .parsecache import ParseCache
+
+FORMATS = {"rss": rss, "atom": atom, "rdf": rdf}
+"""Supported formats, by name."""
+
+_ROOTS = {
+    "rss": "rss",
+    "{http://www.w3.org/2005/Atom}feed": "atom",
+    "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF": "rdf",
+}
+
+
+def detect_format(root) -> str:
+    """Returns the format name of a root XML element.
+
+    :raises FeedParseError: If the root element is not of a supported format."""
+    try:
+        return _ROOTS[root.tag]
+    except KeyError:
+        raise FeedParseError(f"Unsupported root element '{root.tag}'") from None
+
+
+def to_feed(root, compact_ns: bool = False) -> Feed:
+    """Generate a :class:`.feed.Feed` from a root XML element of any supported format.
+
+    :raises FeedParseError: If the xml is not a supported feed.
+
+    :meta private:"""
+    return FORMATS[detect_format(root)].to_feed(root, compact_ns)
+
+
+def parse_file(
+    file,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
+    """Generate a :class:`.feed.Feed` from a file of any supported format.
+
+    See :func:`.rss.parse_file` for the parameters.
+
+    :raises FeedLimitError: If one of `limits` is exceeded.
+    :raises FeedXMLError: If string is not a valid xml.
+    :raises FeedParseError: If the xml is not a supported feed."""
+    if cache is not None:
+        return cache.parse_file(file, to_feed, compact_ns, limits)
+    return to_feed(parse_root(file, limits), compact_ns)
+
+
+def parse_root(file, limits: Limits | None = None):
+    """Returns the root XML element of a file, that can be compressed.
+
+    :raises FeedLimitError: If one of `limits` is exceeded.
+    :raises FeedXMLError: If string is not a valid xml.
+
+    :meta private:"""
+    try:
+        with open_input(file) as f:
+            return ET.parse(f).getroot() if limits is None else parse_stream(f, limits)
+    except ET.ParseError as e:
+        raise FeedXMLError("Not a valid XML document") from e
+
+
+def parse_url(
+    url,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+    fetcher: "Fetcher | None" = None,
+    **extra,
+) -> Feed:
+    """Generate a :class:`.feed.Feed` from an URL of any supported format.
+
+    See :func:`.rss.parse_url` for the parameters.
+
+    :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If one of `limits` is exceeded.
+    :raises FeedXMLError: If string is not a valid xml.
+    :raises FeedParseError: If the xml is not a supported feed."""
+    if fetcher is not None:
+        return fetcher.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
+        )
+    if cache is not None:
+        return cache.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
+        )
+    root = fetch_root(url, max_bytes=max_bytes, timeout=timeout, limits=limits, **extra)
+    return to_feed(root, compact_ns)
+
+
+def generate_all(feed: Feed, formats: Iterable[str] = ("rss", "atom", "rdf")) -> dict[str, str]:
+    """Returns the string rappresentations of a feed in every format of `formats`.
+
+    Texts are sanitized and dates are formatted only once,
+    then shared by every generated format.
+
+    :raises ValueError: If a format is not supported."""
+    formats = list(formats)
+    for name in formats:
+        if name not in FORMATS:
+            raise ValueError(f"Unsupported format '{name}'")
+    prepared = prepare_feed(feed)
+    result = {}
+    for name in formats:
+        root = FORMATS[name].build_tree(prepared)
+        result[name] = serialize(root).decode("utf-8")
+    return result
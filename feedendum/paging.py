@@ -0,0 +1,184 @@
+"""Module to split feeds in pages and to read them back, see RFC 5005."""
+
+import dataclasses
+from collections.abc import Callable, Iterator
+from urllib.parse import urljoin
+
+from . import multi
+from .feed import Feed, FeedItem
+from .utils import NS, data_key
+
+ATOM_LINK = f"{{{NS['atom']}}}link"
+"""Key of the Atom links in :attr:`.feed.Feed._data`, for every format
+(``atom:link`` if parsed with `compact_ns`)."""
+FH_ARCHIVE = f"{{{NS['fh']}}}archive"
+"""Key of the RFC 5005 archive marker in :attr:`.feed.Feed._data`
+(``fh:archive`` if parsed with `compact_ns`)."""
+
+PAGING_RELS = frozenset(
+    ["self", "current", "first", "last", "next", "previous", "prev-archive", "next-archive"]
+)
+"""Link relations written by :class:`Pager`."""
+
+
+def links(feed: Feed) -> list[tuple[str, str]]:
+    """Returns the `(rel, href)` Atom links in the feed data.
+
+    Works for Atom feeds and for RSS feeds using `atom:link`,
+    parsed with or without `compact_ns`."""
+    result = []
+    for key in (ATOM_LINK, data_key(ATOM_LINK, True)):
+        value = feed._data.get(key)
+        if value is None:
+            continue
+        for link in value if isinstance(value, list) else [value]:
+            if isinstance(link, dict) and link.get("@href"):
+                result.append((link.get("@rel", "alternate"), link["@href"]))
+    return result
+
+
+class Pager:
+    """Split a feed in RFC 5005 pages: archive documents and the current document.
+
+    Items must be ordered oldest first (see :meth:`.feed.Feed.sort_items`)
+    and new items must be only appended:
+    every archive holds `page_size` items and never changes,
+    the current document holds the newest items.
+
+    Every document links the others with the archived feeds relations
+    (`current`, `prev-archive`, `next-archive`) and with the paged feeds ones
+    (`first`, `next`, `previous`), where `first` is the current document
+    and `next` goes back in time.
+
+    Generated archives are kept, so only the current document is generated again.
+
+    :param url_for: Returns the URL of an archive by its index,
+        or of the current document for `None`.
+    """
+
+    def __init__(self, feed: Feed, page_size: int, url_for: Callable[[int | None], str]):
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        self.feed = feed
+        self.page_size = page_size
+        self.url_for = url_for
+        self._cache: dict[tuple[str, int, bool], str] = {}
+
+    @property
+    def archives(self) -> int:
+        """Number of archive documents."""
+        return max(0, (len(self.feed.items) - 1) // self.page_size)
+
+    def items(self, index: int | None = None) -> list[FeedItem]:
+        """Items of the archive `index`, or of the current document for `None`.
+
+        :raises IndexError: If the archive does not exist."""
+        archives = self.archives
+        if index is None:
+            return self.feed.items[archives * self.page_size :]
+        if not 0 <= index < archives:
+            raise IndexError(f"Archive {index} does not exist")
+        return self.feed.items[index * self.page_size : (index + 1) * self.page_size]
+
+    def page(self, index: int | None = None) -> Feed:
+        """Returns the feed of the archive `index`, or of the current document for `None`.
+
+        :raises IndexError: If the archive does not exist."""
+        items = self.items(index)
+        archives = self.archives
+        current = self.url_for(None)
+        rels: list[tuple[str, str]] = [("current", current), ("first", current)]
+        if index is None:
+            rels.append(("self", current))
+            if archives:
+                rels.append(("prev-archive", self.url_for(archives - 1)))
+                rels.append(("next", self.url_for(archives - 1)))
+        else:
+            rels.append(("self", self.url_for(index)))
+            if index > 0:
+                rels.append(("prev-archive", self.url_for(index - 1)))
+                rels.append(("next", self.url_for(index - 1)))
+            if index + 1 < archives:
+                rels.append(("next-archive", self.url_for(index + 1)))
+                rels.append(("previous", self.url_for(index + 1)))
+            else:
+                rels.append(("previous", current))
+        data = dict(self.feed._data)
+        # the keys are compact if the feed was parsed with compact_ns
+        compact = data_key(ATOM_LINK, True) in data or data_key(FH_ARCHIVE, True) in data
+        new_links = []
+        for key in (ATOM_LINK, data_key(ATOM_LINK, True)):
+            old_links = data.pop(key, [])
+            new_links += [
+                link
+                for link in (old_links if isinstance(old_links, list) else [old_links])
+                if not isinstance(link, dict) or link.get("@rel") not in PAGING_RELS
+            ]
+        new_links.extend({"@rel": rel, "@href": href} for rel, href in rels)
+        data[data_key(ATOM_LINK, compact)] = new_links
+        if index is not None:
+            data.pop(data_key(FH_ARCHIVE, not compact), None)
+            data[data_key(FH_ARCHIVE, compact)] = ""
+        return dataclasses.replace(self.feed, items=list(items), _data=data)
+
+    def generate(self, fmt: str = "atom", index: int | None = None) -> str:
+        """Returns the string rappresentation in format `fmt` of the archive `index`,
+        or of the current document for `None`.
+
+        :raises IndexError: If the archive does not exist.
+        :raises ValueError: If the format is not supported."""
+        if fmt not in multi.FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}'")
+        if index is None:
+            return multi.FORMATS[fmt].generate(self.page(None))
+        key = (fmt, index, index + 1 < self.archives)
+        if key not in self._cache:
+            self._cache[key] = multi.FORMATS[fmt].generate(self.page(index))
+        return self._cache[key]
+
+    def invalidate(self) -> None:
+        """Forget the generated archives, to be used if old items are changed."""
+        self._cache.clear()
+
+
+def iter_pages(
+    url: str,
+    rels: tuple[str, ...] = ("next", "prev-archive"),
+    max_pages: int | None = None,
+    parse_url: Callable[..., Feed] | None = None,
+    **extra,
+) -> Iterator[Feed]:
+    """Read a feed and the following pages, linked by the first relation
+    found among `rels`. A page is never read twice.
+
+    :param parse_url: Function to read a page, by default any supported format is accepted.
+    :param extra: Passed to `parse_url`.
+    :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok.
+    :raises FeedXMLError: If a page is not a valid xml.
+    :raises FeedParseError: If a page is not a supported feed."""
+    if parse_url is None:
+        parse_url = multi.parse_url
+    seen: set[str] = set()
+    page_url: str | None = url
+    while page_url and page_url not in seen:
+        if max_pages is not None and len(seen) >= max_pages:
+            return
+        seen.add(page_url)
+        feed = parse_url(page_url, **extra)
+        yield feed
+        found = dict(reversed(links(feed)))
+        next_url = None
+        for rel in rels:
+            if rel in found:
+                next_url = urljoin(page_url, found[rel])
+                break
+        page_url = next_url
+
+
+def iter_items(url: str, rels: tuple[str, ...] = ("next", "prev-archive"), **extra):
+    """Read the items of a feed and of its following pages, page by page.
+
+    See :func:`iter_pages` for the parameters."""
+    for page in iter_pages(url, rels, **extra):
+        yield from page.items
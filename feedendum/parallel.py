@@ -0,0 +1,106 @@
+"""Module to generate very large feeds using more processes."""
+
+import math
+import os
+import pickle
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from . import extensions, multi
+from .feed import Feed, FeedItem
+from .fragments import ItemSerializer, splice
+from .utils import prepare_feed, prepare_item
+
+MIN_CHUNK = 500
+"""Minimum number of items serialized by a worker at once."""
+
+
+def serialize_items(
+    fmt: str,
+    items: Sequence[FeedItem],
+    with_data: bool = True,
+    handlers: tuple[extensions.Handler, ...] | None = None,
+) -> bytes:
+    """Returns the serialized items, as they would be written in a feed of format `fmt`.
+
+    :param handlers: Extension handlers to use, in place of the registered ones.
+
+    :meta private:"""
+    if handlers is not None:
+        extensions.REGISTRY.load(handlers)
+    module = multi.FORMATS[fmt]
+    _, container = module.build_channel(prepare_feed(Feed(), items=False))
+    serializer = ItemSerializer(container, module.add_item)
+    return b"".join(serializer(prepare_item(fitem, with_data)) for fitem in items)
+
+
+def _picklable(handlers: tuple[extensions.Handler, ...]) -> bool:
+    """Whether `handlers` can be sent to other processes.
+
+    :meta private:"""
+    try:
+        pickle.dumps(handlers)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def generate_bytes(
+    feed: Feed,
+    fmt: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    with_data: bool = True,
+    executor: Executor | None = None,
+) -> bytes:
+    """Returns the UTF-8 encoded document of `feed` in format `fmt`,
+    serializing chunks of items in a pool of processes.
+
+    The document is equivalent to the one of the `generate` functions,
+    but it can keep unused namespace declarations.
+    Small feeds are generated in the current process, and so are all the feeds
+    if an extension handler that writes values can not be pickled.
+
+    :param workers: Number of processes, by default the number of CPUs.
+    :param chunk_size: Number of items of every task,
+        by default about four tasks for every process.
+    :param with_data: Write also the not managed attributes, in `_data`.
+    :param executor: Used instead of a new pool, to avoid starting processes at every call.
+    :raises ValueError: If the format is not supported."""
+    if fmt not in multi.FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'")
+    module = multi.FORMATS[fmt]
+    items = feed.items
+    if workers is None:
+        workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK, math.ceil(len(items) / (workers * 4)))
+    root, container = module.build_channel(prepare_feed(feed, items=False, with_data=with_data))
+    # the workers do not share the registry, when started with spawn or forkserver
+    handlers = extensions.REGISTRY.writers()
+    if (workers <= 1 and executor is None) or len(items) <= chunk_size or not _picklable(handlers):
+        return splice(root, container, [serialize_items(fmt, items, with_data)])
+    chunks = [items[start : start + chunk_size] for start in range(0, len(items), chunk_size)]
+    args = ([fmt] * len(chunks), chunks, [with_data] * len(chunks), [handlers] * len(chunks))
+    if executor is not None:
+        fragments = list(executor.map(serialize_items, *args))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            fragments = list(pool.map(serialize_items, *args))
+    return splice(root, container, fragments)
+
+
+def generate(
+    feed: Feed,
+    fmt: str,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    with_data: bool = True,
+    executor: Executor | None = None,
+) -> str:
+    """Returns the string rappresentation of `feed` in format `fmt`.
+
+    See :func:`generate_bytes` for the parameters.
+
+    :raises ValueError: If the format is not supported."""
+    return generate_bytes(feed, fmt, workers, chunk_size, with_data, executor).decode("utf-8")
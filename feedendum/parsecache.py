@@ -0,0 +1,157 @@
+"""Module to cache parsed feeds by the digest of their documents."""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+import lxml.etree as ET
+
+from . import extensions
+from .compression import open_input
+from .exceptions import FeedXMLError
+from .feed import Feed
+from .limits import Limits, parse_bytes
+from .remote import fetch_bytes
+
+
+def _root(data: bytes, limits: Limits | None) -> ET.Element:
+    if limits is not None:
+        return parse_bytes(data, limits)
+    try:
+        return ET.fromstring(data)
+    except ET.ParseError as e:
+        raise FeedXMLError("Not a valid XML document") from e
+
+
+class ParseCache:
+    """A LRU cache of parsed feeds, shared by the `parse_*` functions.
+
+    A document is found if its bytes are identical to one already parsed,
+    with the same format, parameters and extension handlers.
+    Feeds are kept pickled, so every call returns a new :class:`.feed.Feed`,
+    that can be changed without affecting the cache.
+
+    :param maxsize: Maximum number of feeds.
+    :param maxbytes: Maximum size of the pickled feeds.
+    """
+
+    def __init__(self, maxsize: int = 1024, maxbytes: int | None = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        """Number of documents found in cache."""
+        self.misses = 0
+        """Number of documents parsed."""
+        self.size = 0
+        """Size of the pickled feeds in cache."""
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of documents found in cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Remove every feed, statistics are kept."""
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
+
+    def parse(
+        self,
+        data: bytes,
+        to_feed: Callable[..., Feed],
+        compact_ns: bool = False,
+        limits: Limits | None = None,
+    ) -> Feed:
+        """Returns the feed of the document `data`, parsed with the `to_feed` of a format.
+
+        :raises FeedLimitError: If one of `limits` is exceeded.
+        :raises FeedXMLError: If `data` is not a valid xml.
+        :raises FeedParseError: If the xml is not a feed of the format."""
+        key = (
+            hashlib.blake2b(data, digest_size=16).digest(),
+            to_feed.__module__,
+            compact_ns,
+            limits,
+            extensions.REGISTRY.version,
+        )
+        with self._lock:
+            pickled = self._cache.get(key)
+            if pickled is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            else:
+                self.misses += 1
+        if pickled is not None:
+            return pickle.loads(pickled)
+        feed = to_feed(_root(data, limits), compact_ns)
+        pickled = pickle.dumps(feed, pickle.HIGHEST_PROTOCOL)
+        if self.maxbytes is not None and len(pickled) > self.maxbytes:
+            return feed
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._cache[key] = pickled
+            self.size += len(pickled)
+            while len(self._cache) > self.maxsize or (
+                self.maxbytes is not None and self.size > self.maxbytes
+            ):
+                self.size -= len(self._cache.popitem(last=False)[1])
+        return feed
+
+    def parse_file(
+        self,
+        file,
+        to_feed: Callable[..., Feed],
+        compact_ns: bool = False,
+        limits: Limits | None = None,
+    ) -> Feed:
+        """Like :meth:`parse`, reading the document from a file, that can be compressed.
+
+        HTTP and HTTPS URLs are downloaded as by :meth:`parse_url`.
+
+        :raises ValueError: If `file` is an URL of another scheme.
+        :raises FeedLimitError: If one of `limits` is exceeded.
+        :raises FeedXMLError: If the file is not a valid xml.
+        :raises FeedParseError: If the xml is not a feed of the format."""
+        if isinstance(file, str) and "://" in file:
+            if not file.lower().startswith(("http://", "https://")):
+                raise ValueError(f"Unsupported URL '{file}', only http and https are cached")
+            return self.parse_url(file, to_feed, compact_ns, limits)
+        with open_input(file) as f:
+            if limits is not None and limits.max_bytes is not None:
+                data = f.read(limits.max_bytes + 1)
+            else:
+                data = f.read()
+        if isinstance(data, str):
+            # a file opened in text mode, like parse_text
+            data = data.encode("utf-8")
+        return self.parse(data, to_feed, compact_ns, limits)
+
+    def parse_url(
+        self,
+        url: str,
+        to_feed: Callable[..., Feed],
+        compact_ns: bool = False,
+        limits: Limits | None = None,
+        **extra,
+    ) -> Feed:
+        """Like :meth:`parse`, downloading the document from `url`.
+
+        :param extra: Passed to :func:`.remote.fetch_bytes`.
+        :raises ModuleNotFoundError: If `requests` is not available.
+        :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+        :raises FeedLimitError: If one of `limits` is exceeded.
+        :raises FeedXMLError: If the body is not a valid xml.
+        :raises FeedParseError: If the xml is not a feed of the format."""
+        data = fetch_bytes(url, limits=limits, **extra)
+        return self.parse(data, to_feed, compact_ns, limits)
@@ -1,66 +1,125 @@
 """Module to handle RDF (RSS 1.0) feeds."""
 
 from datetime import datetime as dt
+from typing import TYPE_CHECKING, overload
 
 import lxml.etree as ET
 
-from .exceptions import FeedParseError, FeedXMLError, RemoteFeedError
+from . import extensions, media
+from .compression import open_input, open_output
+from .exceptions import FeedParseError, FeedXMLError
 from .feed import Feed, FeedItem
+from .limits import Limits, parse_bytes, parse_stream
+from .remote import fetch_root
 from .utils import (
     NS,
-    add_content_element,
-    add_text_element,
+    PreparedFeed,
+    PreparedItem,
+    add_clean_content_element,
+    add_clean_element,
     dict_append_etree,
-    etree_to_dict,
+    element_data,
     get_text,
+    prepare_feed,
+    serialize,
+    write_tree,
 )
 
-try:
-    import requests
-except ModuleNotFoundError:
-    requests = None  # type: ignore
+if TYPE_CHECKING:
+    from .fetcher import Fetcher
+    from .fragments import FragmentCache
+    from .parsecache import ParseCache
 
 
-def parse_text(text: str) -> Feed:
+def parse_text(
+    text: str,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from a RDF string.v
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
+    if cache is not None:
+        return cache.parse(text.encode("utf-8"), to_feed, compact_ns, limits)
+    if limits is not None:
+        return to_feed(parse_bytes(text.encode("utf-8"), limits), compact_ns)
     try:
         tree = ET.fromstring(text.encode("utf-8"))
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree)
+    return to_feed(tree, compact_ns)
 
 
-def parse_file(file) -> Feed:
+def parse_file(
+    file,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from a RDF file.
 
+    The file can be compressed with gzip, bz2 or xz.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
+    if cache is not None:
+        return cache.parse_file(file, to_feed, compact_ns, limits)
     try:
-        tree = ET.parse(file)
+        with open_input(file) as f:
+            root = ET.parse(f).getroot() if limits is None else parse_stream(f, limits)
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree.getroot())
+    return to_feed(root, compact_ns)
 
 
-def parse_url(url, **extra) -> Feed:
+def parse_url(
+    url,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+    fetcher: "Fetcher | None" = None,
+    **extra,
+) -> Feed:
     """Utility method to generate a :class:`.feed.Feed` from a RDF URL.
 
+    The body is parsed while it is downloaded, or after with a `cache`.
+
+    :param max_bytes: Maximum size of the body.
+    :param timeout: Maximum seconds for the whole download.
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :param fetcher: Download again only what changed since the last call with the same fetcher.
+    :param extra: Passed to `requests.get`.
     :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If one of `limits` is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
-    if not requests:
-        raise ModuleNotFoundError(
-            "No module named 'requests' found, please install it to use this feature"
+    if fetcher is not None:
+        return fetcher.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
         )
-    r = requests.get(url)
-    try:
-        r.raise_for_status()
-    except requests.HTTPError as e:
-        raise RemoteFeedError() from e
-    return parse_text(r.text)
+    if cache is not None:
+        return cache.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
+        )
+    root = fetch_root(url, max_bytes=max_bytes, timeout=timeout, limits=limits, **extra)
+    return to_feed(root, compact_ns)
 
 
 def __parse_iso_datetime(elem: ET.Element, name: str) -> dt | None:
@@ -75,9 +134,10 @@ def __parse_iso_datetime(elem: ET.Element, name: str) -> dt | None:
     return None
 
 
-def to_feed(root) -> Feed:
+def to_feed(root, compact_ns: bool = False) -> Feed:
     """Generate a :class:`.feed.Feed` from a root XML element of an RDF document.
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed.
 
@@ -95,25 +155,39 @@ def to_feed(root) -> Feed:
     feed.update = __parse_iso_datetime(channel, "dc:date")
 
     for item in root.findall("rdfns:item", NS):
-        fitem = FeedItem()
-        fitem.title = get_text(item, "rdfns:title")
-        fitem.url = get_text(item, "rdfns:link")
-        fitem.id = fitem.url
-        fitem.content = get_text(item, "rdfns:description")
-        fitem.update = __parse_iso_datetime(item, "dc:date")
-        fitem.content_type = get_text(item, "dc:format")
-        term = get_text(item, "dc:subject")
-        if term:
-            fitem.categories.append(term)
-        fitem._data = etree_to_dict(item)["{http://purl.org/rss/1.0/}item"] or {}
-        feed.items.append(fitem)
+        feed.items.append(to_item(item, compact_ns))
         root.remove(item)
-    feed._data = etree_to_dict(channel)["{http://purl.org/rss/1.0/}channel"] or {}
+    feed._data = element_data(channel, compact_ns) or {}
     return feed
 
 
-def generate(feed):
-    """Returns a string RDF rappresentation of a feed."""
+def to_item(item: ET.Element, compact_ns: bool = False) -> FeedItem:
+    """Generate a :class:`.feed.FeedItem` from an RDF item element, consuming its children.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+
+    :meta private:"""
+    fitem = FeedItem()
+    fitem.title = get_text(item, "rdfns:title")
+    fitem.url = get_text(item, "rdfns:link")
+    fitem.id = fitem.url
+    fitem.content = get_text(item, "rdfns:description")
+    fitem.update = __parse_iso_datetime(item, "dc:date")
+    fitem.content_type = get_text(item, "dc:format")
+    term = get_text(item, "dc:subject")
+    if term:
+        fitem.categories.append(term)
+    media.extract(item, fitem)
+    extensions.REGISTRY.extract(item, fitem)
+    fitem._data = element_data(item, compact_ns) or {}
+    return fitem
+
+
+def build_channel(prepared: PreparedFeed) -> tuple[ET.Element, ET.Element]:
+    """Build the RDF root element and its channel, without items.
+    The root is also the container of the items.
+
+    :meta private:"""
     nsmap = {
         None: "http://purl.org/rss/1.0/",
         "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
@@ -125,21 +199,116 @@ def generate(feed):
     dc = f"{{{NS['dc']}}}"
     root = ET.Element(f"{rdf}RDF", nsmap=nsmap)
     channel = ET.SubElement(root, f"{ns}channel")
-    add_text_element(channel, "title", feed.title)
-    add_text_element(channel, "link", feed.url)
-    add_text_element(channel, "description", feed.description)
-    if feed.update is not None:
-        add_text_element(channel, f"{dc}date", dt.isoformat(feed.update))
-    dict_append_etree(feed._data, channel)
-    for fitem in feed.items:
-        entry = ET.SubElement(root, f"{ns}item")
-        add_text_element(entry, f"{ns}title", fitem.title)
-        add_text_element(entry, f"{ns}link", fitem.url)
-        add_content_element(entry, f"{ns}description", fitem.content)
-        add_text_element(entry, f"{dc}date", dt.isoformat(fitem.update))
-        add_text_element(entry, f"{dc}format", fitem.content_type)
-        for fcategory in fitem.categories:
-            add_text_element(entry, f"{dc}subject", fcategory)
-        dict_append_etree(fitem._data, entry)
+    add_clean_element(channel, "title", prepared.title)
+    add_clean_element(channel, "link", prepared.url)
+    add_clean_element(channel, "description", prepared.description)
+    add_clean_element(channel, f"{dc}date", prepared.iso)
+    dict_append_etree(prepared.data, channel)
+    return root, root
+
+
+def add_item(root: ET.Element, pitem: PreparedItem) -> ET.Element:
+    """Append to `root` the RDF item of a prepared item.
+
+    :meta private:"""
+    ns = f"{{{NS['rdfns']}}}"
+    dc = f"{{{NS['dc']}}}"
+    entry = ET.SubElement(root, f"{ns}item")
+    add_clean_element(entry, f"{ns}title", pitem.title)
+    add_clean_element(entry, f"{ns}link", pitem.url)
+    add_clean_content_element(entry, f"{ns}description", pitem.content, pitem.content_cdata)
+    add_clean_element(entry, f"{dc}date", pitem.iso)
+    add_clean_element(entry, f"{dc}format", pitem.content_type)
+    for fcategory in pitem.categories:
+        add_clean_element(entry, f"{dc}subject", fcategory)
+    media.append(entry, pitem.source)
+    extensions.REGISTRY.append(entry, pitem.source)
+    dict_append_etree(pitem.data, entry)
+    return entry
+
+
+def build_tree(prepared: PreparedFeed) -> ET.Element:
+    """Build the RDF root element of a prepared feed.
+
+    :meta private:"""
+    root, container = build_channel(prepared)
+    for pitem in prepared.items:
+        add_item(container, pitem)
     ET.cleanup_namespaces(root)
-    return ET.tostring(root, encoding="UTF-8", xml_declaration=True).decode("utf-8")
+    return root
+
+
+def generate_bytes(
+    feed,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> bytes:
+    """Returns the UTF-8 encoded RDF rappresentation of a feed.
+
+    :param cache: If not `None`, reuse the items serialized in previous calls.
+    :param pretty_print: Indent the document, not supported with `cache`.
+    :param with_data: Write also the not managed attributes, in `_data`.
+    :raises ValueError: If both `cache` and `pretty_print` are used."""
+    if cache is not None:
+        if pretty_print:
+            raise ValueError("pretty_print is not supported with a cache")
+        return cache.generate(feed, "rdf", build_channel, add_item, with_data)
+    return serialize(build_tree(prepare_feed(feed, with_data=with_data)), pretty_print)
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    file: None = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> str: ...
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    *,
+    file,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None: ...
+
+
+def generate(feed, cache=None, file=None, pretty_print=False, with_data=True):
+    """Returns a string RDF rappresentation of a feed.
+
+    See :func:`generate_bytes` for the parameters.
+
+    :param file: Write the encoded document to `file` instead, see :func:`write_file`."""
+    if file is not None:
+        write_file(feed, file, cache=cache, pretty_print=pretty_print, with_data=with_data)
+        return None
+    return generate_bytes(feed, cache, pretty_print, with_data).decode("utf-8")
+
+
+def write_file(
+    feed,
+    file,
+    compression: str | None = None,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None:
+    """Write the RDF rappresentation of a feed to `file` (a path or a binary file object).
+
+    See :func:`generate_bytes` for the other parameters.
+
+    :param compression: `gzip`, `bz2`, `xz` or `None`.
+        If `file` is a path, by default it is guessed from its suffix."""
+    if cache is not None:
+        data = generate_bytes(feed, cache, pretty_print, with_data)
+        with open_output(file, compression) as f:
+            f.write(data)
+        return
+    root = build_tree(prepare_feed(feed, with_data=with_data))
+    with open_output(file, compression) as f:
+        write_tree(root, f, pretty_print)
@@ -0,0 +1,197 @@
+"""Module to read feeds from remote URLs."""
+
+import contextlib
+import socket
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import lxml.etree as ET
+
+from .exceptions import FeedLimitError, FeedXMLError, RemoteFeedError
+from .limits import LimitedParser, Limits
+
+CHUNK_SIZE = 64 * 1024
+"""Size of the chunks read from the network and passed to the parser."""
+
+
+def _requests():
+    """Returns the `requests` module, imported only when a feed is downloaded.
+
+    :raises ModuleNotFoundError: If `requests` is not available.
+
+    :meta private:"""
+    try:
+        import requests
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(
+            "No module named 'requests' found, please install it to use this feature"
+        ) from None
+    return requests
+
+
+def _socket(r) -> socket.socket | None:
+    """Returns the socket of a streamed response, `None` if not reachable.
+
+    The socket is not exposed by `requests` and `urllib3`: without it every read waits
+    at most the `timeout` passed to `requests`, and the deadline is checked between reads,
+    so a download can last up to twice its timeout.
+
+    :meta private:"""
+    try:
+        sock = r.raw._fp.fp.raw._sock
+    except Exception:
+        return None
+    return sock if isinstance(sock, socket.socket) else None
+
+
+@contextlib.contextmanager
+def _open(
+    url: str,
+    max_bytes: int | None,
+    timeout: float | None,
+    chunk_size: int,
+    limits: Limits | None,
+    **extra,
+) -> Iterator[tuple[Any, Iterator[bytes]]]:
+    """Download `url`, yields the response, after checking status and size,
+    and an iterator over the chunks of the body that checks the limits.
+
+    :meta private:"""
+    requests = _requests()
+    import urllib3
+
+    if timeout is not None:
+        extra.setdefault("timeout", timeout)
+        deadline = time.monotonic() + timeout
+    try:
+        r = requests.get(url, stream=True, **extra)
+    except requests.Timeout as e:
+        raise RemoteFeedError(f"Timeout reading {url}") from e
+    except requests.RequestException as e:
+        raise RemoteFeedError(f"Unable to read {url}") from e
+
+    sock = _socket(r)
+    read1 = getattr(r.raw, "read1", None)
+
+    def read_chunk() -> bytes:
+        if timeout is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RemoteFeedError(f"Timeout reading {url}")
+            if sock is not None and sock.fileno() != -1:
+                with contextlib.suppress(OSError):
+                    sock.settimeout(min(remaining, timeout))
+        if read1 is not None:
+            # returns what is available, without waiting for a whole chunk
+            return read1(chunk_size, decode_content=True)
+        return r.raw.read(chunk_size, decode_content=True)
+
+    def chunks() -> Iterator[bytes]:
+        read = 0
+        try:
+            while chunk := read_chunk():
+                read += len(chunk)
+                if max_bytes is not None and read > max_bytes:
+                    raise RemoteFeedError(f"Body of {url} exceeds {max_bytes} bytes")
+                yield chunk
+        except (requests.Timeout, urllib3.exceptions.TimeoutError, TimeoutError) as e:
+            raise RemoteFeedError(f"Timeout reading {url}") from e
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+            raise RemoteFeedError(f"Unable to read {url}") from e
+
+    with r:
+        try:
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            raise RemoteFeedError() from e
+        if max_bytes is not None:
+            length = r.headers.get("Content-Length", "")
+            if length.isascii() and length.isdecimal() and int(length) > max_bytes:
+                raise RemoteFeedError(f"Body of {url} exceeds {max_bytes} bytes")
+        if limits is not None and limits.max_bytes is not None:
+            length = r.headers.get("Content-Length", "")
+            if length.isascii() and length.isdecimal() and int(length) > limits.max_bytes:
+                raise FeedLimitError(f"Document larger than {limits.max_bytes} bytes")
+        yield r, chunks()
+
+
+def _iter_body(
+    url: str,
+    max_bytes: int | None,
+    timeout: float | None,
+    chunk_size: int,
+    limits: Limits | None,
+    **extra,
+) -> Iterator[bytes]:
+    """Download `url`, yields the chunks of the body after checking the limits.
+
+    :meta private:"""
+    with _open(url, max_bytes, timeout, chunk_size, limits, **extra) as (_, chunks):
+        yield from chunks
+
+
+def _parse_chunks(chunks: Iterator[bytes], limits: Limits | None) -> ET.Element:
+    """Passes every chunk to the parser as soon as it is received, returns the root element.
+
+    :meta private:"""
+    parser = ET.XMLParser() if limits is None else LimitedParser(limits)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.close()
+    except ET.ParseError as e:
+        raise FeedXMLError("Not a valid XML document") from e
+
+
+def fetch_root(
+    url: str,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    limits: Limits | None = None,
+    **extra,
+) -> ET.Element:
+    """Download `url` and parse it while it arrives, returns the root XML element.
+
+    Every chunk of the body is passed to the parser as soon as it is received,
+    so the whole document is never kept in memory as bytes.
+
+    :param max_bytes: Maximum size of the body, if exceeded the download is aborted.
+    :param timeout: Maximum seconds for the whole download.
+    :param limits: Resource limits checked while parsing.
+    :param extra: Passed to `requests.get`.
+    :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If one of `limits` is exceeded.
+    :raises FeedXMLError: If the body is not a valid xml.
+
+    :meta private:"""
+    return _parse_chunks(_iter_body(url, max_bytes, timeout, chunk_size, limits, **extra), limits)
+
+
+def fetch_bytes(
+    url: str,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    limits: Limits | None = None,
+    **extra,
+) -> bytes:
+    """Download `url`, returns the whole body.
+
+    See :func:`fetch_root` for the parameters, `limits` are checked only against the size.
+
+    :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If the body is larger than `limits.max_bytes`.
+
+    :meta private:"""
+    chunks = []
+    read = 0
+    for chunk in _iter_body(url, max_bytes, timeout, chunk_size, limits, **extra):
+        read += len(chunk)
+        if limits is not None and limits.max_bytes is not None and read > limits.max_bytes:
+            raise FeedLimitError(f"Document larger than {limits.max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
@@ -1,71 +1,127 @@
 """Module to handle RSS feeds."""
 
-from email.utils import format_datetime, parsedate_to_datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, overload
 
 import lxml.etree as ET
 
-from .exceptions import FeedParseError, FeedXMLError, RemoteFeedError
+from . import extensions, media
+from .compression import open_input, open_output
+from .exceptions import FeedParseError, FeedXMLError
 from .feed import Feed, FeedItem
+from .limits import Limits, parse_bytes, parse_stream
+from .remote import fetch_root
 from .utils import (
     NS,
-    add_content_element,
-    add_text_element,
+    PreparedFeed,
+    PreparedItem,
+    add_clean_content_element,
+    add_clean_element,
     dict_append_etree,
-    etree_to_dict,
+    element_data,
     get_text,
+    prepare_feed,
+    serialize,
+    write_tree,
 )
 
-try:
-    import requests
-except ModuleNotFoundError:
-    requests = None  # type: ignore
-
-from typing import TYPE_CHECKING
-
 if TYPE_CHECKING:
     from datetime import datetime as dt
 
+    from .fetcher import Fetcher
+    from .fragments import FragmentCache
+    from .parsecache import ParseCache
+
 
-def parse_text(text: str) -> Feed:
+def parse_text(
+    text: str,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from a RSS string.
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
+    if cache is not None:
+        return cache.parse(text.encode("utf-8"), to_feed, compact_ns, limits)
+    if limits is not None:
+        return to_feed(parse_bytes(text.encode("utf-8"), limits), compact_ns)
     try:
         tree = ET.fromstring(text.encode("utf-8"))
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree)
+    return to_feed(tree, compact_ns)
 
 
-def parse_file(file) -> Feed:
+def parse_file(
+    file,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+) -> Feed:
     """Generate a :class:`.feed.Feed` from a RSS file.
 
+    The file can be compressed with gzip, bz2 or xz.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes,
+        like ``media:content``.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :raises FeedLimitError: If a limit is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
+    if cache is not None:
+        return cache.parse_file(file, to_feed, compact_ns, limits)
     try:
-        tree = ET.parse(file)
+        with open_input(file) as f:
+            root = ET.parse(f).getroot() if limits is None else parse_stream(f, limits)
     except ET.ParseError as e:
         raise FeedXMLError("Not a valid XML document") from e
-    return to_feed(tree.getroot())
+    return to_feed(root, compact_ns)
 
 
-def parse_url(url, **extra) -> Feed:
+def parse_url(
+    url,
+    max_bytes: int | None = None,
+    timeout: float | None = None,
+    compact_ns: bool = False,
+    limits: Limits | None = None,
+    cache: "ParseCache | None" = None,
+    fetcher: "Fetcher | None" = None,
+    **extra,
+) -> Feed:
     """Utility method to generate a :class:`.feed.Feed` from a RSS URL.
 
+    The body is parsed while it is downloaded, or after with a `cache`.
+
+    :param max_bytes: Maximum size of the body.
+    :param timeout: Maximum seconds for the whole download.
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+    :param limits: Resource limits checked while parsing.
+    :param cache: Returns a copy of the feed if the same document was already parsed.
+    :param fetcher: Download again only what changed since the last call with the same fetcher.
+    :param extra: Passed to `requests.get`.
     :raises ModuleNotFoundError: If `requests` is not available.
+    :raises RemoteFeedError: If the HTTP status is not ok or a limit is exceeded.
+    :raises FeedLimitError: If one of `limits` is exceeded.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed."""
-    if not requests:
-        raise ModuleNotFoundError(
-            "No module named 'requests' found, please install it to use this feature"
+    if fetcher is not None:
+        return fetcher.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
         )
-    r = requests.get(url)
-    try:
-        r.raise_for_status()
-    except requests.HTTPError as e:
-        raise RemoteFeedError() from e
-    return parse_text(r.text)
+    if cache is not None:
+        return cache.parse_url(
+            url, to_feed, compact_ns, limits, max_bytes=max_bytes, timeout=timeout, **extra
+        )
+    root = fetch_root(url, max_bytes=max_bytes, timeout=timeout, limits=limits, **extra)
+    return to_feed(root, compact_ns)
 
 
 def __parse_rfc2822_datetime(elem: ET.Element, name: str) -> "dt | None":
@@ -78,9 +134,10 @@ def __parse_rfc2822_datetime(elem: ET.Element, name: str) -> "dt | None":
     return None
 
 
-def to_feed(root) -> Feed:
+def to_feed(root, compact_ns: bool = False) -> Feed:
     """Generate a :class:`.feed.Feed` from a root XML element of an RSS document.
 
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
     :raises FeedXMLError: If string is not a valid xml.
     :raises FeedParseError: If the xml is not an RSS feed.
 
@@ -101,42 +158,149 @@ def to_feed(root) -> Feed:
         channel, "lastBuildDate"
     )
     for item in channel.findall("item"):
-        fitem = FeedItem()
-        fitem.url = get_text(item, "link")
-        fitem.title = get_text(item, "title")
-        fitem.id = get_text(item, "guid")
-        fitem.content = get_text(item, "description")
-        fitem.update = __parse_rfc2822_datetime(item, "pubDate")
-        for category in item.findall("category"):
-            if category.text:
-                fitem.categories.append(category.text)
-                item.remove(category)
-        fitem._data = etree_to_dict(item)["item"] or {}
-        feed.items.append(fitem)
+        feed.items.append(to_item(item, compact_ns))
         channel.remove(item)
-    feed._data = etree_to_dict(channel)["channel"] or {}
+    feed._data = element_data(channel, compact_ns) or {}
     return feed
 
 
-def generate(feed):
-    """Returns a string RSS rappresentation of a feed."""
+def to_item(item: ET.Element, compact_ns: bool = False) -> FeedItem:
+    """Generate a :class:`.feed.FeedItem` from an RSS item element, consuming its children.
+
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+
+    :meta private:"""
+    fitem = FeedItem()
+    fitem.url = get_text(item, "link")
+    fitem.title = get_text(item, "title")
+    fitem.id = get_text(item, "guid")
+    fitem.content = get_text(item, "description")
+    fitem.update = __parse_rfc2822_datetime(item, "pubDate")
+    for category in item.findall("category"):
+        if category.text:
+            fitem.categories.append(category.text)
+            item.remove(category)
+    media.extract(item, fitem)
+    extensions.REGISTRY.extract(item, fitem)
+    fitem._data = element_data(item, compact_ns) or {}
+    return fitem
+
+
+def build_channel(prepared: PreparedFeed) -> tuple[ET.Element, ET.Element]:
+    """Build the RSS root element and its channel, without items.
+
+    :meta private:"""
     root = ET.Element("rss", nsmap=NS)
     root.set("version", "2.0")
     channel = ET.SubElement(root, "channel")
-    add_text_element(channel, "title", feed.title)
-    add_text_element(channel, "description", feed.description)
-    add_text_element(channel, "pubDate", feed.update, lambda x: format_datetime(x))
-    add_text_element(channel, "link", feed.url)
-    dict_append_etree(feed._data, channel)
-    for fitem in feed.items:
-        item = ET.SubElement(channel, "item")
-        add_text_element(item, "title", fitem.title)
-        add_text_element(item, "guid", fitem.id)
-        add_text_element(item, "pubDate", fitem.update, lambda x: format_datetime(x))
-        add_text_element(item, "link", fitem.url)
-        add_content_element(item, "description", fitem.content)
-        for fcategory in fitem.categories:
-            add_text_element(item, "category", fcategory)
-        dict_append_etree(fitem._data, item)
+    add_clean_element(channel, "title", prepared.title)
+    add_clean_element(channel, "description", prepared.description)
+    add_clean_element(channel, "pubDate", prepared.rfc822)
+    add_clean_element(channel, "link", prepared.url)
+    dict_append_etree(prepared.data, channel)
+    return root, channel
+
+
+def add_item(channel: ET.Element, pitem: PreparedItem) -> ET.Element:
+    """Append to `channel` the RSS item of a prepared item.
+
+    :meta private:"""
+    item = ET.SubElement(channel, "item")
+    add_clean_element(item, "title", pitem.title)
+    add_clean_element(item, "guid", pitem.id)
+    add_clean_element(item, "pubDate", pitem.rfc822)
+    add_clean_element(item, "link", pitem.url)
+    add_clean_content_element(item, "description", pitem.content, pitem.content_cdata)
+    for fcategory in pitem.categories:
+        add_clean_element(item, "category", fcategory)
+    media.append(item, pitem.source)
+    extensions.REGISTRY.append(item, pitem.source)
+    dict_append_etree(pitem.data, item)
+    return item
+
+
+def build_tree(prepared: PreparedFeed) -> ET.Element:
+    """Build the RSS root element of a prepared feed.
+
+    :meta private:"""
+    root, channel = build_channel(prepared)
+    for pitem in prepared.items:
+        add_item(channel, pitem)
     ET.cleanup_namespaces(root)
-    return ET.tostring(root, encoding="UTF-8", xml_declaration=True).decode("utf-8")
+    return root
+
+
+def generate_bytes(
+    feed,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> bytes:
+    """Returns the UTF-8 encoded RSS rappresentation of a feed.
+
+    :param cache: If not `None`, reuse the items serialized in previous calls.
+    :param pretty_print: Indent the document, not supported with `cache`.
+    :param with_data: Write also the not managed attributes, in `_data`.
+    :raises ValueError: If both `cache` and `pretty_print` are used."""
+    if cache is not None:
+        if pretty_print:
+            raise ValueError("pretty_print is not supported with a cache")
+        return cache.generate(feed, "rss", build_channel, add_item, with_data)
+    return serialize(build_tree(prepare_feed(feed, with_data=with_data)), pretty_print)
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    file: None = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> str: ...
+
+
+@overload
+def generate(
+    feed,
+    cache: "FragmentCache | None" = None,
+    *,
+    file,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None: ...
+
+
+def generate(feed, cache=None, file=None, pretty_print=False, with_data=True):
+    """Returns a string RSS rappresentation of a feed.
+
+    See :func:`generate_bytes` for the parameters.
+
+    :param file: Write the encoded document to `file` instead, see :func:`write_file`."""
+    if file is not None:
+        write_file(feed, file, cache=cache, pretty_print=pretty_print, with_data=with_data)
+        return None
+    return generate_bytes(feed, cache, pretty_print, with_data).decode("utf-8")
+
+
+def write_file(
+    feed,
+    file,
+    compression: str | None = None,
+    cache: "FragmentCache | None" = None,
+    pretty_print: bool = False,
+    with_data: bool = True,
+) -> None:
+    """Write the RSS rappresentation of a feed to `file` (a path or a binary file object).
+
+    See :func:`generate_bytes` for the other parameters.
+
+    :param compression: `gzip`, `bz2`, `xz` or `None`.
+        If `file` is a path, by default it is guessed from its suffix."""
+    if cache is not None:
+        data = generate_bytes(feed, cache, pretty_print, with_data)
+        with open_output(file, compression) as f:
+            f.write(data)
+        return
+    root = build_tree(prepare_feed(feed, with_data=with_data))
+    with open_output(file, compression) as f:
+        write_tree(root, f, pretty_print)
@@ -0,0 +1,333 @@
+"""Module to search items by words, with an incremental inverted index."""
+
+import bisect
+import re
+from array import array
+from collections.abc import Iterable
+
+import lxml.etree as ET
+import lxml.html
+
+from .content import html_text
+from .feed import Feed, FeedItem
+from .fragments import fingerprint
+
+_WORD = re.compile(r"\w+")
+_QUERY_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+_MAGIC = b"FEIDX\x01"
+
+
+def strip_tags(html: str) -> str:
+    """Returns the text of an HTML fragment, with a space between blocks."""
+    if "<" not in html and "&" not in html:
+        return html
+    try:
+        return html_text(lxml.html.fragment_fromstring(html, create_parent="div"))
+    except (ET.ParserError, ValueError):
+        return html
+
+
+def tokenize(text: str) -> list[str]:
+    """Returns the lowercase words of `text`."""
+    return _WORD.findall(text.lower())
+
+
+def item_terms(fitem: FeedItem) -> set[str]:
+    """Returns the words of the title, of the content (without tags) and of the categories."""
+    terms = set()
+    if fitem.title:
+        terms.update(tokenize(fitem.title))
+    if fitem.content:
+        terms.update(tokenize(strip_tags(fitem.content)))
+    for category in fitem.categories:
+        terms.update(tokenize(category))
+    return terms
+
+
+class QuerySyntaxError(ValueError):
+    """The search query is not valid."""
+
+
+class InvertedIndex:
+    """An inverted index of items, identified by a string key.
+
+    Every word points to the sorted array of the documents containing it.
+    Items are added, changed and removed incrementally, see :meth:`index_feed`.
+
+    Queries (see :meth:`search`) support implicit ``AND``, ``OR``, ``NOT`` (or ``-word``),
+    parentheses and prefixes (``word*``). Tokens without letters or digits are ignored.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, array] = {}
+        self._docs: dict[str, int] = {}
+        """Document id by key."""
+        self._keys: dict[int, str] = {}
+        """Key by document id."""
+        self._terms: dict[int, tuple[str, ...]] = {}
+        """Words by document id."""
+        self._fingerprints: dict[int, bytes] = {}
+        self._sources: dict[str | None, set[str]] = {}
+        self._source_of: dict[int, str | None] = {}
+        self._next_id = 0
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._docs
+
+    def add(self, key: str, fitem: FeedItem, source: str | None = None) -> bool:
+        """Index `fitem` as `key`, replacing a previous item with the same key.
+
+        :param source: The feed of the item, see :meth:`index_feed`.
+        :returns: `False` if the item was already indexed without changes."""
+        digest = fingerprint(fitem)
+        docid = self._docs.get(key)
+        if docid is not None:
+            if self._fingerprints[docid] == digest and self._source_of[docid] == source:
+                return False
+            self.remove(key)
+        docid = self._next_id
+        self._next_id += 1
+        terms = tuple(sorted(item_terms(fitem)))
+        self._add_doc(docid, key, source, digest, terms)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = array("I", [docid])
+                self._vocabulary = None
+            else:
+                postings.append(docid)
+        return True
+
+    def _add_doc(self, docid, key, source, digest, terms) -> None:
+        self._docs[key] = docid
+        self._keys[docid] = key
+        self._terms[docid] = terms
+        self._fingerprints[docid] = digest
+        self._source_of[docid] = source
+        self._sources.setdefault(source, set()).add(key)
+
+    def remove(self, key: str) -> bool:
+        """Remove the item `key` from the index.
+
+        :returns: `False` if the item was not indexed."""
+        docid = self._docs.pop(key, None)
+        if docid is None:
+            return False
+        del self._keys[docid]
+        del self._fingerprints[docid]
+        source = self._source_of.pop(docid)
+        self._sources[source].discard(key)
+        if not self._sources[source]:
+            del self._sources[source]
+        for term in self._terms.pop(docid):
+            postings = self._postings[term]
+            i = bisect.bisect_left(postings, docid)
+            postings.pop(i)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary = None
+        return True
+
+    def index_feed(self, feed: Feed, source: str) -> tuple[int, int]:
+        """Index the items of `feed`, a new version of the feed `source`.
+
+        Only new or changed items are indexed again,
+        items of `source` not in `feed` anymore are removed.
+        Items are identified by `source` and by their id (or url, or title).
+
+        :returns: The numbers of items indexed and removed."""
+        old = set(self._sources.get(source, ()))
+        added = 0
+        for fitem in feed.items:
+            key = f"{source}\n{fitem.id or fitem.url or fitem.title}"
+            old.discard(key)
+            if self.add(key, fitem, source):
+                added += 1
+        for key in old:
+            self.remove(key)
+        return added, len(old)
+
+    def remove_feed(self, source: str) -> int:
+        """Remove every item of the feed `source`.
+
+        :returns: The number of items removed."""
+        keys = list(self._sources.get(source, ()))
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def _term(self, term: str) -> set[int]:
+        if term.endswith("*"):
+            prefix = term[:-1].lower()
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self._postings)
+            result: set[int] = set()
+            i = bisect.bisect_left(self._vocabulary, prefix)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+                result.update(self._postings[self._vocabulary[i]])
+                i += 1
+            return result
+        words = tokenize(term)
+        if not words:
+            return set()
+        result = set(self._postings.get(words[0], ()))
+        for word in words[1:]:
+            result.intersection_update(self._postings.get(word, ()))
+        return result
+
+    def search(self, query: str) -> list[str]:
+        """Returns the keys of the items matching `query`, oldest indexed first.
+
+        :raises QuerySyntaxError: If the query is not valid."""
+        # tokens without words, like "-" or "…", are ignored
+        tokens = [t for t in _QUERY_TOKEN.findall(query) if t in "()" or _WORD.search(t)]
+        if not tokens:
+            return []
+        result, position = self._or(tokens, 0)
+        if position != len(tokens):
+            raise QuerySyntaxError(f"Unexpected '{tokens[position]}'")
+        return [self._keys[docid] for docid in sorted(result)]
+
+    def _or(self, tokens: list[str], i: int) -> tuple[set[int], int]:
+        result, i = self._and(tokens, i)
+        while i < len(tokens) and tokens[i] == "OR":
+            other, i = self._and(tokens, i + 1)
+            result = result | other
+        return result, i
+
+    def _and(self, tokens: list[str], i: int) -> tuple[set[int], int]:
+        result, i = self._not(tokens, i)
+        while i < len(tokens) and tokens[i] not in ("OR", ")"):
+            if tokens[i] == "AND":
+                i += 1
+            other, i = self._not(tokens, i)
+            result = result & other
+        return result, i
+
+    def _not(self, tokens: list[str], i: int) -> tuple[set[int], int]:
+        if i >= len(tokens):
+            raise QuerySyntaxError("Unexpected end of query")
+        token = tokens[i]
+        if token == "NOT" or (token.startswith("-") and len(token) > 1):
+            if token == "NOT":
+                operand, i = self._not(tokens, i + 1)
+            else:
+                operand, i = self._term(token[1:]), i + 1
+            return set(self._keys) - operand, i
+        if token == "(":
+            result, i = self._or(tokens, i + 1)
+            if i >= len(tokens) or tokens[i] != ")":
+                raise QuerySyntaxError("Missing ')'")
+            return result, i + 1
+        if token in ("OR", "AND", ")"):
+            raise QuerySyntaxError(f"Unexpected '{token}'")
+        return self._term(token), i + 1
+
+    def save(self, file) -> None:
+        """Write the index to `file` (a path or a binary file object).
+
+        Postings are written as variable length deltas."""
+        out = bytearray(_MAGIC)
+        _write_varint(out, self._next_id)
+        _write_varint(out, len(self._keys))
+        for docid, key in self._keys.items():
+            _write_varint(out, docid)
+            _write_string(out, key)
+            source = self._source_of[docid]
+            _write_string(out, "" if source is None else "\n" + source)
+            out += self._fingerprints[docid]
+        _write_varint(out, len(self._postings))
+        for term, postings in self._postings.items():
+            _write_string(out, term)
+            _write_varint(out, len(postings))
+            previous = 0
+            for docid in postings:
+                _write_varint(out, docid - previous)
+                previous = docid
+        if isinstance(file, str) or hasattr(file, "__fspath__"):
+            with open(file, "wb") as f:
+                f.write(out)
+        else:
+            file.write(out)
+
+    @classmethod
+    def load(cls, file) -> "InvertedIndex":
+        """Read an index written by :meth:`save`.
+
+        :raises ValueError: If the file is not a saved index."""
+        if isinstance(file, str) or hasattr(file, "__fspath__"):
+            with open(file, "rb") as f:
+                data = memoryview(f.read())
+        else:
+            data = memoryview(file.read())
+        if bytes(data[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError("Not a saved index")
+        index = cls()
+        pos = len(_MAGIC)
+        index._next_id, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        docs = []
+        for _ in range(count):
+            docid, pos = _read_varint(data, pos)
+            key, pos = _read_string(data, pos)
+            stored, pos = _read_string(data, pos)
+            digest = bytes(data[pos : pos + 16])
+            pos += 16
+            docs.append((docid, key, stored[1:] if stored else None, digest))
+        terms: dict[int, list[str]] = {docid: [] for docid, *_ in docs}
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            term, pos = _read_string(data, pos)
+            size, pos = _read_varint(data, pos)
+            postings = array("I")
+            docid = 0
+            for _ in range(size):
+                delta, pos = _read_varint(data, pos)
+                docid += delta
+                postings.append(docid)
+                terms[docid].append(term)
+            index._postings[term] = postings
+        for docid, key, source, digest in docs:
+            index._add_doc(docid, key, source, digest, tuple(sorted(terms[docid])))
+        return index
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: memoryview, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_string(out: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8")
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_string(data: memoryview, pos: int) -> tuple[str, int]:
+    size, pos = _read_varint(data, pos)
+    return bytes(data[pos : pos + size]).decode("utf-8"), pos + size
+
+
+def index_feeds(feeds: Iterable[tuple[str, Feed]]) -> InvertedIndex:
+    """Returns a new index of the `(source, feed)` pairs."""
+    index = InvertedIndex()
+    for source, feed in feeds:
+        index.index_feed(feed, source)
+    return index
@@ -0,0 +1,201 @@
+"""Module to remember the items already seen, with a Bloom filter in front of SQLite."""
+
+import hashlib
+import math
+import sqlite3
+from collections.abc import Callable, Iterable
+
+from .feed import Feed, FeedItem
+
+_BATCH = 500
+
+
+def item_key(fitem: FeedItem) -> str | None:
+    """Returns the id, or the url, or the title of `fitem`."""
+    return fitem.id or fitem.url or fitem.title
+
+
+def digest(key: str) -> bytes:
+    """Returns the 16 bytes digest stored for `key`."""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """A set of digests that can answer "maybe" but never forgets.
+
+    :param capacity: Expected number of digests.
+    :param fp_rate: False positive rate with `capacity` digests.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, fp_rate: float = 0.01):
+        if capacity < 1 or not 0 < fp_rate < 1:
+            raise ValueError("capacity must be positive and fp_rate between 0 and 1")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        """Number of bits."""
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        """Number of bits set by every digest."""
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        """Number of digests added, not counting the ones already in the filter."""
+
+    def _positions(self, value: bytes) -> list[int]:
+        h1 = int.from_bytes(value[:8], "little")
+        h2 = int.from_bytes(value[8:16], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value: bytes) -> bool:
+        """Add a digest of at least 16 bytes.
+
+        :returns: `False` if the digest was already in the filter, or a false positive."""
+        bits = self.bits
+        new = False
+        for p in self._positions(value):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, value: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.bits.__sizeof__()
+
+
+class SeenStore:
+    """The items already seen, stored as digests in a SQLite database.
+
+    A :class:`BloomFilter` answers most lookups of new items without reading the database.
+    The filter is saved in the database by :meth:`close` and rebuilt when opening
+    if it was not saved or was created with other parameters.
+
+    :param path: The SQLite database, `":memory:"` for a temporary store.
+    :param capacity: Expected number of items, see :class:`BloomFilter`.
+    :param fp_rate: False positive rate of the filter, see :class:`BloomFilter`.
+    :param key: Returns the string identifying an item, `None` if the item can not be
+        identified: such items are always new.
+
+    A store can be used by more threads, one at a time.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        capacity: int = 1_000_000,
+        fp_rate: float = 0.01,
+        key: Callable[[FeedItem], str | None] = item_key,
+    ):
+        self.key = key
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS bloom "
+            "(id INTEGER PRIMARY KEY, capacity INTEGER, fp_rate REAL, count INTEGER, bits BLOB)"
+        )
+        self.bloom = BloomFilter(capacity, fp_rate)
+        row = self._db.execute("SELECT capacity, fp_rate, count, bits FROM bloom").fetchone()
+        if row and row[0] == capacity and row[1] == fp_rate and len(row[3]) == len(self.bloom.bits):
+            self.bloom.count = row[2]
+            self.bloom.bits[:] = row[3]
+        else:
+            for (value,) in self._db.execute("SELECT digest FROM seen"):
+                self.bloom.add(value)
+        self._db.execute("DELETE FROM bloom")
+        self._db.commit()
+
+    def __enter__(self) -> "SeenStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Save the filter and close the database."""
+        with self._db:
+            self._db.execute(
+                "INSERT INTO bloom VALUES (0, ?, ?, ?, ?)",
+                (self.bloom.capacity, self.bloom.fp_rate, self.bloom.count, bytes(self.bloom.bits)),
+            )
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM seen").fetchone()[0]
+
+    def __contains__(self, fitem: FeedItem) -> bool:
+        key = self.key(fitem)
+        if key is None:
+            return False
+        value = digest(key)
+        if value not in self.bloom:
+            return False
+        return (
+            self._db.execute("SELECT 1 FROM seen WHERE digest = ?", (value,)).fetchone() is not None
+        )
+
+    def _seen(self, values: list[bytes]) -> set[bytes]:
+        """Returns the digests in the database, among `values`."""
+        found: set[bytes] = set()
+        for i in range(0, len(values), _BATCH):
+            batch = values[i : i + _BATCH]
+            query = f"SELECT digest FROM seen WHERE digest IN ({','.join('?' * len(batch))})"
+            found.update(row[0] for row in self._db.execute(query, batch))
+        return found
+
+    def _add(self, values: Iterable[bytes]) -> None:
+        """Insert `values`, inside a transaction."""
+        values = list(values)
+        self._db.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((v,) for v in values))
+        for value in values:
+            self.bloom.add(value)
+
+    def _digests(self, items: Iterable[FeedItem]) -> set[bytes]:
+        keys = (self.key(fitem) for fitem in items)
+        return {digest(key) for key in keys if key is not None}
+
+    def add(self, items: Iterable[FeedItem]) -> None:
+        """Mark `items` as seen."""
+        with self._db:
+            self._add(self._digests(items))
+
+    def bulk_load(self, feeds: Iterable[Feed]) -> None:
+        """Mark the items of `feeds` as seen, in one transaction."""
+        with self._db:
+            for feed in feeds:
+                self._add(self._digests(feed.items))
+
+    def filter_new(self, feed: Feed, mark: bool = True) -> list[FeedItem]:
+        """Returns the items of `feed` never seen before, in order.
+
+        An item repeated in `feed` is returned once.
+
+        :param mark: Mark the returned items as seen."""
+        values: list[bytes | None] = []
+        candidates = []
+        for fitem in feed.items:
+            key = self.key(fitem)
+            value = None if key is None else digest(key)
+            values.append(value)
+            if value is not None and value in self.bloom:
+                candidates.append(value)
+        seen = self._seen(candidates) if candidates else set()
+        result = []
+        new = []
+        for fitem, value in zip(feed.items, values, strict=True):
+            if value is None:
+                result.append(fitem)
+            elif value not in seen:
+                seen.add(value)
+                new.append(value)
+                result.append(fitem)
+        if mark and new:
+            with self._db:
+                self._add(new)
+        return result
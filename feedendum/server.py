@@ -0,0 +1,308 @@
+"""Module to serve generated feeds over WSGI and ASGI, with caching and conditional requests."""
+
+import asyncio
+import dataclasses
+import gzip
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from . import extensions, multi
+from .feed import Feed
+from .fragments import FragmentCache, fingerprint
+
+CONTENT_TYPES = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "rdf": "application/rdf+xml; charset=utf-8",
+}
+"""Content type of every format."""
+
+CHUNK_SIZE = 64 * 1024
+"""Size of the chunks of the response bodies."""
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+def feed_fingerprint(feed: Feed) -> bytes:
+    """Returns a digest of the managed fields and `_data` of `feed` and of its items,
+    and of the version of the extension handlers that write them."""
+    digest = hashlib.blake2b(digest_size=16)
+    key = (
+        feed.title,
+        feed.url,
+        feed.description,
+        feed.update,
+        feed._data,
+        extensions.REGISTRY.version,
+    )
+    digest.update(repr(key).encode("utf-8"))
+    for fitem in feed.items:
+        digest.update(fingerprint(fitem))
+    return digest.digest()
+
+
+def _newest(feed: Feed) -> datetime | None:
+    """Returns the newest of the update dates of `feed` and of its items, in UTC.
+
+    :meta private:"""
+    dates = [
+        date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+        for date in (feed.update, *(fitem.update for fitem in feed.items))
+        if date is not None
+    ]
+    if not dates:
+        return None
+    return max(dates).astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _text_headers(status: int) -> list[tuple[str, str]]:
+    return [("Content-Type", "text/plain"), ("Content-Length", str(len(_REASONS[status])))]
+
+
+def _accepts_gzip(header: str) -> bool:
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if name in ("gzip", "x-gzip", "*"):
+            q = params.strip()
+            if q.startswith("q="):
+                try:
+                    return float(q[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of `etag` with the tags of an `If-None-Match` header."""
+    for part in header.split(","):
+        tag = part.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclasses.dataclass(kw_only=True)
+class _Entry:
+    feed: Feed
+    fmt: str
+    fingerprint: bytes
+    checked: float
+    body: bytes
+    etag: str
+    last_modified: datetime | None
+    gzip_body: bytes | None = None
+
+
+class FeedApp:
+    """A WSGI application serving feeds, also usable as an ASGI application with :meth:`asgi`.
+
+    Every feed is generated once and kept until it changes:
+    a change is noticed by its fingerprint, computed at most every `check_interval` seconds,
+    or after :meth:`invalidate`.
+
+    Responses have a strong `ETag` and a `Last-Modified` header, the newest update date
+    of the feed and of its items (omitted if there is none, and later than the previous one
+    if the feed changed without a newer date), conditional requests get a `304 Not Modified`,
+    bodies are compressed with gzip if accepted and sent in chunks.
+
+    :param check_interval: Seconds between the checks of the changes of a feed,
+        `0` to check at every request.
+    :param fragments: Shared by the generations, to serialize only the changed items.
+    """
+
+    def __init__(self, check_interval: float = 1.0, fragments: FragmentCache | None = None):
+        self.check_interval = check_interval
+        self.fragments = fragments
+        self._routes: dict[str, tuple[Feed, str]] = {}
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def add(self, path: str, feed: Feed, fmt: str = "atom") -> None:
+        """Serve `feed` in format `fmt` at `path`, replacing the feed already there.
+
+        :raises ValueError: If the format is not supported."""
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported format '{fmt}'")
+        with self._lock:
+            self._routes[path] = (feed, fmt)
+            self._entries.pop(path, None)
+
+    def remove(self, path: str) -> None:
+        """Stop serving `path`."""
+        with self._lock:
+            self._routes.pop(path, None)
+            self._entries.pop(path, None)
+
+    def invalidate(self, path: str | None = None) -> None:
+        """Generate again the feed at `path`, or every feed, at the next request."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def _entry(self, path: str) -> _Entry | None:
+        now = time.monotonic()
+        with self._lock:
+            route = self._routes.get(path)
+            entry = self._entries.get(path)
+        if route is None:
+            return None
+        feed, fmt = route
+        if entry is not None and entry.feed is feed and now - entry.checked < self.check_interval:
+            return entry
+        digest = feed_fingerprint(feed)
+        if entry is not None and entry.feed is feed and entry.fingerprint == digest:
+            entry.checked = now
+            return entry
+        body = multi.FORMATS[fmt].generate_bytes(feed, self.fragments)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        last_modified = _newest(feed)
+        previous = entry.last_modified if entry is not None and entry.etag != etag else None
+        if last_modified is not None and previous is not None and last_modified <= previous:
+            # changed without a newer date, like when an item is removed
+            last_modified = max(
+                datetime.now(timezone.utc).replace(microsecond=0), previous + timedelta(seconds=1)
+            )
+        entry = _Entry(
+            feed=feed,
+            fmt=fmt,
+            fingerprint=digest,
+            checked=now,
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        with self._lock:
+            if self._routes.get(path) == route:
+                self._entries[path] = entry
+        return entry
+
+    def respond(
+        self, method: str, path: str, headers: dict[str, str]
+    ) -> tuple[int, list[tuple[str, str]], bytes]:
+        """Returns status, headers and body of the response to a request.
+
+        :param headers: Request headers, with lowercase names.
+
+        :meta private:"""
+        if method not in ("GET", "HEAD"):
+            return 405, [("Allow", "GET, HEAD"), *_text_headers(405)], _REASONS[405].encode()
+        entry = self._entry(path)
+        if entry is None:
+            return 404, _text_headers(404), _REASONS[404].encode()
+        use_gzip = _accepts_gzip(headers.get("accept-encoding", ""))
+        etag = entry.etag[:-1] + '-gzip"' if use_gzip else entry.etag
+        result = [("ETag", etag)]
+        if entry.last_modified is not None:
+            result.append(("Last-Modified", format_datetime(entry.last_modified, usegmt=True)))
+        result += [("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache")]
+        if self._not_modified(headers, etag, entry.last_modified):
+            return 304, result, b""
+        if use_gzip:
+            if entry.gzip_body is None:
+                entry.gzip_body = gzip.compress(entry.body, mtime=0)
+            body = entry.gzip_body
+            result.append(("Content-Encoding", "gzip"))
+        else:
+            body = entry.body
+        result.append(("Content-Type", CONTENT_TYPES[entry.fmt]))
+        result.append(("Content-Length", str(len(body))))
+        return 200, result, b"" if method == "HEAD" else body
+
+    @staticmethod
+    def _not_modified(headers: dict[str, str], etag: str, last_modified: datetime | None) -> bool:
+        if "if-none-match" in headers:
+            return _etag_matches(headers["if-none-match"], etag)
+        since = headers.get("if-modified-since")
+        if since and last_modified is not None:
+            try:
+                return last_modified <= parsedate_to_datetime(since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _ready(self, path: str, headers: dict[str, str]) -> bool:
+        """Whether the response to a request needs neither a generation nor a compression.
+
+        :meta private:"""
+        with self._lock:
+            route = self._routes.get(path)
+            entry = self._entries.get(path)
+        if route is None:
+            return True
+        if (
+            entry is None
+            or entry.feed is not route[0]
+            or time.monotonic() - entry.checked >= self.check_interval
+        ):
+            return False
+        return entry.gzip_body is not None or not _accepts_gzip(headers.get("accept-encoding", ""))
+
+    @staticmethod
+    def _chunks(body: bytes):
+        view = memoryview(body)
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield bytes(view[start : start + CHUNK_SIZE])
+
+    def __call__(self, environ, start_response):
+        """The WSGI application."""
+        headers = {
+            key[5:].replace("_", "-").lower(): value
+            for key, value in environ.items()
+            if key.startswith("HTTP_")
+        }
+        status, response_headers, body = self.respond(
+            environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "/"), headers
+        )
+        start_response(f"{status} {_REASONS[status]}", response_headers)
+        return self._chunks(body)
+
+    async def asgi(self, scope, receive, send) -> None:
+        """The ASGI application.
+
+        Feeds are generated and compressed in a thread, not to block the event loop."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported scope '{scope['type']}'")
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        args = (scope["method"], scope["path"], headers)
+        if self._ready(scope["path"], headers):
+            status, response_headers, body = self.respond(*args)
+        else:
+            status, response_headers, body = await asyncio.to_thread(self.respond, *args)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response_headers
+                ],
+            }
+        )
+        chunks = list(self._chunks(body)) or [b""]
+        for i, chunk in enumerate(chunks):
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1}
+            )
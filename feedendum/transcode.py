@@ -0,0 +1,98 @@
+"""Module to convert feeds between formats one item at a time, in constant memory."""
+
+import copy
+
+import lxml.etree as ET
+
+from . import multi
+from .compression import open_input, open_output
+from .exceptions import FeedXMLError
+from .fragments import ItemSerializer, envelope
+from .utils import NS, prepare_feed, prepare_item
+
+_ITEMS = {
+    "rss": ("item", 3),
+    "atom": (f"{{{NS['atom']}}}entry", 2),
+    "rdf": (f"{{{NS['rdfns']}}}item", 2),
+}
+"""Tag and depth of the items of every format."""
+
+
+def _header(root: ET.Element, item_tag: str, item_depth: int) -> ET.Element:
+    """Returns a copy of the document read so far, without items."""
+    header = copy.deepcopy(root)
+    for item in list(header.iter(item_tag)):
+        if sum(1 for _ in item.iterancestors()) == item_depth - 1:
+            item.getparent().remove(item)
+    return header
+
+
+def transcode(
+    source,
+    target,
+    fmt: str,
+    compact_ns: bool = False,
+    with_data: bool = True,
+    compression: str | None = None,
+) -> int:
+    """Convert a feed of any supported format to `fmt`, writing every item as soon as it is read.
+
+    Only the item being converted and the elements of the feed are kept in memory,
+    so the size of the feed does not matter. The fields of the feed must come before
+    the items, as they are written before the first item; the ones after are ignored.
+    The output is equivalent to the one of the `generate` functions,
+    but it can keep unused namespace declarations.
+
+    :param source: A path or a binary file object, that can be compressed.
+    :param target: A path or a binary file object.
+    :param compact_ns: Write the known namespaces of `_data` keys as prefixes.
+    :param with_data: Write also the not managed attributes, in `_data`.
+    :param compression: `gzip`, `bz2`, `xz` or `None`,
+        by default guessed from the suffix of `target`.
+    :returns: The number of items.
+    :raises ValueError: If the output format is not supported.
+    :raises FeedXMLError: If the source is not a valid xml.
+    :raises FeedParseError: If the xml is not a supported feed."""
+    if fmt not in multi.FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'")
+    output = multi.FORMATS[fmt]
+    count = 0
+    with open_input(source) as f, open_output(target, compression) as out:
+        root = serializer = None
+        tail = b""
+        depth = 0
+        try:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if root is None:
+                        root = elem
+                        name = multi.detect_format(root)
+                        item_tag, item_depth = _ITEMS[name]
+                        module = multi.FORMATS[name]
+                    elif serializer is None and depth == item_depth and elem.tag == item_tag:
+                        header = module.to_feed(_header(root, item_tag, item_depth), compact_ns)
+                        prepared = prepare_feed(header, items=False, with_data=with_data)
+                        out_root, container = output.build_channel(prepared)
+                        head, tail = envelope(out_root, container)
+                        out.write(head)
+                        serializer = ItemSerializer(container, output.add_item)
+                    continue
+                depth -= 1
+                if serializer is not None and depth == item_depth - 1 and elem.tag == item_tag:
+                    fitem = module.to_item(elem, compact_ns)
+                    out.write(serializer(prepare_item(fitem, with_data)))
+                    elem.getparent().remove(elem)
+                    count += 1
+        except ET.ParseError as e:
+            raise FeedXMLError("Not a valid XML document") from e
+        if serializer is None:
+            # no items: the whole document is the header
+            header = module.to_feed(root, compact_ns)
+            out_root, container = output.build_channel(
+                prepare_feed(header, items=False, with_data=with_data)
+            )
+            head, tail = envelope(out_root, container)
+            out.write(head)
+        out.write(tail)
+    return count
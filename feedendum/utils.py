@@ -1,14 +1,21 @@
+import dataclasses
 import itertools
-from collections import defaultdict
-from typing import Any
+import sys
+from datetime import datetime as dt
+from email.utils import format_datetime
+from typing import TYPE_CHECKING, Any
 
-from lxml.etree import CDATA, Element, SubElement
+from lxml.etree import CDATA, Element, ElementTree, SubElement, tostring
+
+if TYPE_CHECKING:
+    from .feed import Feed, FeedItem
 
 NS = {
     "atom": "http://www.w3.org/2005/Atom",
     "atom03": "http://purl.org/atom/ns#",
     "content": "http://purl.org/rss/1.0/modules/content/",
     "dc": "http://purl.org/dc/elements/1.1/",
+    "fh": "http://purl.org/syndication/history/1.0",
     "itunes": "http://www.itunes.com/dtds/podcast-1.0.dtd",
     "media": "http://search.yahoo.com/mrss/",
     "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
@@ -84,6 +91,146 @@ def add_content_element(root: Element, name: str, text: str | None) -> "Element
     return None
 
 
+def clean_text(text: str | None) -> str | None:
+    """
+    Remove from `text` the characters not allowed in XML.
+
+    :meta private:"""
+    if text:
+        return text.translate(_TRANSLATE_MAP)
+    return text
+
+
+def add_clean_element(root: Element, name: str, text: str | None) -> "Element | None":
+    """
+    Like :func:`add_text_element`, for a `text` already passed through :func:`clean_text`.
+
+    :meta private:"""
+    if text:
+        elem = SubElement(root, name)
+        elem.text = text
+        return elem
+    return None
+
+
+def add_clean_content_element(
+    root: Element, name: str, text: str | None, cdata: bool
+) -> "Element | None":
+    """
+    Like :func:`add_content_element`, for a `text` already passed through :func:`clean_text`
+    and with the CDATA decision already taken.
+
+    :meta private:"""
+    if text:
+        elem = SubElement(root, name)
+        elem.text = CDATA(text) if cdata else text
+        return elem
+    return None
+
+
+def needs_cdata(text: str | None) -> bool:
+    """
+    Tell if `text` should be written as CDATA, to avoid escaping.
+
+    :meta private:"""
+    return bool(text) and (">" in text or "<" in text)  # type: ignore
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class PreparedItem:
+    """Values of a :class:`.feed.FeedItem` ready to be written, shared by every format.
+
+    :meta private:"""
+
+    source: "FeedItem"
+    data: dict = dataclasses.field(default_factory=dict)
+    """The `_data` to write."""
+    title: str | None = None
+    id: str | None = None
+    url: str | None = None
+    content: str | None = None
+    content_cdata: bool = False
+    content_type: str | None = None
+    categories: list[str] = dataclasses.field(default_factory=list)
+    rfc822: str | None = None
+    iso: str | None = None
+
+
+@dataclasses.dataclass(kw_only=True, slots=True)
+class PreparedFeed:
+    """Values of a :class:`.feed.Feed` ready to be written, shared by every format.
+
+    :meta private:"""
+
+    source: "Feed"
+    data: dict = dataclasses.field(default_factory=dict)
+    """The `_data` to write."""
+    title: str | None = None
+    description: str | None = None
+    url: str | None = None
+    rfc822: str | None = None
+    iso: str | None = None
+    items: list[PreparedItem] = dataclasses.field(default_factory=list)
+
+
+def prepare_item(fitem: "FeedItem", with_data: bool = True) -> PreparedItem:
+    """
+    Sanitize texts and format dates of `fitem` once.
+
+    :param with_data: Keep `_data`, to be written.
+
+    :meta private:"""
+    content = clean_text(fitem.content)
+    return PreparedItem(
+        source=fitem,
+        data=fitem._data if with_data else {},
+        title=clean_text(fitem.title),
+        id=clean_text(fitem.id),
+        url=clean_text(fitem.url),
+        content=content,
+        content_cdata=needs_cdata(content),
+        content_type=clean_text(fitem.content_type),
+        categories=[clean_text(c) for c in fitem.categories if c],  # type: ignore
+        rfc822=format_datetime(fitem.update) if fitem.update else None,
+        iso=dt.isoformat(fitem.update) if fitem.update else None,
+    )
+
+
+def prepare_feed(feed: "Feed", items: bool = True, with_data: bool = True) -> PreparedFeed:
+    """
+    Sanitize texts and format dates of `feed` and, if `items`, of all its items once.
+
+    :param with_data: Keep `_data` of the feed and of the items, to be written.
+
+    :meta private:"""
+    return PreparedFeed(
+        source=feed,
+        data=feed._data if with_data else {},
+        title=clean_text(feed.title),
+        description=clean_text(feed.description),
+        url=clean_text(feed.url),
+        rfc822=format_datetime(feed.update) if feed.update else None,
+        iso=dt.isoformat(feed.update) if feed.update else None,
+        items=[prepare_item(fitem, with_data) for fitem in feed.items] if items else [],
+    )
+
+
+def serialize(root: Element, pretty_print: bool = False) -> bytes:
+    """
+    Returns the UTF-8 encoded document of `root`, with the XML declaration.
+
+    :meta private:"""
+    return tostring(root, encoding="UTF-8", xml_declaration=True, pretty_print=pretty_print)
+
+
+def write_tree(root: Element, file, pretty_print: bool = False) -> None:
+    """
+    Write to the binary file object `file` the document of `root`, like :func:`serialize`.
+
+    :meta private:"""
+    ElementTree(root).write(file, encoding="UTF-8", xml_declaration=True, pretty_print=pretty_print)
+
+
 def set_attribute(element: Element, attribute: str, value: str | None) -> None:
     """
     On `element` set the attribute `attribute` to value `value`.
@@ -93,54 +240,130 @@ def set_attribute(element: Element, attribute: str, value: str | None) -> None:
         element.attrib[attribute] = value
 
 
-def etree_to_dict(t: Element):
+_PREFIXES = {uri: prefix for prefix, uri in NS.items()}
+_MAX_KEYS = 10_000
+# interned keys, by compact_ns then by tag or "@" + attribute
+_keys: dict[bool, dict[str, str]] = {False: {}, True: {}}
+_expanded: dict[str, str] = {}
+
+
+def data_key(name: str, compact_ns: bool) -> str:
     """
-    Transform an Element into a Python dictionary, recursively.
+    Returns the interned dictionary key of a tag or of an attribute (`name` prefixed by ``@``).
 
-    :meta private:"""
-    # From https://stackoverflow.com/a/10076823
-    d: dict[str, Any] = {t.tag: {} if t.attrib else None}
-    children = list(t)
+    If `compact_ns`, ``{uri}name`` becomes ``prefix:name`` for the namespaces in :data:`NS`."""
+    keys = _keys[compact_ns]
+    key = keys.get(name)
+    if key is None:
+        key = name
+        at = "@" if name.startswith("@") else ""
+        if compact_ns and name.startswith("{", len(at)):
+            uri, _, local = name[len(at) + 1 :].partition("}")
+            if uri in _PREFIXES:
+                key = at + _PREFIXES[uri] + ":" + local
+        key = sys.intern(key)
+        if len(keys) < _MAX_KEYS:
+            keys[name] = key
+    return key
+
+
+def clark_name(key: str) -> str:
+    """
+    Returns the Clark notation of a ``prefix:name`` key, for the namespaces in :data:`NS`."""
+    name = _expanded.get(key)
+    if name is None:
+        name = key
+        prefix, sep, local = key.partition(":")
+        if sep and prefix in NS:
+            name = "{" + NS[prefix] + "}" + local
+        if len(_expanded) < _MAX_KEYS:
+            _expanded[key] = name
+    return name
+
+
+def _element_value(t: Element, children: dict[str, list], compact_ns: bool):
+    d: Any = None
     if children:
-        dd = defaultdict(list)
-        for dc in map(etree_to_dict, children):
-            for k, v in dc.items():
-                dd[k].append(v)
-        d = {t.tag: {k: v[0] if len(v) == 1 else v for k, v in dd.items()}}
-    if t.attrib:
-        d[t.tag].update(("@" + k, v) for k, v in t.attrib.items())
-    if t.text:
-        text = t.text.strip()
-        if children or t.attrib:
-            if text:
-                d[t.tag]["#text"] = text
-        else:
-            d[t.tag] = text
+        d = {k: v[0] if len(v) == 1 else v for k, v in children.items()}
+    attrib = t.attrib
+    if attrib:
+        if d is None:
+            d = {}
+        keys = _keys[compact_ns]
+        for k, v in attrib.items():
+            name = "@" + k
+            d[keys.get(name) or data_key(name, compact_ns)] = v
+    text = t.text
+    if text:
+        text = text.strip()
+        if d is None:
+            d = text
+        elif text:
+            d["#text"] = text
     return d
 
 
+def element_data(t: Element, compact_ns: bool = False):
+    """
+    Transform the content of an Element into Python dictionaries, lists and strings.
+
+    Keys are interned, with `compact_ns` the namespaces in :data:`NS`
+    are written as prefixes (``media:content``).
+    Comments and processing instructions are ignored.
+
+    :meta private:"""
+    # Iterative version of https://stackoverflow.com/a/10076823
+    keys = _keys[compact_ns]
+    stack: list[tuple[Element, Any, dict[str, list]]] = [(t, iter(t), {})]
+    while True:
+        elem, children, values = stack[-1]
+        for child in children:
+            if isinstance(child.tag, str):
+                stack.append((child, iter(child), {}))
+                break
+        else:
+            stack.pop()
+            value = _element_value(elem, values, compact_ns)
+            if not stack:
+                return value
+            tag = elem.tag
+            key = keys.get(tag) or data_key(tag, compact_ns)
+            siblings = stack[-1][2]
+            if key in siblings:
+                siblings[key].append(value)
+            else:
+                siblings[key] = [value]
+
+
+def etree_to_dict(t: Element, compact_ns: bool = False) -> dict[str, Any]:
+    """
+    Transform an Element into a Python dictionary, with its tag as only key.
+
+    See :func:`element_data`.
+
+    :meta private:"""
+    return {data_key(t.tag, compact_ns): element_data(t, compact_ns)}
+
+
 def dict_append_etree(d, root):
     """
     The reverse of `etree_to_dict`.
 
     :meta private:"""
-    if not d:
-        pass
-    elif isinstance(d, str):
-        root.text = d
-    elif isinstance(d, dict):
-        for k, v in d.items():
-            if k.startswith("#"):
-                root.text = v
-            elif k.startswith("@"):
-                root.set(k[1:], v)
-            else:
-                nsk = k
-                if ":" in k and k.split(":")[0] in NS:
-                    splitted = k.split(":")
-                    nsk = "{" + NS[splitted[0]] + "}" + splitted[1]
-                if isinstance(v, list):
-                    for e in v:
-                        dict_append_etree(e, SubElement(root, nsk))
+    stack = [(d, root)]
+    while stack:
+        d, root = stack.pop()
+        if not d:
+            pass
+        elif isinstance(d, str):
+            root.text = d
+        elif isinstance(d, dict):
+            for k, v in d.items():
+                if k.startswith("#"):
+                    root.text = v
+                elif k.startswith("@"):
+                    root.set(clark_name(k[1:]), v)
                 else:
-                    dict_append_etree(v, SubElement(root, nsk))
+                    nsk = clark_name(k)
+                    for e in v if isinstance(v, list) else [v]:
+                        stack.append((e, SubElement(root, nsk)))
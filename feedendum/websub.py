@@ -0,0 +1,312 @@
+"""Module to receive feed updates from WebSub hubs instead of polling."""
+
+import dataclasses
+import hmac
+import io
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from urllib.parse import parse_qs
+
+from . import multi
+from .exceptions import FeedDocumentError, FeedParseError, RemoteFeedError
+from .feed import Feed, FeedItem
+from .limits import Limits
+from .paging import links
+from .remote import _requests
+from .seen import SeenStore
+
+_ALGORITHMS = {"sha1", "sha256", "sha384", "sha512"}
+
+
+def discover(feed: Feed) -> tuple[list[str], str | None]:
+    """Returns the hub URLs and the self URL advertised by the `atom:link` elements of `feed`."""
+    hubs = []
+    topic = None
+    for rel, href in links(feed):
+        if rel == "hub":
+            hubs.append(href)
+        elif rel == "self" and topic is None:
+            topic = href
+    return hubs, topic
+
+
+def signature(secret: str, body: bytes, algorithm: str = "sha256") -> str:
+    """Returns the `X-Hub-Signature` header value of `body`."""
+    return f"{algorithm}={hmac.new(secret.encode(), body, algorithm).hexdigest()}"
+
+
+def verify_signature(secret: str, body: bytes, header: str | None) -> bool:
+    """Returns `True` if `header` is a valid `X-Hub-Signature` of `body`."""
+    if not header or "=" not in header:
+        return False
+    algorithm, _, value = header.partition("=")
+    algorithm = algorithm.strip().lower()
+    if algorithm not in _ALGORITHMS:
+        return False
+    expected = signature(secret, body, algorithm).encode()
+    return hmac.compare_digest(expected, f"{algorithm}={value.strip()}".encode())
+
+
+@dataclasses.dataclass(kw_only=True)
+class Subscription:
+    """A subscription to the topic of a hub."""
+
+    id: str
+    """Identifier of the subscription, the last segment of its callback URL."""
+    topic: str
+    """URL of the feed."""
+    hub: str
+    """URL of the hub."""
+    callback: str
+    """URL where the hub sends the verifications and the contents."""
+    secret: str | None = None
+    """Key of the signatures of the contents."""
+    state: str = "pending"
+    """`pending`, `active`, `denied` or `unsubscribed`."""
+    mode: str = "subscribe"
+    """The last request sent to the hub, `subscribe` or `unsubscribe`."""
+    expires: float | None = None
+    """Time when the lease ends, as seconds since the epoch."""
+    reason: str | None = None
+    """Reason of the denial, if given by the hub."""
+
+
+class Subscriber:
+    """Subscribe to WebSub hubs and deliver the new items they push.
+
+    The subscriber is a WSGI application that must be reachable by the hubs
+    at `callback_url`, followed by the id of a subscription.
+    Contents are verified with the secret of the subscription,
+    parsed with the parser of their format and delivered without the items already seen.
+    Polling (:meth:`poll`) is needed only for the subscriptions that are not `active`.
+
+    :param callback_url: Base URL of the callbacks.
+    :param deliver: Called with the subscription and its new items.
+    :param seen: Store of the items already delivered, by default in memory.
+    :param lease_seconds: Requested duration of the subscriptions, `None` to let the hub choose.
+    :param renew_margin: Seconds before the end of a lease when :meth:`renew` subscribes again.
+    :param limits: Resource limits checked while parsing the contents.
+    :param timeout: Seconds to wait for the hubs.
+    """
+
+    def __init__(
+        self,
+        callback_url: str,
+        deliver: Callable[[Subscription, list[FeedItem]], None],
+        *,
+        seen: SeenStore | None = None,
+        lease_seconds: int | None = 86_400,
+        renew_margin: float = 3_600,
+        limits: Limits | None = None,
+        timeout: float = 30,
+    ):
+        self.callback_url = callback_url.rstrip("/")
+        self.deliver = deliver
+        self.seen = seen if seen is not None else SeenStore()
+        self.lease_seconds = lease_seconds
+        self.renew_margin = renew_margin
+        self.limits = limits
+        self.timeout = timeout
+        self.subscriptions: dict[str, Subscription] = {}
+        """Subscriptions by id."""
+        self.rejected = 0
+        """Number of contents ignored for a wrong signature."""
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        feed: Feed | None = None,
+        *,
+        topic: str | None = None,
+        hub: str | None = None,
+        secret: bool = True,
+    ) -> Subscription:
+        """Ask the hub to send the updates of a topic, the subscription is `active`
+        when the hub verifies it.
+
+        Hub and topic are discovered from the links of `feed`, if not given.
+        The items of `feed` are marked as seen.
+
+        :param secret: Ask the hub to sign the contents.
+        :raises ValueError: If the hub or the topic is not known.
+        :raises ModuleNotFoundError: If `requests` is not available.
+        :raises RemoteFeedError: If the hub refuses the request."""
+        if feed is not None:
+            hubs, self_url = discover(feed)
+            hub = hub or (hubs[0] if hubs else None)
+            topic = topic or self_url or feed.url
+            with self._lock:
+                self.seen.add(feed.items)
+        if not hub:
+            raise ValueError("No WebSub hub found")
+        if not topic:
+            raise ValueError("No WebSub topic found")
+        key = secrets.token_urlsafe(16)
+        subscription = Subscription(
+            id=key,
+            topic=topic,
+            hub=hub,
+            callback=f"{self.callback_url}/{key}",
+            secret=secrets.token_hex(32) if secret else None,
+        )
+        with self._lock:
+            self.subscriptions[key] = subscription
+        try:
+            self._request(subscription, "subscribe")
+        except RemoteFeedError:
+            with self._lock:
+                self.subscriptions.pop(key, None)
+            raise
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Ask the hub to stop sending updates, the subscription is removed
+        when the hub verifies it.
+
+        :raises ModuleNotFoundError: If `requests` is not available.
+        :raises RemoteFeedError: If the hub refuses the request."""
+        self._request(subscription, "unsubscribe")
+
+    def renew(self, now: float | None = None) -> list[Subscription]:
+        """Subscribe again to the topics whose lease ends within `renew_margin` seconds,
+        returns them. To be called periodically.
+
+        :raises ModuleNotFoundError: If `requests` is not available."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [
+                subscription
+                for subscription in self.subscriptions.values()
+                if subscription.state == "active"
+                and subscription.expires is not None
+                and subscription.expires - self.renew_margin <= now
+            ]
+        renewed = []
+        for subscription in due:
+            try:
+                self._request(subscription, "subscribe")
+            except RemoteFeedError:
+                continue
+            renewed.append(subscription)
+        return renewed
+
+    def poll(self, subscription: Subscription, **extra) -> list[FeedItem]:
+        """Download the topic and deliver its new items, returns them.
+
+        :param extra: Passed to :func:`.multi.parse_url`.
+        :raises ModuleNotFoundError: If `requests` is not available.
+        :raises RemoteFeedError: If the topic can not be read.
+        :raises FeedDocumentError: If the topic is not a valid document.
+        :raises FeedParseError: If the topic is not a supported feed."""
+        extra.setdefault("timeout", self.timeout)
+        feed = multi.parse_url(subscription.topic, limits=self.limits, **extra)
+        return self._deliver(subscription, feed)
+
+    def _request(self, subscription: Subscription, mode: str) -> None:
+        requests = _requests()
+        data = {
+            "hub.mode": mode,
+            "hub.topic": subscription.topic,
+            "hub.callback": subscription.callback,
+        }
+        if mode == "subscribe":
+            if self.lease_seconds is not None:
+                data["hub.lease_seconds"] = str(self.lease_seconds)
+            if subscription.secret:
+                data["hub.secret"] = subscription.secret
+        subscription.mode = mode
+        try:
+            r = requests.post(subscription.hub, data=data, timeout=self.timeout)
+            r.raise_for_status()
+        except requests.RequestException as e:
+            raise RemoteFeedError(f"Hub {subscription.hub} refused to {mode}") from e
+
+    def _deliver(self, subscription: Subscription, feed: Feed) -> list[FeedItem]:
+        with self._lock:
+            items = self.seen.filter_new(feed)
+        if items:
+            self.deliver(subscription, items)
+        return items
+
+    def _verify(self, subscription: Subscription, params: dict[str, str]) -> tuple[int, bytes]:
+        mode = params.get("hub.mode")
+        if params.get("hub.topic") != subscription.topic:
+            return 404, b""
+        if mode == "denied":
+            subscription.state = "denied"
+            subscription.reason = params.get("hub.reason")
+            return 200, b""
+        if mode != subscription.mode or "hub.challenge" not in params:
+            return 404, b""
+        if mode == "subscribe":
+            subscription.state = "active"
+            lease = params.get("hub.lease_seconds", "")
+            subscription.expires = (
+                time.time() + int(lease) if lease.isascii() and lease.isdecimal() else None
+            )
+        else:
+            subscription.state = "unsubscribed"
+            with self._lock:
+                self.subscriptions.pop(subscription.id, None)
+        return 200, params["hub.challenge"].encode()
+
+    def _content(
+        self, subscription: Subscription, headers: dict[str, str], body: bytes
+    ) -> tuple[int, bytes]:
+        if subscription.secret is not None and not verify_signature(
+            subscription.secret, body, headers.get("x-hub-signature")
+        ):
+            # acknowledged, but ignored
+            self.rejected += 1
+            return 202, b""
+        try:
+            feed = multi.parse_file(io.BytesIO(body), limits=self.limits)
+        except (FeedDocumentError, FeedParseError):
+            return 400, b""
+        self._deliver(subscription, feed)
+        return 200, b""
+
+    def handle(
+        self, method: str, path: str, query: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, bytes]:
+        """Returns status and body of the response to a request of a hub.
+
+        :param headers: Request headers, with lowercase names.
+
+        :meta private:"""
+        with self._lock:
+            subscription = self.subscriptions.get(path.rstrip("/").rsplit("/", 1)[-1])
+        if subscription is None:
+            return 404, b""
+        if method == "GET":
+            params = {key: values[0] for key, values in parse_qs(query).items()}
+            return self._verify(subscription, params)
+        if method == "POST":
+            return self._content(subscription, headers, body)
+        return 405, b""
+
+    def __call__(self, environ, start_response):
+        """The WSGI application."""
+        headers = {
+            key[5:].replace("_", "-").lower(): value
+            for key, value in environ.items()
+            if key.startswith("HTTP_")
+        }
+        length = environ.get("CONTENT_LENGTH") or "0"
+        valid = length.isascii() and length.isdecimal()
+        body = environ["wsgi.input"].read(int(length)) if valid else b""
+        status, response = self.handle(
+            environ.get("REQUEST_METHOD", "GET"),
+            environ.get("PATH_INFO", "/"),
+            environ.get("QUERY_STRING", ""),
+            headers,
+            body,
+        )
+        reasons = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found"}
+        start_response(
+            f"{status} {reasons.get(status, 'Method Not Allowed')}",
+            [("Content-Type", "text/plain"), ("Content-Length", str(len(response)))],
+        )
+        return [response]
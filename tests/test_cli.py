@@ -0,0 +1,147 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum import cli
+from feedendum.cli import expand, main, output_path
+
+
+def _run(*argv, stdin=None):
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        if stdin is not None:
+            with unittest.mock.patch("sys.stdin", io.StringIO(stdin)):
+                code = main(list(argv))
+        else:
+            code = main(list(argv))
+    return code, out.getvalue(), err.getvalue()
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for name in ("wikipedia-rss.xml", "martinfowler.atom", "lwn.rdf"):
+            shutil.copy(os.path.join("tests", name), self.tmp)
+        with open(os.path.join(self.tmp, "broken.xml"), "w") as f:
+            f.write("<rss><channel>")
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def test_expand(self):
+        self.assertEqual(
+            expand([self.path("*.xml"), self.path("lwn.rdf"), self.path("broken.xml")]),
+            [self.path("broken.xml"), self.path("wikipedia-rss.xml"), self.path("lwn.rdf")],
+        )
+        stdin = io.StringIO(f"{self.path('lwn.rdf')}\n\n{self.path('*.atom')}\n")
+        self.assertEqual(expand([], stdin), [self.path("lwn.rdf"), self.path("martinfowler.atom")])
+        self.assertEqual(output_path("a/b.rss.gz", "atom", None, None), "a/b.atom")
+        self.assertEqual(output_path("a/b.xml", "atom", "out", "gzip"), "out/b.atom.gz")
+
+    def test_validate(self):
+        code, out, err = _run("validate", "-j", "1", self.path("*"))
+        self.assertEqual(code, 1)
+        self.assertEqual(len(out.splitlines()), 3)
+        self.assertIn(f"{self.path('lwn.rdf')}\trdf\t15", out.splitlines())
+        self.assertIn("broken.xml: FeedXMLError", err)
+        self.assertIn("4 files, 1 failed", err)
+
+    def test_validate_pool(self):
+        code, out, err = _run("validate", "-j", "2", "-q", stdin=self.path("*.atom") + "\n")
+        self.assertEqual(code, 0)
+        self.assertEqual(out, f"{self.path('martinfowler.atom')}\tatom\t30\n")
+        self.assertEqual(err, "")
+
+    def test_convert(self):
+        out_dir = self.path("out")
+        os.mkdir(out_dir)
+        code, out, _ = _run(
+            "convert", "-j", "2", "-t", "atom", "-o", out_dir, "-c", "gzip", self.path("*.xml")
+        )
+        self.assertEqual(code, 1)
+        self.assertEqual(len(out.splitlines()), 1)
+        feed = atom.parse_file(os.path.join(out_dir, "wikipedia-rss.atom.gz"))
+        self.assertEqual(len(feed.items), 10)
+        code, _, err = _run("convert", "-j", "1", "-t", "atom", self.path("martinfowler.atom"))
+        self.assertEqual(code, 1)
+        self.assertIn("overwrite", err)
+
+    def test_unexpected_error(self):
+        with open(self.path("truncated.xml.gz"), "wb") as f:
+            f.write(b"\x1f\x8b\x08\x00")
+        code, out, err = _run("validate", "-j", "2", self.path("*.xml*"))
+        self.assertEqual(code, 1)
+        self.assertEqual(len(out.splitlines()), 1)
+        self.assertIn("truncated.xml.gz: FeedXMLError", err)
+        original = cli._read
+
+        def read(path):
+            if path.endswith(".rdf"):
+                raise RuntimeError("unexpected")
+            return original(path)
+
+        with unittest.mock.patch("feedendum.cli._read", read):
+            code, out, err = _run("stats", "-j", "1", self.path("lwn.rdf"), self.path("*.atom"))
+        self.assertEqual(code, 1)
+        self.assertEqual(len(out.splitlines()), 2)
+        self.assertIn("lwn.rdf: RuntimeError: unexpected", err)
+
+    def test_convert_collisions(self):
+        for name in ("a", "b"):
+            os.mkdir(self.path(name))
+            shutil.copy(self.path("lwn.rdf"), self.path(os.path.join(name, "x.xml")))
+        out_dir = self.path("out")
+        os.mkdir(out_dir)
+        code, out, err = _run(
+            "convert", "-j", "2", "-t", "rss", "-o", out_dir,
+            self.path("*/x.xml"), self.path("lwn.rdf"),
+        )  # fmt: skip
+        self.assertEqual(code, 1)
+        self.assertEqual(out.splitlines(), [f"{self.path('lwn.rdf')}\t{out_dir}/lwn.rss\t15"])
+        self.assertEqual(err.count("FileExistsError"), 2)
+        self.assertFalse(os.path.exists(os.path.join(out_dir, "x.rss")))
+
+    def test_stats(self):
+        code, out, _ = _run("stats", "-j", "1", self.path("lwn.rdf"))
+        self.assertEqual(code, 0)
+        header, line = out.splitlines()
+        self.assertTrue(header.startswith("file\tformat"))
+        self.assertEqual(line.split("\t")[1:4], ["rdf", "16800", "15"])
+
+    def test_merge(self):
+        target = self.path("merged.rss")
+        code, out, _ = _run(
+            "merge", "-j", "1", "-t", "rss", "-o", target, "--title", "All",
+            self.path("wikipedia-rss.xml"), self.path("lwn.rdf"), self.path("wikipedia-rss.xml"),
+        )  # fmt: skip
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "")
+        feed = rss.parse_file(target)
+        self.assertEqual(feed.title, "All")
+        self.assertEqual(len(feed.items), 25)
+        updates = [i.update for i in feed.items]
+        self.assertEqual(updates, sorted(updates))
+        code, out, _ = _run("merge", "-j", "1", "-q", self.path("lwn.rdf"))
+        self.assertEqual(len(atom.parse_text(out).items), 15)
+
+    def test_merge_naive(self):
+        with open(self.path("naive.atom"), "w") as f:
+            f.write(
+                '<feed xmlns="http://www.w3.org/2005/Atom"><title>N</title>'
+                "<entry><id>urn:n</id><title>Naive</title>"
+                "<updated>2021-01-01T00:00:00</updated></entry></feed>"
+            )
+        code, out, err = _run("merge", "-j", "1", self.path("naive.atom"), self.path("lwn.rdf"))
+        self.assertEqual(code, 0)
+        self.assertIn("2 files, 0 failed", err)
+        feed = atom.parse_text(out)
+        self.assertEqual(len(feed.items), 16)
+        self.assertEqual(feed.items[0].id, "urn:n")
+        self.assertEqual(feed.update, feed.items[-1].update)
@@ -0,0 +1,107 @@
+import copy
+import pickle
+import unittest
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.coldstore import ColdStore, Compressed
+from feedendum.feed import Feed, FeedItem
+from feedendum.fragments import fingerprint
+
+
+def _feed(n: int = 20) -> Feed:
+    return Feed(
+        title="Cold",
+        items=[
+            FeedItem(
+                id=f"urn:{i}",
+                content=f"<p>Paragraph {i}</p>" * 100,
+                _data={"comments": f"Comment {i}. " * 100, "short": "s"},
+            )
+            for i in range(n)
+        ],
+    )
+
+
+class ColdStoreTest(unittest.TestCase):
+    def test_transparent(self):
+        expected = _feed()
+        for codec in ("zlib", "lzma"):
+            with self.subTest(codec=codec):
+                feed = _feed()
+                store = ColdStore(codec, data=True)
+                self.assertEqual(store.compress(feed), 40)
+                self.assertIsInstance(feed.items[0].__dict__["content"], Compressed)
+                self.assertIsInstance(dict.get(feed.items[0]._data, "comments"), Compressed)
+                self.assertEqual(feed, expected)
+                self.assertEqual(feed.items[3].content, expected.items[3].content)
+                self.assertEqual(feed.items[3].comments, expected.items[3].comments)
+                self.assertEqual(dict(feed.items[3]._data.items()), expected.items[3]._data)
+                self.assertEqual(
+                    [fingerprint(i) for i in feed.items], [fingerprint(i) for i in expected.items]
+                )
+                self.assertEqual(repr(feed), repr(expected))
+                for module in (rss, atom):
+                    self.assertEqual(module.generate(feed), module.generate(expected))
+                self.assertLess(store.ratio, 0.1)
+
+    def test_hot(self):
+        feed = _feed(10)
+        store = ColdStore(hot_size=2)
+        store.compress(feed)
+
+        def read(*indexes):
+            return [feed.items[i].content for i in indexes]
+
+        read(0, 1, 0, 1, 0, 1)
+        self.assertEqual((store.misses, store.hits), (2, 4))
+        read(2, 0)
+        self.assertEqual((store.misses, store.hits), (4, 4))
+        self.assertIsNone(feed.items[1].__dict__["content"].hot)
+        store.clear()
+        read(0)
+        self.assertEqual(store.misses, 5)
+        feed = _feed(1)
+        store = ColdStore(hot_size=0)
+        store.compress(feed)
+        read(0, 0)
+        self.assertEqual((store.misses, store.hits), (2, 0))
+
+    def test_copies(self):
+        feed = _feed(3)
+        expected = _feed(3)
+        ColdStore(data=True).compress(feed)
+        for copied in (pickle.loads(pickle.dumps(feed)), copy.deepcopy(feed)):
+            self.assertEqual(copied, expected)
+            self.assertIsInstance(copied.items[0].__dict__["content"], Compressed)
+            self.assertEqual(copied.items[0].comments, expected.items[0].comments)
+
+    def test_skipped(self):
+        feed = Feed(items=[FeedItem(content="short"), FeedItem(content="tiny"), FeedItem()])
+        store = ColdStore(min_size=5)
+        self.assertEqual(store.compress(feed), 0)
+        # too short
+        self.assertIs(feed.items[1].__dict__["content"], "tiny")
+        # larger once compressed
+        self.assertIs(feed.items[0].__dict__["content"], "short")
+        self.assertIsNone(feed.items[2].content)
+        self.assertEqual(store.raw_bytes, 0)
+
+    def test_decompress(self):
+        feed = _feed(2)
+        store = ColdStore(data=True)
+        store.compress(feed.items)
+        store.decompress(feed)
+        self.assertIs(type(feed.items[0].__dict__["content"]), str)
+        self.assertIs(type(feed.items[0]._data), dict)
+        self.assertEqual(feed, _feed(2))
+        feed.items[0].content = "new"
+        self.assertEqual(feed.items[0].content, "new")
+
+    def test_codec(self):
+        with self.assertRaises(ValueError):
+            ColdStore("zstd")
+        feed = _feed(2)
+        ColdStore("lzma", level=1).compress(feed)
+        ColdStore("zlib", level=9).compress(feed.items[1:])
+        self.assertEqual(feed, _feed(2))
@@ -0,0 +1,62 @@
+import unittest
+
+import feedendum.atom as atom
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.columnar import from_columns, np, to_columns
+from feedendum.feed import Feed, FeedItem
+
+
+def _managed(feed):
+    for fitem in feed.items:
+        fitem._data = {}
+        fitem.enclosures, fitem.media, fitem.thumbnails, fitem.itunes = [], [], [], None
+    feed._data = {}
+    return feed
+
+
+@unittest.skipUnless(np, "numpy not available")
+class ColumnarTest(unittest.TestCase):
+    def setUp(self):
+        self.feeds = [
+            rss.parse_file("tests/wikipedia-rss.xml"),
+            atom.parse_file("tests/martinfowler.atom"),
+            rdf.parse_file("tests/lwn.rdf"),
+            Feed(items=[FeedItem(title="No date", categories=["a", "b"])]),
+        ]
+
+    def test_columns(self):
+        columns = to_columns(self.feeds)
+        total = sum(len(feed.items) for feed in self.feeds)
+        self.assertEqual(len(columns), total)
+        self.assertEqual(columns.feed.dtype, np.int32)
+        self.assertEqual(columns.update.dtype, np.dtype("datetime64[us]"))
+        self.assertTrue(np.isnat(columns.update[-1]))
+        self.assertEqual(columns.title[0], self.feeds[0].items[0].title)
+        self.assertIsNone(columns.content[total - 1])
+        self.assertEqual(columns.categories[total - 1], ["a", "b"])
+        self.assertEqual(
+            columns.feed_title.to_list()[:3], ["RSS - Revision history", "Martin Fowler", "LWN.net"]
+        )
+        # vectorized aggregations
+        self.assertEqual(
+            np.bincount(columns.feed).tolist(), [len(feed.items) for feed in self.feeds]
+        )
+        counts = dict(zip(columns.categories.dictionary, columns.categories.counts(), strict=True))
+        self.assertEqual(counts["a"], 1)
+
+    def test_roundtrip(self):
+        feeds = from_columns(to_columns(self.feeds))
+        self.assertEqual(feeds, [_managed(feed) for feed in self.feeds])
+
+    def test_filter(self):
+        columns = to_columns(self.feeds)
+        mask = columns.update >= np.datetime64("2019-11-01")
+        feeds = from_columns(columns, mask)
+        self.assertEqual(len(feeds), len(self.feeds))
+        self.assertEqual(sum(len(f.items) for f in feeds), int(mask.sum()))
+        self.assertEqual(len(feeds[3].items), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import unittest
+
+import feedendum.atom as atom
+import feedendum.multi as multi
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.compression import detect
+from feedendum.exceptions import FeedXMLError
+from feedendum.limits import Limits
+from feedendum.parsecache import ParseCache
+from feedendum.transcode import transcode
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._data.readinto(b)
+
+
+class CompressionTest(unittest.TestCase):
+    def setUp(self):
+        with open("tests/wikipedia-rss.xml", "rb") as f:
+            self.raw = f.read()
+        self.feed = rss.parse_file("tests/wikipedia-rss.xml")
+
+    def test_detect(self):
+        self.assertEqual(detect(gzip.compress(b"<rss/>")), "gzip")
+        self.assertEqual(detect(bz2.compress(b"<rss/>")), "bz2")
+        self.assertEqual(detect(lzma.compress(b"<rss/>")), "xz")
+        self.assertIsNone(detect(b"<rss/>"))
+
+    def test_parse_compressed(self):
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            data = compress(self.raw)
+            self.assertEqual(rss.parse_file(io.BytesIO(data)), self.feed)
+            self.assertEqual(rss.parse_file(io.BufferedReader(_Unseekable(data))), self.feed)
+            self.assertEqual(rss.parse_file(_Unseekable(data)), self.feed)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "feed.xml")
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.assertEqual(rss.parse_file(path), self.feed)
+
+    def test_write_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix, decompress in (
+                (".xml", bytes),
+                (".xml.gz", gzip.decompress),
+                (".xml.bz2", bz2.decompress),
+                (".xml.xz", lzma.decompress),
+            ):
+                path = os.path.join(tmp, "feed" + suffix)
+                rss.write_file(self.feed, path)
+                with open(path, "rb") as f:
+                    self.assertEqual(decompress(f.read()).decode("utf-8"), rss.generate(self.feed))
+                self.assertEqual(rss.parse_file(path), self.feed)
+
+    def test_write_fileobj(self):
+        feed = atom.parse_file("tests/martinfowler.atom")
+        out = io.BytesIO()
+        atom.write_file(feed, out, compression="xz")
+        self.assertEqual(lzma.decompress(out.getvalue()).decode("utf-8"), atom.generate(feed))
+        feed = rdf.parse_file("tests/lwn.rdf")
+        out = io.BytesIO()
+        rdf.write_file(feed, out, compression="gzip")
+        self.assertEqual(gzip.decompress(out.getvalue()).decode("utf-8"), rdf.generate(feed))
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            rss.write_file(self.feed, io.BytesIO(), compression="zip")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feed.xml")
+            with self.assertRaises(ValueError):
+                rss.write_file(self.feed, path, compression="zip")
+            self.assertFalse(os.path.exists(path))
+
+    def test_corrupt(self):
+        gz = gzip.compress(self.raw)
+        corrupt = {
+            "truncated.gz": gz[: len(gz) // 2],
+            "corrupt.gz": gz[:20] + bytes(200) + gz[220:],
+            "truncated.bz2": bz2.compress(self.raw)[:500],
+            "corrupt.bz2": b"BZh9" + bytes(500),
+            "truncated.xz": lzma.compress(self.raw)[:500],
+            "corrupt.xz": lzma.compress(self.raw)[:20] + bytes(500),
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, data in corrupt.items():
+                path = os.path.join(tmp, name)
+                with open(path, "wb") as f:
+                    f.write(data)
+                for parse in (
+                    rss.parse_file,
+                    multi.parse_file,
+                    lambda p: rss.parse_file(p, limits=Limits()),
+                    lambda p: rss.parse_file(p, cache=ParseCache()),
+                    lambda p: transcode(p, io.BytesIO(), "atom"),
+                ):
+                    with self.subTest(name=name), self.assertRaises(FeedXMLError) as cm:
+                        parse(path)
+                    self.assertIn(name, str(cm.exception))
+            with self.assertRaises(FeedXMLError):
+                rss.parse_file(io.BytesIO(gz[:100]))
+
+
+if __name__ == "__main__":
+    unittest.main()
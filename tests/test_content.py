@@ -0,0 +1,89 @@
+import unittest
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.content import ContentPipeline
+from feedendum.feed import Feed, FeedItem
+
+HTML = (
+    '<p>Read <a href="/post/1">the first post</a> and see <img src="a.png"> '
+    "the picture.</p><script>alert(1)</script><p>Second paragraph &amp; more words here.</p>"
+)
+
+
+class ContentTest(unittest.TestCase):
+    def test_strip(self):
+        pipeline = ContentPipeline(strip_tags=True)
+        self.assertEqual(
+            pipeline(HTML),
+            "Read the first post and see the picture. Second paragraph & more words here.",
+        )
+        self.assertEqual(pipeline("  plain   text ", plain=True), "plain text")
+        self.assertEqual(pipeline("<p>one</p><p>two<br>three</p>"), "one two three")
+
+    def test_truncate_text(self):
+        pipeline = ContentPipeline(strip_tags=True, max_words=5)
+        self.assertEqual(pipeline(HTML), "Read the first post and…")
+        pipeline = ContentPipeline(strip_tags=True, max_chars=12, ellipsis="...")
+        self.assertEqual(pipeline(HTML), "Read the...")
+        self.assertEqual(pipeline("<b>Short</b>"), "Short")
+        self.assertEqual(pipeline("Supercalifragilistic"), "Supercalifra...")
+
+    def test_html(self):
+        pipeline = ContentPipeline()
+        result = pipeline(HTML, "https://example.org/blog/")
+        self.assertEqual(
+            result,
+            '<p>Read <a href="https://example.org/post/1">the first post</a> and see  '
+            "the picture.</p><p>Second paragraph &amp; more words here.</p>",
+        )
+        pipeline = ContentPipeline(rewrite_links=False, drop=())
+        self.assertIn('<img src="a.png">', pipeline(HTML, "https://example.org/"))
+        self.assertIn('href="/post/1"', pipeline(HTML, "https://example.org/"))
+
+    def test_truncate_html(self):
+        pipeline = ContentPipeline(max_words=4)
+        self.assertEqual(pipeline(HTML), '<p>Read <a href="/post/1">the first post</a>…</p>')
+        pipeline = ContentPipeline(max_chars=50)
+        self.assertEqual(
+            pipeline(HTML),
+            '<p>Read <a href="/post/1">the first post</a> and see  the picture.</p><p>Second…</p>',
+        )
+        pipeline = ContentPipeline(max_chars=45)
+        self.assertTrue(pipeline(HTML).endswith("the picture.</p><p>…</p>"))
+        pipeline = ContentPipeline(max_words=100)
+        self.assertTrue(pipeline(HTML).endswith("more words here.</p>"))
+
+    def test_cache(self):
+        pipeline = ContentPipeline(strip_tags=True, maxsize=2)
+        for content in ("<b>a</b>", "<b>a</b>", "<b>b</b>", "<b>c</b>", "<b>a</b>"):
+            pipeline(content)
+        self.assertEqual((pipeline.hits, pipeline.misses), (1, 4))
+        pipeline("<b>a</b>", "https://example.org/")
+        self.assertEqual(pipeline.misses, 5)
+
+    def test_apply(self):
+        feed = Feed(
+            title="T",
+            items=[
+                FeedItem(content=HTML, content_type="html", url="https://example.org/x/"),
+                FeedItem(content="a <b> b", content_type="text"),
+                FeedItem(title="No content"),
+            ],
+        )
+        pipeline = ContentPipeline(strip_tags=True, max_words=3)
+        summary = pipeline.apply(feed)
+        self.assertEqual(feed.items[0].content, HTML)
+        self.assertEqual(summary.items[0].content, "Read the first…")
+        self.assertEqual(summary.items[0].content_type, "text")
+        self.assertEqual(summary.items[1].content, "a <b> b")
+        self.assertIs(summary.items[2], feed.items[2])
+        self.assertIn("Read the first…", atom.generate(summary))
+
+    def test_real_feed(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        summary = ContentPipeline(max_chars=200).apply(feed)
+        for fitem in summary.items:
+            self.assertLess(len(fitem.content), len(feed.items[0].content))
+            self.assertNotIn("<script", fitem.content)
+        self.assertEqual(len(rss.parse_text(rss.generate(summary)).items), len(feed.items))
@@ -0,0 +1,80 @@
+import unittest
+
+import feedendum.rss as rss
+from feedendum.dedup import NearDuplicates, signature, similarity, unique_items
+from feedendum.feed import Feed, FeedItem
+
+STORY = (
+    "The city council approved on Monday a new plan to extend the tram network "
+    "to the northern districts, with three new lines and twenty stations expected "
+    "to open by the end of the decade, the mayor said in a statement."
+)
+
+
+class DedupTest(unittest.TestCase):
+    def test_signature(self):
+        a = signature(STORY)
+        self.assertEqual(len(a), 64)
+        self.assertEqual(a, signature(STORY.upper()))
+        self.assertEqual(similarity(a, a), 1.0)
+        self.assertLess(similarity(a, signature("Something completely different")), 0.2)
+        self.assertGreater(similarity(a, signature(STORY + " More at eleven.")), 0.7)
+        self.assertIsNone(signature(""))
+        self.assertIsNone(signature("  … - "))
+
+    def test_clusters(self):
+        first = Feed(
+            items=[
+                FeedItem(title="Tram plan approved", content=f"<p>{STORY}</p>", url="a/1"),
+                FeedItem(title="Weather", content="Sunny all week long", url="a/2"),
+            ]
+        )
+        second = Feed(
+            items=[
+                FeedItem(title="Tram plan approved", content=STORY + " (AP)", url="b/9"),
+                FeedItem(title="Sports", content="The local team won again", url="b/2"),
+            ]
+        )
+        detector = NearDuplicates()
+        detector.add_feed(first)
+        detector.add_feed(second)
+        self.assertEqual(detector.clusters(), [[first.items[0], second.items[0]]])
+        self.assertTrue(detector.is_duplicate(2))
+        self.assertEqual(detector.cluster(2), 0)
+        self.assertEqual([i.url for i in unique_items([first, second])], ["a/1", "a/2", "b/2"])
+
+    def test_empty(self):
+        detector = NearDuplicates()
+        for _ in range(3):
+            detector.add(FeedItem(content="<p> </p>"))
+            detector.add(FeedItem(title="-"))
+        self.assertEqual(detector.clusters(), [])
+        self.assertEqual(len(unique_items([Feed(items=[FeedItem(), FeedItem()])])), 2)
+
+    def test_forget(self):
+        detector = NearDuplicates()
+        detector.add(FeedItem(content=STORY))
+        detector.add(FeedItem(content=STORY))
+        self.assertEqual(detector.forget(2), 16)
+        self.assertEqual(detector.forget(2), 0)
+        third = detector.add(FeedItem(content=STORY))
+        # still clustered, but not with the later items
+        self.assertEqual(detector.cluster(1), 0)
+        self.assertEqual(detector.cluster(third), third)
+        self.assertEqual(detector.cluster(detector.add(FeedItem(content=STORY))), third)
+
+    def test_real_feed(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        detector = NearDuplicates()
+        for fitem in feed.items:
+            detector.add(fitem, key=fitem.url)
+        for fitem in feed.items:
+            detector.add(fitem, key="copy " + (fitem.url or ""))
+        n = len(feed.items)
+        for i in range(n):
+            self.assertEqual(detector.cluster(i + n), detector.cluster(i))
+        self.assertLess(len({detector.cluster(i) for i in range(n)}), n)
+
+    def test_parameters(self):
+        with self.assertRaises(ValueError):
+            NearDuplicates(num_perm=64, bands=10)
@@ -0,0 +1,118 @@
+import unittest
+
+import lxml.etree as ET
+
+import feedendum.atom as atom
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.extensions import REGISTRY, Registry, integer, register, skip, unregister
+from feedendum.feed import Feed, FeedItem
+from feedendum.fragments import FragmentCache
+from feedendum.parsecache import ParseCache
+from feedendum.server import feed_fingerprint
+from feedendum.utils import NS
+
+SLASH = f"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:slash="{NS["slash"]}" xmlns:thr="{NS["thr"]}" xmlns:x="urn:x">
+<channel><title>T</title>
+<item><title>A</title><slash:comments>12</slash:comments><thr:total>3</thr:total>
+<x:tag>one</x:tag><x:tag>two</x:tag><x:big><x:deep>text</x:deep></x:big></item>
+<item><title>B</title><slash:comments>many</slash:comments></item>
+</channel></rss>"""
+
+
+class ExtensionsTest(unittest.TestCase):
+    def tearDown(self):
+        REGISTRY.clear()
+
+    def test_parse(self):
+        register("slash:comments", integer)
+        register("{urn:x}tag", name="tags", multiple=True)
+        skip("{urn:x}big")
+        feed = rss.parse_text(SLASH)
+        first, second = feed.items
+        self.assertEqual(first.extensions, {"slash:comments": 12, "tags": ["one", "two"]})
+        self.assertEqual(first._data, {f"{{{NS['thr']}}}total": "3"})
+        # not an integer: kept as data
+        self.assertEqual(second.extensions, {})
+        self.assertEqual(second._data, {f"{{{NS['slash']}}}comments": "many"})
+
+    def test_generate(self):
+        register("slash:comments", integer)
+        register("thr:total", integer)
+        register("{urn:x}tag", name="tags", multiple=True)
+        feed = Feed(
+            title="T",
+            items=[FeedItem(id="a", extensions={"slash:comments": 4, "tags": ["x", "y"], "o": 1})],
+        )
+        for module in (rss, atom, rdf):
+            with self.subTest(module=module.__name__):
+                text = module.generate(feed)
+                root = ET.fromstring(text.encode())
+                self.assertEqual(root.findtext(".//slash:comments", namespaces=NS), "4")
+                self.assertNotIn(">1<", text)
+                parsed = module.parse_text(text)
+                self.assertEqual(
+                    parsed.items[0].extensions, {"slash:comments": 4, "tags": ["x", "y"]}
+                )
+                self.assertEqual(parsed.items[0]._data.get("o"), None)
+
+    def test_wildcards(self):
+        skip("{urn:x}*")
+        register("x:tag", lambda e: None)
+        feed = rss.parse_text(SLASH)
+        self.assertEqual(
+            set(feed.items[0]._data),
+            {f"{{{NS[p]}}}{t}" for p, t in [("slash", "comments"), ("thr", "total")]},
+        )
+        skip("*")
+        register("thr:total")
+        feed = rss.parse_text(SLASH)
+        self.assertEqual(feed.items[0]._data, {})
+        self.assertEqual(feed.items[0].extensions, {"thr:total": "3"})
+        self.assertEqual(feed.items[0].title, "A")
+        with self.assertRaises(ValueError):
+            register("thr:*")
+
+    def test_registry(self):
+        registry = Registry()
+        version = registry.version
+        registry.register("slash:comments", name="comments")
+        self.assertIn("slash:comments", registry)
+        self.assertIn(f"{{{NS['slash']}}}comments", registry)
+        self.assertEqual(len(registry), 1)
+        self.assertGreater(registry.version, version)
+        item = ET.fromstring(SLASH).find("channel/item")
+        fitem = FeedItem()
+        registry.extract(item, fitem)
+        self.assertEqual(fitem.extensions, {"comments": "12"})
+        self.assertIsNone(item.find("slash:comments", NS))
+        out = ET.Element("item")
+        registry.append(out, fitem)
+        self.assertEqual(out.findtext("slash:comments", namespaces=NS), "12")
+        registry.unregister("slash:comments")
+        self.assertEqual(len(registry), 0)
+        registry.append(out := ET.Element("item"), fitem)
+        self.assertEqual(len(out), 0)
+
+    def test_cache(self):
+        cache = ParseCache()
+        data = SLASH.encode()
+        self.assertEqual(cache.parse(data, rss.to_feed).items[0].extensions, {})
+        register("slash:comments", integer)
+        self.assertEqual(cache.parse(data, rss.to_feed).items[0].extensions, {"slash:comments": 12})
+        unregister("slash:comments")
+        self.assertEqual(cache.parse(data, rss.to_feed).items[0].extensions, {})
+        self.assertEqual(cache.misses, 3)
+
+    def test_fragments(self):
+        cache = FragmentCache()
+        feed = Feed(title="T", items=[FeedItem(id="a", extensions={"slash:comments": 4})])
+        digest = feed_fingerprint(feed)
+        self.assertNotIn("slash:comments", rss.generate(feed, cache=cache))
+        register("slash:comments", integer)
+        self.assertIn("<slash:comments>4</slash:comments>", rss.generate(feed, cache=cache))
+        self.assertNotEqual(feed_fingerprint(feed), digest)
+        unregister("slash:comments")
+        self.assertNotIn("slash:comments", rss.generate(feed, cache=cache))
+        self.assertEqual(cache.misses, 3)
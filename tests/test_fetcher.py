@@ -0,0 +1,155 @@
+import unittest
+
+try:
+    import requests
+except ModuleNotFoundError:
+    requests = None  # type: ignore
+
+from utils import LocalServer, QuietHandler
+
+import feedendum.rss as rss
+from feedendum.exceptions import RemoteFeedError
+from feedendum.feed import Feed, FeedItem
+from feedendum.fetcher import Fetcher, merge
+
+
+def _feed(items: list[tuple[str, str]]) -> Feed:
+    return Feed(
+        title="Delta",
+        url="https://example.org/",
+        items=[FeedItem(id=key, title=title) for key, title in items],
+    )
+
+
+class DeltaServer:
+    """A stand-in server of a feed that supports RFC 3229 feed deltas.
+
+    Every version of the feed adds or changes items at the top."""
+
+    def __init__(self):
+        self.versions: list[list[tuple[str, str]]] = [[]]
+        self.headers: list[dict[str, str]] = []
+        self.sent: list[int] = []
+        self.im = "feed"
+        server = self
+
+        class Handler(QuietHandler):
+            def do_GET(self):  # noqa: N802
+                server.headers.append(dict(self.headers))
+                current = len(server.versions) - 1
+                etag = self.headers.get("If-None-Match", "")
+                if etag == f'"v{current}"':
+                    self.send_response(304)
+                    self.end_headers()
+                    server.sent.append(0)
+                    return
+                old = etag.strip('"')[1:]
+                if "feed" in self.headers.get("A-IM", "") and old.isdigit() and int(old) < current:
+                    before = set(server.versions[int(old)])
+                    changed = [i for i in server.versions[current] if i not in before]
+                    self.send_response(226)
+                    self.send_header("IM", server.im)
+                else:
+                    changed = server.versions[current]
+                    self.send_response(200)
+                body = rss.generate_bytes(_feed(changed))
+                self.send_header("ETag", f'"v{current}"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.sent.append(len(body))
+
+        self.server = LocalServer(Handler)
+        self.url = self.server.url + "/feed"
+
+    def publish(self, *items: tuple[str, str]) -> None:
+        keys = {key for key, _ in items}
+        old = [item for item in self.versions[-1] if item[0] not in keys]
+        self.versions.append(list(items) + old)
+
+    def close(self):
+        self.server.close()
+
+
+class MergeTest(unittest.TestCase):
+    def test_merge(self):
+        feed = _feed([("c", "C"), ("b", "B"), ("a", "A")])
+        delta = _feed([("d", "D"), ("b", "B2")])
+        delta.title = "New"
+        merged = merge(feed, delta)
+        self.assertEqual(merged.title, "New")
+        self.assertEqual(
+            [(i.id, i.title) for i in merged.items],
+            [("d", "D"), ("b", "B2"), ("c", "C"), ("a", "A")],
+        )
+        merged = merge(feed, _feed([("d", "D")]), max_items=2)
+        self.assertEqual([i.id for i in merged.items], ["d", "c"])
+
+
+@unittest.skipUnless(requests, "requests not available")
+class FetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = DeltaServer()
+        self.server.publish(*[(f"urn:{i}", f"Item {i}") for i in range(50, 0, -1)])
+
+    def tearDown(self):
+        self.server.close()
+
+    def assert_current(self, feed: Feed):
+        expected = rss.parse_text(rss.generate(_feed(self.server.versions[-1])))
+        self.assertEqual(feed.items, expected.items)
+
+    def test_delta(self):
+        fetcher = Fetcher()
+        first = fetcher.parse_url(self.server.url, rss.to_feed)
+        self.assert_current(first)
+        self.assertNotIn("A-IM", self.server.headers[0])
+        first.items.clear()
+        self.assert_current(fetcher.parse_url(self.server.url, rss.to_feed))
+        self.assertEqual(self.server.headers[1]["If-None-Match"], '"v1"')
+        self.assertEqual(self.server.headers[1]["A-IM"], "feed")
+        self.server.publish(("urn:51", "Item 51"), ("urn:7", "Item 7 changed"))
+        feed = rss.parse_url(self.server.url, fetcher=fetcher)
+        self.assert_current(feed)
+        self.assertEqual([i.title for i in feed.items[:2]], ["Item 51", "Item 7 changed"])
+        self.assertEqual(len(feed.items), 51)
+        self.assertEqual((fetcher.full, fetcher.not_modified, fetcher.deltas), (1, 1, 1))
+        self.assertLess(self.server.sent[2] * 5, self.server.sent[0])
+        self.assertEqual(fetcher.received, self.server.sent[0] + self.server.sent[2])
+        self.server.publish(("urn:52", "Item 52"))
+        self.assert_current(fetcher.parse_url(self.server.url, rss.to_feed))
+        self.assertEqual(fetcher.deltas, 2)
+
+    def test_no_delta(self):
+        fetcher = Fetcher(delta=False)
+        fetcher.parse_url(self.server.url)
+        self.server.publish(("urn:51", "Item 51"))
+        self.assert_current(fetcher.parse_url(self.server.url))
+        self.assertNotIn("A-IM", self.server.headers[1])
+        self.assertEqual((fetcher.full, fetcher.deltas), (2, 0))
+
+    def test_max_items(self):
+        fetcher = Fetcher(max_items=10, maxsize=1)
+        self.assertEqual(len(fetcher.parse_url(self.server.url).items), 50)
+        self.server.publish(("urn:51", "Item 51"))
+        feed = fetcher.parse_url(self.server.url)
+        self.assertEqual([i.id for i in feed.items[:2]], ["urn:51", "urn:50"])
+        self.assertEqual(len(feed.items), 10)
+        self.assertEqual(len(fetcher), 1)
+        fetcher.clear()
+        self.assertEqual(len(fetcher), 0)
+
+    def test_unexpected_delta(self):
+        fetcher = Fetcher()
+        fetcher.parse_url(self.server.url)
+        self.server.publish(("urn:51", "Item 51"))
+        self.server.im = "vcdiff"
+        with self.assertRaises(RemoteFeedError):
+            fetcher.parse_url(self.server.url)
+
+    def test_fetch_many(self):
+        fetcher = Fetcher()
+        missing = "http://127.0.0.1:1/feed"
+        result = fetcher.fetch_many([self.server.url, missing], workers=2, timeout=5)
+        self.assert_current(result[self.server.url])  # type: ignore
+        self.assertIsInstance(result[missing], RemoteFeedError)
@@ -0,0 +1,64 @@
+import unittest
+
+import utils
+
+import feedendum.atom as atom
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.fragments import FragmentCache, fingerprint
+
+
+class FragmentsTest(unittest.TestCase):
+    def test_equivalent(self):
+        for module, path in (
+            (rss, "tests/wikipedia-rss.xml"),
+            (atom, "tests/martinfowler.atom"),
+            (rdf, "tests/lwn.rdf"),
+        ):
+            cache = FragmentCache()
+            feed = module.parse_file(path)
+            first = module.generate(feed, cache=cache)
+            self.assertTrue(utils.xml_equals(path, first))
+            self.assertEqual(module.parse_text(first), feed)
+            self.assertEqual(cache.misses, len(feed.items))
+            self.assertEqual(module.generate(feed, cache=cache), first)
+            self.assertEqual(cache.hits, len(feed.items))
+
+    def test_changed_item(self):
+        cache = FragmentCache()
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        rss.generate(feed, cache=cache)
+        feed.items[0].title = "Changed"
+        feed.items[1]._data["comments"] = "Changed too"
+        xml = rss.generate(feed, cache=cache)
+        self.assertEqual(cache.misses, len(feed.items) + 2)
+        self.assertIn("<title>Changed</title>", xml)
+        self.assertIn("<comments>Changed too</comments>", xml)
+        self.assertEqual(rss.parse_text(xml), rss.parse_text(rss.generate(feed)))
+
+    def test_formats(self):
+        cache = FragmentCache()
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        rss.generate(feed, cache=cache)
+        xml = atom.generate(feed, cache=cache)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(atom.parse_text(xml), atom.parse_text(atom.generate(feed)))
+
+    def test_bounds(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        cache = FragmentCache(maxsize=3)
+        rss.generate(feed, cache=cache)
+        self.assertEqual(len(cache), 3)
+        cache = FragmentCache(max_bytes=1)
+        rss.generate(feed, cache=cache)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_fingerprint(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        self.assertEqual(fingerprint(feed.items[0]), fingerprint(feed.items[0]))
+        self.assertNotEqual(fingerprint(feed.items[0]), fingerprint(feed.items[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import unittest
+
+import feedendum
+
+
+def imported(code: str) -> set[str]:
+    """Returns the modules imported by `code`.
+
+    `-X importtime` does not report the modules imported by `importlib` or by
+    ``from . import``, so the new entries of `sys.modules` are added."""
+    script = f"import sys; before = set(sys.modules); {code}; print(*set(sys.modules) - before)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(result.stdout.split())
+    reported = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            reported.append(line.rsplit("|", 1)[1].strip())
+    if "site" in reported:
+        # imported at startup, not by `code`
+        reported = reported[len(reported) - reported[::-1].index("site") :]
+    return modules | set(reported)
+
+
+class ImportTest(unittest.TestCase):
+    def test_package(self):
+        modules = imported("import feedendum")
+        self.assertIn("feedendum", modules)
+        for name in ("lxml.etree", "requests", "feedendum.rss", "importlib.metadata"):
+            self.assertNotIn(name, modules)
+
+    def test_format(self):
+        modules = imported("import feedendum; feedendum.to_atom_string")
+        self.assertIn("feedendum.atom", modules)
+        self.assertIn("lxml.etree", modules)
+        for name in ("requests", "urllib3", "feedendum.rss", "feedendum.rdf"):
+            self.assertNotIn(name, modules)
+        modules = imported("import feedendum.rss")
+        self.assertNotIn("requests", modules)
+
+    def test_attributes(self):
+        self.assertIs(feedendum.to_rss_string, feedendum.rss.generate)
+        self.assertIs(feedendum.from_atom_file, feedendum.atom.parse_file)
+        self.assertIs(feedendum.Feed, feedendum.feed.Feed)
+        self.assertIsInstance(feedendum.__version__, str)
+        self.assertIn("to_rdf_bytes", dir(feedendum))
+        for name in feedendum.__all__:
+            self.assertTrue(hasattr(feedendum, name), name)
+        with self.assertRaises(AttributeError):
+            feedendum.missing  # noqa: B018
+        with self.assertRaises(AttributeError):
+            feedendum._missing  # noqa: B018
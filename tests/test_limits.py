@@ -0,0 +1,79 @@
+import gzip
+import io
+import time
+import unittest
+
+import feedendum.atom as atom
+import feedendum.multi as multi
+import feedendum.rss as rss
+from feedendum.exceptions import FeedDocumentError, FeedLimitError, FeedXMLError
+from feedendum.limits import LimitedParser, Limits
+
+
+def _rss(items: int, text: str = "x", extra: str = "") -> str:
+    body = "".join(
+        f"<item><title>{n}</title><description>{text}</description>{extra}</item>"
+        for n in range(items)
+    )
+    return f'<rss version="2.0"><channel><title>T</title>{body}</channel></rss>'
+
+
+class LimitsTest(unittest.TestCase):
+    def test_no_limits(self):
+        feed = rss.parse_text(_rss(5), limits=Limits())
+        self.assertEqual(len(feed.items), 5)
+        self.assertEqual(feed, rss.parse_text(_rss(5)))
+        with open("tests/martinfowler.atom", "rb") as f:
+            self.assertEqual(
+                atom.parse_file(f, limits=Limits()), atom.parse_file("tests/martinfowler.atom")
+            )
+
+    def test_bytes(self):
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(_rss(100), limits=Limits(max_bytes=1000))
+        data = gzip.compress(_rss(1000).encode())
+        self.assertLess(len(data), 5000)
+        with self.assertRaises(FeedLimitError):
+            multi.parse_file(io.BytesIO(data), limits=Limits(max_bytes=5000))
+        self.assertTrue(issubclass(FeedLimitError, FeedDocumentError))
+
+    def test_items(self):
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(_rss(11), limits=Limits(max_items=10))
+        self.assertEqual(len(rss.parse_text(_rss(10), limits=Limits(max_items=10)).items), 10)
+        feed = rss.parse_text(_rss(50), limits=Limits(max_items=10, truncate=True))
+        self.assertEqual([i.title for i in feed.items], [str(n) for n in range(10)])
+        feed = atom.parse_file("tests/martinfowler.atom", limits=Limits(max_items=3, truncate=True))
+        self.assertEqual(len(feed.items), 3)
+
+    def test_text(self):
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(_rss(2, "y" * 101), limits=Limits(max_text=100))
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(_rss(2, extra=f'<a href="{"h" * 101}"/>'), limits=Limits(max_text=100))
+        feed = rss.parse_text(
+            _rss(2, "y" * 500, f'<a href="{"h" * 101}"/>'),
+            limits=Limits(max_text=100, truncate=True),
+        )
+        self.assertEqual(feed.items[0].content, "y" * 100)
+        self.assertEqual(feed.items[1]._data["a"]["@href"], "h" * 100)
+
+    def test_depth(self):
+        nested = "<x>" * 50 + "</x>" * 50
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(_rss(1, extra=nested), limits=Limits(max_depth=20))
+        feed = rss.parse_text(_rss(1, extra=nested), limits=Limits(max_depth=60))
+        self.assertIn("x", feed.items[0]._data)
+
+    def test_time(self):
+        parser = LimitedParser(Limits(max_seconds=0.01))
+        parser.feed(b"<rss>")
+        time.sleep(0.02)
+        with self.assertRaises(FeedLimitError):
+            parser.feed(b"<channel/>")
+
+    def test_invalid(self):
+        with self.assertRaises(FeedXMLError):
+            rss.parse_text("<rss><channel>", limits=Limits(max_items=1))
+        with self.assertRaises(FeedXMLError):
+            rss.parse_text("<rss></channel>", limits=Limits(max_items=1))
@@ -0,0 +1,127 @@
+import contextlib
+import io
+import unittest
+
+try:
+    import requests
+except ModuleNotFoundError:
+    requests = None  # type: ignore
+
+import feedendum.multi as multi
+from feedendum.cli import main
+from feedendum.fetcher import Fetcher
+from feedendum.loadtest import Profile, Report, SyntheticServer, run, synthetic_feed
+from feedendum.remote import fetch_root
+
+
+class SyntheticFeedTest(unittest.TestCase):
+    def test_feed(self):
+        profile = Profile(items=(5, 5), content_size=300)
+        feed = synthetic_feed(profile, 7)
+        self.assertEqual(feed.items[0].id, "urn:feed:7:item:4")
+        self.assertEqual(len(feed.items), 5)
+        self.assertEqual(len(feed.items[0].content), 300)
+        self.assertEqual(feed, synthetic_feed(profile, 7))
+        newer = synthetic_feed(profile, 7, version=2)
+        self.assertEqual(
+            [i.id for i in newer.items][:3],
+            ["urn:feed:7:item:6", "urn:feed:7:item:5", "urn:feed:7:item:4"],
+        )
+        delta = synthetic_feed(profile, 7, version=2, since=0)
+        self.assertEqual(delta.items, newer.items[:2])
+
+    def test_report(self):
+        report = Report(
+            mode="parse_url",
+            round=1,
+            requests=10,
+            feeds=8,
+            errors=2,
+            not_modified=0,
+            deltas=0,
+            received=1000,
+            elapsed=2.0,
+            latencies=[i / 100 for i in range(10, 0, -1)],
+            cpu=0.8,
+        )
+        self.assertEqual(report.feeds_per_second, 4)
+        self.assertEqual(report.percentile(50), 0.06)
+        self.assertEqual(report.percentile(100), 0.1)
+        self.assertIn("8/10 feeds (2 errors", str(report))
+        self.assertIn("CPU 100.00 ms/feed", str(report))
+
+
+@unittest.skipUnless(requests, "requests not available")
+class SyntheticServerTest(unittest.TestCase):
+    def test_server(self):
+        profile = Profile(feeds=6, items=(3, 8), content_size=100, change_rate=1)
+        with SyntheticServer(profile) as server:
+            self.assertEqual(len(server.urls), 6)
+            for url, fmt in zip(server.urls, ("rss", "atom", "rdf") * 2, strict=True):
+                self.assertEqual(multi.detect_format(fetch_root(url)), fmt)
+            fetcher = Fetcher()
+            first = fetcher.parse_url(server.urls[1])
+            # every request adds an item: the second one is a delta
+            feed = fetcher.parse_url(server.urls[1])
+            self.assertEqual(fetcher.deltas, 1)
+            self.assertEqual(len(feed.items), len(first.items) + 1)
+            # versions 1 (format check), 2 (first) and 3
+            current = synthetic_feed(profile, 1, version=3)
+            self.assertEqual(
+                [i.id for i in feed.items[: len(current.items)]], [i.id for i in current.items]
+            )
+            self.assertEqual(requests.get(server.url + "/feed/6").status_code, 404)
+            self.assertEqual(requests.get(server.url + "/other").status_code, 404)
+
+
+@unittest.skipUnless(requests, "requests not available")
+class RunTest(unittest.TestCase):
+    def test_fetcher(self):
+        profile = Profile(feeds=30, items=(2, 6), content_size=200, change_rate=0.5)
+        first, second = run(profile, "fetcher", rounds=2, workers=4, trace_memory=True)
+        self.assertEqual((first.feeds, first.errors, first.not_modified), (30, 0, 0))
+        self.assertGreater(first.received, 30 * 200)
+        self.assertEqual(second.feeds, 30)
+        self.assertEqual(second.not_modified + second.deltas, 30)
+        self.assertGreater(second.deltas, 0)
+        self.assertLess(second.received, first.received)
+        self.assertGreater(first.memory, 0)
+        self.assertEqual(len(second.latencies), 30)
+
+    def test_errors_drip(self):
+        profile = Profile(feeds=4, items=(3, 3), error_rate=0.5, drip=0.01, drip_size=1024)
+        with SyntheticServer(profile) as server:
+            (report,) = run(profile, workers=4, base_url=server.url)
+            self.assertEqual(server.requests, 4)
+        self.assertEqual(report.feeds + report.errors, 4)
+        self.assertGreater(report.errors, 0)
+        self.assertGreater(max(report.latencies), 0.02)
+        # the server is closed
+        (report,) = run(Profile(feeds=3), "fetcher", workers=2, base_url=server.url)
+        self.assertEqual(report.errors, 3)
+        with self.assertRaises(ValueError):
+            run(profile, "curl")
+
+    def test_cli(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(
+                [
+                    "loadtest",
+                    "--feeds",
+                    "5",
+                    "--items",
+                    "2:4",
+                    "--rounds",
+                    "2",
+                    "--mode",
+                    "fetcher",
+                    "--no-delta",
+                    "--workers",
+                    "2",
+                ]
+            )
+        self.assertEqual(code, 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("fetcher round 2: 5/5 feeds (0 errors, 5 not modified", lines[1])
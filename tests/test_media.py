@@ -0,0 +1,102 @@
+import unittest
+
+import utils
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.media import (
+    Enclosure,
+    ITunesInfo,
+    MediaContent,
+    MediaThumbnail,
+    format_duration,
+    parse_duration,
+)
+
+
+class MediaTest(unittest.TestCase):
+    def test_parse(self):
+        feed = rss.parse_file("tests/podcast.xml")
+        item = feed.items[0]
+        self.assertEqual(
+            item.enclosures,
+            [
+                Enclosure(
+                    url="https://www.example.com/podcasts/dafnas-zebras/audio/toptenmyths.mp3",
+                    type="audio/mpeg",
+                    length=34216300,
+                )
+            ],
+        )
+        self.assertEqual(item.media[0].file_size, 123456789)
+        self.assertEqual(item.media[0].duration, 1800)
+        self.assertEqual(item.media[0].medium, "video")
+        self.assertEqual(
+            item.thumbnails, [MediaThumbnail(url=item.thumbnails[0].url, width=120, height=90)]
+        )
+        self.assertEqual(
+            item.itunes,
+            ITunesInfo(
+                duration=1800,
+                episode=2,
+                explicit="false",
+                image="https://www.example.com/podcasts/dafnas-zebras/img/toptenmyths.jpg",
+            ),
+        )
+        self.assertEqual(item._data, {})
+        # channel data is left untouched
+        self.assertIn("{http://www.itunes.com/dtds/podcast-1.0.dtd}author", feed._data)
+
+    def test_partial(self):
+        item = rss.parse_file("tests/podcast.xml").items[1]
+        self.assertEqual(item.itunes.duration, 4968)
+        self.assertIn("{http://www.itunes.com/dtds/podcast-1.0.dtd}keywords", item._data)
+        # media:content with children is kept as data
+        self.assertEqual(item.media, [])
+        self.assertIn("{http://search.yahoo.com/mrss/}content", item._data)
+
+    def test_inout(self):
+        feed = rss.parse_file("tests/podcast.xml")
+        xml = rss.generate(feed)
+        self.assertTrue(utils.xml_equals("tests/podcast.xml", xml))
+        self.assertEqual(rss.parse_text(xml), feed)
+
+    def test_atom(self):
+        feed = rss.parse_file("tests/podcast.xml")
+        xml = atom.generate(feed)
+        self.assertIn('<link rel="enclosure" href="https://www.example.com/podcasts/', xml)
+        back = atom.parse_text(xml)
+        self.assertEqual(back.items[0].enclosures, feed.items[0].enclosures)
+        self.assertEqual(back.items[0].media, feed.items[0].media)
+        self.assertEqual(back.items[0].itunes, feed.items[0].itunes)
+
+    def test_not_digits(self):
+        xml = (
+            '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"'
+            ' xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"><channel><item>'
+            '<media:content url="https://example.org/a.mp4" width="²"/>'
+            "<itunes:duration>1:³</itunes:duration><itunes:episode>²</itunes:episode>"
+            "</item></channel></rss>"
+        )
+        item = rss.parse_text(xml).items[0]
+        self.assertEqual(item.media, [])
+        self.assertIsNone(item.itunes)
+        self.assertEqual(len(item._data), 3)
+
+    def test_duration(self):
+        self.assertEqual(parse_duration("1800"), 1800)
+        self.assertEqual(parse_duration("30:00"), 1800)
+        self.assertEqual(parse_duration("0:30:00"), 1800)
+        self.assertIsNone(parse_duration("30 min"))
+        self.assertIsNone(parse_duration("1:²"))
+        self.assertIsNone(parse_duration("٣"))
+        self.assertEqual(format_duration(1800), "30:00")
+        self.assertEqual(format_duration(4968), "1:22:48")
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            MediaContent().extra = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import feedendum.atom as atom
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.multi import generate_all
+
+
+class MultiTest(unittest.TestCase):
+    def test_generate_all(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        result = generate_all(feed)
+        self.assertEqual(set(result), {"rss", "atom", "rdf"})
+        self.assertEqual(result["rss"], rss.generate(feed))
+        self.assertEqual(result["atom"], atom.generate(feed))
+        self.assertEqual(result["rdf"], rdf.generate(feed))
+
+    def test_generate_some(self):
+        feed = atom.parse_file("tests/martinfowler.atom")
+        result = generate_all(feed, formats=["atom"])
+        self.assertEqual(list(result), ["atom"])
+        self.assertEqual(result["atom"], atom.generate(feed))
+
+    def test_unsupported(self):
+        feed = atom.parse_file("tests/martinfowler.atom")
+        with self.assertRaises(ValueError):
+            generate_all(feed, formats=["json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import os
+import tempfile
+import unittest
+
+import feedendum
+import feedendum.atom as atom
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.fragments import FragmentCache
+
+FILES = {
+    rss: "tests/wikipedia-rss.xml",
+    atom: "tests/martinfowler.atom",
+    rdf: "tests/lwn.rdf",
+}
+
+
+class OutputTest(unittest.TestCase):
+    def test_bytes(self):
+        for module, path in FILES.items():
+            feed = module.parse_file(path)
+            data = module.generate_bytes(feed)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(data.decode("utf-8"), module.generate(feed))
+            cache = FragmentCache()
+            cached = module.generate_bytes(feed, cache=cache)
+            self.assertEqual(module.generate_bytes(feed, cache=cache), cached)
+            self.assertEqual(cache.hits, len(feed.items))
+            self.assertEqual(module.parse_text(cached.decode("utf-8")), feed)
+            with self.assertRaises(ValueError):
+                module.generate_bytes(feed, cache=cache, pretty_print=True)
+        self.assertIs(feedendum.to_atom_bytes, atom.generate_bytes)
+
+    def test_file(self):
+        for module, path in FILES.items():
+            feed = module.parse_file(path)
+            buffer = io.BytesIO()
+            self.assertIsNone(module.generate(feed, file=buffer))
+            self.assertEqual(buffer.getvalue(), module.generate_bytes(feed))
+            buffer = io.BytesIO()
+            module.generate(feed, FragmentCache(), file=buffer)
+            self.assertEqual(module.parse_text(buffer.getvalue().decode("utf-8")), feed)
+            with tempfile.TemporaryDirectory() as tmp:
+                target = os.path.join(tmp, "feed.xml.gz")
+                module.generate(feed, file=target, pretty_print=True)
+                self.assertEqual(module.parse_file(target), feed)
+
+    def test_pretty_print(self):
+        for module, path in FILES.items():
+            feed = module.parse_file(path)
+            pretty = module.generate_bytes(feed, pretty_print=True)
+            self.assertGreater(pretty.count(b"\n"), module.generate_bytes(feed).count(b"\n"))
+            self.assertEqual(module.parse_text(pretty.decode("utf-8")), feed)
+
+    def test_without_data(self):
+        for module, path in FILES.items():
+            feed = module.parse_file(path)
+            self.assertTrue(feed._data or any(i._data for i in feed.items))
+            data = module.generate_bytes(feed, with_data=False)
+            self.assertLess(len(data), len(module.generate_bytes(feed)))
+            parsed = module.parse_text(data.decode("utf-8"))
+            self.assertEqual([i.title for i in parsed.items], [i.title for i in feed.items])
+            self.assertEqual([i.content for i in parsed.items], [i.content for i in feed.items])
+            self.assertFalse(any(i._data for i in parsed.items))
+            cache = FragmentCache()
+            cached = module.generate_bytes(feed, cache, with_data=False).decode("utf-8")
+            self.assertEqual(module.parse_text(cached), parsed)
+            cached = module.generate_bytes(feed, cache).decode("utf-8")
+            self.assertEqual(module.parse_text(cached), feed)
@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime as dt
+from datetime import timedelta
+
+try:
+    import requests
+except ModuleNotFoundError:
+    requests = None  # type: ignore
+
+from utils import LocalServer, QuietHandler
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.feed import Feed, FeedItem
+from feedendum.paging import FH_ARCHIVE, Pager, iter_items, iter_pages, links
+
+
+def _feed(size):
+    feed = Feed(title="Paged", url="http://example.org/")
+    start = dt(2020, 1, 1)
+    for i in range(size):
+        feed.items.append(
+            FeedItem(id=f"id{i}", title=f"Item {i}", update=start + timedelta(days=i))
+        )
+    return feed
+
+
+def _url_for(index):
+    return "/current" if index is None else f"/archive/{index}"
+
+
+class PagingTest(unittest.TestCase):
+    def test_split(self):
+        pager = Pager(_feed(25), 10, _url_for)
+        self.assertEqual(pager.archives, 2)
+        self.assertEqual([i.id for i in pager.items(0)], [f"id{i}" for i in range(10)])
+        self.assertEqual([i.id for i in pager.items()], [f"id{i}" for i in range(20, 25)])
+        with self.assertRaises(IndexError):
+            pager.items(2)
+        self.assertEqual(Pager(_feed(20), 10, _url_for).archives, 1)
+        self.assertEqual(Pager(_feed(0), 10, _url_for).archives, 0)
+
+    def test_links(self):
+        pager = Pager(_feed(25), 10, _url_for)
+        current = dict(links(atom.parse_text(pager.generate("atom"))))
+        self.assertEqual(current["prev-archive"], "/archive/1")
+        self.assertEqual(current["next"], "/archive/1")
+        self.assertEqual(current["first"], "/current")
+        archive = atom.parse_text(pager.generate("atom", 0))
+        self.assertIn(FH_ARCHIVE, archive._data)
+        self.assertEqual(len(archive.items), 10)
+        rels = dict(links(archive))
+        self.assertEqual(rels["next-archive"], "/archive/1")
+        self.assertEqual(rels["current"], "/current")
+        self.assertNotIn("prev-archive", rels)
+        rels = dict(links(rss.parse_text(pager.generate("rss", 1))))
+        self.assertEqual(rels["prev-archive"], "/archive/0")
+        self.assertEqual(rels["previous"], "/current")
+        self.assertNotIn("next-archive", rels)
+
+    def test_compact_ns(self):
+        feed = atom.parse_file("tests/martinfowler.atom", compact_ns=True)
+        self.assertEqual(links(feed), [("self", "https://martinfowler.com/feed.atom")])
+        feed.items = _feed(25).items
+        pager = Pager(feed, 10, _url_for)
+        page = pager.page(0)
+        self.assertNotIn(FH_ARCHIVE, page._data)
+        self.assertEqual(page._data["fh:archive"], "")
+        rels = links(page)
+        self.assertNotIn(("self", "https://martinfowler.com/feed.atom"), rels)
+        self.assertEqual([rel for rel, _ in rels].count("self"), 1)
+        rels = links(atom.parse_text(pager.generate("atom", 0), compact_ns=True))
+        self.assertEqual(dict(rels)["self"], "/archive/0")
+        self.assertEqual(len(rels), 5)
+
+    def test_cache(self):
+        feed = _feed(25)
+        pager = Pager(feed, 10, _url_for)
+        archive = pager.generate("atom", 0)
+        self.assertIs(pager.generate("atom", 0), archive)
+        feed.items.extend(_feed(10).items)
+        self.assertEqual(pager.archives, 3)
+        self.assertIs(pager.generate("atom", 0), archive)
+        self.assertIn("/archive/2", pager.generate("atom", 1))
+
+
+class _Handler(QuietHandler):
+    pager = Pager(_feed(25), 10, _url_for)
+
+    def do_GET(self):  # noqa: N802
+        index = None if self.path == "/current" else int(self.path.split("/")[-1])
+        body = self.pager.generate("atom", index).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@unittest.skipUnless(requests, "requests not available")
+class IterPagesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(_Handler)
+        cls.base = cls.server.url
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def test_iter_pages(self):
+        pages = list(iter_pages(self.base + "/current"))
+        self.assertEqual([len(p.items) for p in pages], [5, 10, 10])
+        pages = list(iter_pages(self.base + "/current", max_pages=2))
+        self.assertEqual(len(pages), 2)
+        pages = list(iter_pages(self.base + "/current", compact_ns=True))
+        self.assertEqual([len(p.items) for p in pages], [5, 10, 10])
+
+    def test_iter_items(self):
+        ids = [item.id for item in iter_items(self.base + "/current")]
+        self.assertEqual(sorted(ids), sorted(f"id{i}" for i in range(25)))
+
+
+if __name__ == "__main__":
+    unittest.main()
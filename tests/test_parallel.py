@@ -0,0 +1,95 @@
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import feedendum.atom as atom
+import feedendum.multi as multi
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum import extensions, parallel
+from feedendum.feed import Feed, FeedItem
+
+
+def _feed(n: int) -> Feed:
+    feed = rss.parse_file("tests/wikipedia-rss.xml")
+    feed.items = [
+        FeedItem(
+            id=f"urn:{i}",
+            title=f"Item {i}",
+            url=f"https://example.org/{i}",
+            content=f"<p>Content {i}</p>",
+            content_type="html",
+            categories=["a"],
+            _data={"{http://purl.org/dc/elements/1.1/}creator": f"Author {i}"},
+        )
+        for i in range(n)
+    ]
+    return feed
+
+
+class ParallelTest(unittest.TestCase):
+    def test_equivalent(self):
+        feed = _feed(50)
+        for fmt, module in (("rss", rss), ("atom", atom), ("rdf", rdf)):
+            with self.subTest(fmt=fmt):
+                text = parallel.generate(feed, fmt, workers=2, chunk_size=7)
+                self.assertEqual(module.parse_text(text), module.parse_text(module.generate(feed)))
+                self.assertEqual(
+                    [i.title for i in module.parse_text(text).items],
+                    [i.title for i in feed.items],
+                )
+
+    def test_real_feeds(self):
+        for file in ("tests/wikipedia-rss.xml", "tests/martinfowler.atom"):
+            feed = multi.parse_file(file)
+            for fmt, module in multi.FORMATS.items():
+                with self.subTest(file=file, fmt=fmt):
+                    data = parallel.generate_bytes(feed, fmt, workers=2, chunk_size=3)
+                    self.assertEqual(
+                        module.parse_text(data.decode()), module.parse_text(module.generate(feed))
+                    )
+
+    def test_serial(self):
+        feed = _feed(20)
+        self.assertEqual(
+            parallel.generate_bytes(feed, "atom", workers=1),
+            parallel.generate_bytes(feed, "atom", workers=2, chunk_size=3),
+        )
+        self.assertEqual(
+            atom.parse_text(parallel.generate(Feed(title="Empty"), "atom", workers=2)),
+            atom.parse_text(atom.generate(Feed(title="Empty"))),
+        )
+        with self.assertRaises(ValueError):
+            parallel.generate(feed, "json")
+
+    def test_options(self):
+        feed = _feed(20)
+        with ProcessPoolExecutor(2) as executor:
+            text = parallel.generate(feed, "rss", chunk_size=4, with_data=False, executor=executor)
+            self.assertEqual(text, parallel.generate(feed, "rss", workers=1, with_data=False))
+        self.assertNotIn("Author", text)
+        self.assertEqual(rss.parse_text(text), rss.parse_text(rss.generate(feed, with_data=False)))
+
+    def test_extensions(self):
+        feed = Feed(
+            title="T",
+            items=[FeedItem(id=f"urn:{i}", extensions={"slash:comments": i}) for i in range(20)],
+        )
+        context = multiprocessing.get_context("spawn")
+        try:
+            extensions.register("slash:comments", extensions.integer)
+            with ProcessPoolExecutor(2, mp_context=context) as executor:
+                data = parallel.generate_bytes(feed, "rss", chunk_size=4, executor=executor)
+                self.assertEqual(data.count(b"<slash:comments>"), 20)
+                # not picklable: serialized in this process
+                extensions.register(
+                    "slash:comments",
+                    write=lambda item, tag, value: extensions.write_text(item, tag, -value),
+                )
+                data = parallel.generate_bytes(feed, "rss", chunk_size=4, executor=executor)
+                self.assertIn(b"<slash:comments>-19</slash:comments>", data)
+                extensions.unregister("slash:comments")
+                data = parallel.generate_bytes(feed, "rss", chunk_size=4, executor=executor)
+                self.assertNotIn(b"slash:comments", data)
+        finally:
+            extensions.REGISTRY.clear()
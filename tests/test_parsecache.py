@@ -0,0 +1,113 @@
+import copy
+import gzip
+import io
+import pickle
+import threading
+import unittest
+
+import feedendum.atom as atom
+import feedendum.multi as multi
+import feedendum.rss as rss
+from feedendum.exceptions import FeedLimitError, FeedParseError, FeedXMLError
+from feedendum.limits import Limits
+from feedendum.parsecache import ParseCache
+
+with open("tests/wikipedia-rss.xml", encoding="utf-8") as f:
+    RSS_TEXT = f.read()
+
+
+class ParseCacheTest(unittest.TestCase):
+    def test_copy(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        self.assertEqual(copy.deepcopy(feed), feed)
+        self.assertEqual(pickle.loads(pickle.dumps(feed)), feed)
+        with self.assertRaises(KeyError):
+            feed.missing  # noqa: B018
+
+    def test_hits(self):
+        cache = ParseCache()
+        first = rss.parse_text(RSS_TEXT, cache=cache)
+        self.assertEqual(first, rss.parse_text(RSS_TEXT))
+        first.title = "Changed"
+        first.items[0].categories.append("changed")
+        second = rss.parse_text(RSS_TEXT, cache=cache)
+        self.assertEqual(second, rss.parse_text(RSS_TEXT))
+        self.assertIsNot(second, rss.parse_text(RSS_TEXT, cache=cache))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (2, 1, 1))
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+        self.assertEqual(rss.parse_file("tests/wikipedia-rss.xml", cache=cache), second)
+        self.assertEqual(cache.hits, 3)
+        with open("tests/wikipedia-rss.xml", encoding="utf-8") as f:
+            self.assertEqual(rss.parse_file(f, cache=cache), second)
+        self.assertEqual(cache.hits, 4)
+
+    def test_key(self):
+        cache = ParseCache()
+        rss.parse_text(RSS_TEXT, cache=cache)
+        rss.parse_text(RSS_TEXT, compact_ns=True, cache=cache)
+        rss.parse_text(RSS_TEXT, limits=Limits(max_items=5, truncate=True), cache=cache)
+        self.assertEqual(cache.misses, 3)
+        feed = multi.parse_file(io.BytesIO(RSS_TEXT.encode()), cache=cache)
+        self.assertEqual(feed, rss.parse_text(RSS_TEXT))
+        self.assertEqual(cache.misses, 4)
+        feed = rss.parse_text(RSS_TEXT, limits=Limits(max_items=5, truncate=True), cache=cache)
+        self.assertEqual(len(feed.items), 5)
+        self.assertEqual(cache.hits, 1)
+
+    def test_errors(self):
+        cache = ParseCache()
+        with self.assertRaises(FeedXMLError):
+            rss.parse_text("<rss>", cache=cache)
+        with self.assertRaises(FeedParseError):
+            atom.parse_text(RSS_TEXT, cache=cache)
+        with self.assertRaises(FeedLimitError):
+            rss.parse_text(RSS_TEXT, limits=Limits(max_bytes=1000), cache=cache)
+        data = gzip.compress(RSS_TEXT.encode())
+        with self.assertRaises(FeedLimitError):
+            multi.parse_file(io.BytesIO(data), limits=Limits(max_bytes=1000), cache=cache)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            rss.parse_file("ftp://example.org/feed.xml", cache=cache)
+
+    def test_eviction(self):
+        cache = ParseCache(maxsize=2)
+        texts = [RSS_TEXT.replace("<title>", f"<title>{n} ", 1) for n in range(3)]
+        for text in texts:
+            rss.parse_text(text, cache=cache)
+        rss.parse_text(texts[2], cache=cache)
+        rss.parse_text(texts[0], cache=cache)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 4, 2))
+        size = cache.size * 3 // 4
+        cache = ParseCache(maxbytes=size)
+        for text in texts:
+            rss.parse_text(text, cache=cache)
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.size, size)
+        cache = ParseCache(maxbytes=100)
+        rss.parse_text(RSS_TEXT, cache=cache)
+        self.assertEqual((len(cache), cache.size), (0, 0))
+        cache = ParseCache()
+        rss.parse_text(RSS_TEXT, cache=cache)
+        cache.clear()
+        self.assertEqual((len(cache), cache.size, cache.misses), (0, 0, 1))
+
+    def test_threads(self):
+        cache = ParseCache(maxsize=3)
+        texts = [RSS_TEXT.replace("<title>", f"<title>{n} ", 1) for n in range(5)]
+        expected = [rss.parse_text(text) for text in texts]
+        errors = []
+
+        def work(offset):
+            for i in range(20):
+                n = (i + offset) % len(texts)
+                if rss.parse_text(texts[n], cache=cache) != expected[n]:
+                    errors.append(n)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(cache.hits + cache.misses, 80)
+        self.assertLessEqual(len(cache), 3)
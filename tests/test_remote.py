@@ -0,0 +1,129 @@
+import time
+import unittest
+import unittest.mock
+
+try:
+    import requests
+except ModuleNotFoundError:
+    requests = None  # type: ignore
+
+from utils import LocalServer, QuietHandler
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.exceptions import FeedLimitError, FeedXMLError, RemoteFeedError
+from feedendum.limits import Limits
+from feedendum.parsecache import ParseCache
+
+with open("tests/wikipedia-rss.xml", "rb") as f:
+    RSS_BODY = f.read()
+
+
+class _Handler(QuietHandler):
+    def do_GET(self):  # noqa: N802
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        body = b"<rss" if self.path == "/broken" else RSS_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        if self.path == "/badlength":
+            self.send_header("Content-Length", "²")
+        elif self.path != "/chunked":
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            if self.path == "/drip":
+                for i in range(len(body)):
+                    self.wfile.write(body[i : i + 1])
+                    self.wfile.flush()
+                    time.sleep(0.01)
+                return
+            for i in range(0, len(body), 1024):
+                self.wfile.write(body[i : i + 1024])
+                self.wfile.flush()
+                if self.path == "/slow":
+                    time.sleep(0.05)
+        except (BrokenPipeError, ConnectionResetError):
+            # client aborted the download
+            pass
+
+
+@unittest.skipUnless(requests, "requests not available")
+class RemoteTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(_Handler)
+        cls.base = cls.server.url
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def test_parse_url(self):
+        feed = rss.parse_url(self.base + "/feed")
+        self.assertEqual(feed, rss.parse_file("tests/wikipedia-rss.xml"))
+
+    def test_status(self):
+        with self.assertRaises(RemoteFeedError):
+            rss.parse_url(self.base + "/missing")
+
+    def test_invalid(self):
+        with self.assertRaises(FeedXMLError):
+            atom.parse_url(self.base + "/broken")
+
+    def test_max_bytes(self):
+        with self.assertRaises(RemoteFeedError):
+            rss.parse_url(self.base + "/feed", max_bytes=1000)
+        with self.assertRaises(RemoteFeedError):
+            rss.parse_url(self.base + "/chunked", max_bytes=1000)
+        feed = rss.parse_url(self.base + "/chunked", max_bytes=len(RSS_BODY))
+        self.assertTrue(len(feed.items) > 1)
+        with self.assertRaises(RemoteFeedError):
+            rss.parse_url(self.base + "/badlength", max_bytes=1000)
+        feed = rss.parse_url(self.base + "/badlength", limits=Limits(max_bytes=len(RSS_BODY)))
+        self.assertTrue(len(feed.items) > 1)
+
+    def test_timeout(self):
+        for path in ("/slow", "/drip"):
+            with self.subTest(path=path):
+                start = time.monotonic()
+                with self.assertRaises(RemoteFeedError):
+                    rss.parse_url(self.base + path, timeout=0.2)
+                self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_timeout_no_socket(self):
+        # the deadline is checked between reads also when the socket is not reachable
+        with unittest.mock.patch("feedendum.remote._socket", return_value=None):
+            for path in ("/slow", "/drip"):
+                with self.subTest(path=path):
+                    start = time.monotonic()
+                    with self.assertRaises(RemoteFeedError):
+                        rss.parse_url(self.base + path, timeout=0.2)
+                    self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_limits(self):
+        with self.assertRaises(FeedLimitError):
+            rss.parse_url(self.base + "/chunked", limits=Limits(max_bytes=1000))
+        with self.assertRaises(FeedLimitError):
+            rss.parse_url(self.base + "/feed", limits=Limits(max_items=2))
+        feed = rss.parse_url(self.base + "/chunked", limits=Limits(max_items=2, truncate=True))
+        self.assertEqual(len(feed.items), 2)
+
+    def test_cache(self):
+        cache = ParseCache()
+        feed = rss.parse_url(self.base + "/chunked", cache=cache)
+        self.assertEqual(feed, rss.parse_url(self.base + "/feed", cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(rss.parse_file(self.base + "/feed", cache=cache), feed)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        with self.assertRaises(FeedLimitError):
+            rss.parse_url(self.base + "/chunked", limits=Limits(max_bytes=1000), cache=cache)
+        with self.assertRaises(RemoteFeedError):
+            rss.parse_url(self.base + "/feed", max_bytes=1000, cache=cache)
+        with self.assertRaises(FeedXMLError):
+            rss.parse_url(self.base + "/broken", cache=cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
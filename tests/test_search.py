@@ -0,0 +1,122 @@
+import io
+import os
+import tempfile
+import unittest
+
+import feedendum.rss as rss
+from feedendum.feed import Feed, FeedItem
+from feedendum.search import (
+    InvertedIndex,
+    QuerySyntaxError,
+    _read_varint,
+    _write_varint,
+    strip_tags,
+    tokenize,
+)
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add("a", FeedItem(title="Python release", content="<p>New <b>parser</b></p>"))
+        self.index.add("b", FeedItem(title="Rust release", categories=["Programming"]))
+        self.index.add("c", FeedItem(title="Gardening", content="Tomatoes &amp; python"))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Hello, World! Ciao-2"), ["hello", "world", "ciao", "2"])
+        self.assertEqual(strip_tags("<p>a <b>b</b></p>").split(), ["a", "b"])
+        self.assertEqual(
+            strip_tags("<p>one</p><p>two<br>three</p>").split(), ["one", "two", "three"]
+        )
+        self.assertEqual(strip_tags("plain"), "plain")
+
+    def test_queries(self):
+        self.assertEqual(self.index.search("release"), ["a", "b"])
+        self.assertEqual(self.index.search("python release"), ["a"])
+        self.assertEqual(self.index.search("python AND release"), ["a"])
+        self.assertEqual(self.index.search("rust OR gardening"), ["b", "c"])
+        self.assertEqual(self.index.search("release NOT python"), ["b"])
+        self.assertEqual(self.index.search("release -python"), ["b"])
+        self.assertEqual(self.index.search("NOT release"), ["c"])
+        self.assertEqual(self.index.search("(rust OR tomatoes) release"), ["b"])
+        self.assertEqual(self.index.search("pars*"), ["a"])
+        self.assertEqual(self.index.search("prog*"), ["b"])
+        self.assertEqual(self.index.search("parser"), ["a"])
+        self.assertEqual(self.index.search("b"), [])
+        self.assertEqual(self.index.search(""), [])
+        # words without letters or digits are ignored
+        self.assertEqual(self.index.search("python - release …"), ["a"])
+        self.assertEqual(self.index.search("- …"), [])
+        self.assertEqual(self.index.search("*"), [])
+        for query in ("(release", "release)", "OR", "NOT", "a OR"):
+            with self.assertRaises(QuerySyntaxError):
+                self.index.search(query)
+
+    def test_blocks(self):
+        self.index.add("d", FeedItem(content="<p>one</p><p>two</p>"))
+        self.assertEqual(self.index.search("one two"), ["d"])
+        self.assertEqual(self.index.search("two"), ["d"])
+
+    def test_incremental(self):
+        self.assertFalse(
+            self.index.add(
+                "a", FeedItem(title="Python release", content="<p>New <b>parser</b></p>")
+            )
+        )
+        self.assertTrue(self.index.add("a", FeedItem(title="Python beta")))
+        self.assertEqual(self.index.search("release"), ["b"])
+        self.assertEqual(self.index.search("beta"), ["a"])
+        self.assertTrue(self.index.remove("b"))
+        self.assertFalse(self.index.remove("b"))
+        self.assertEqual(self.index.search("release"), [])
+        self.assertEqual(self.index.search("rust"), [])
+        self.assertNotIn("release", self.index._postings)
+        self.assertEqual(len(self.index), 2)
+
+    def test_index_feed(self):
+        index = InvertedIndex()
+        feed = Feed(items=[FeedItem(id="1", title="one"), FeedItem(id="2", title="two")])
+        self.assertEqual(index.index_feed(feed, "s"), (2, 0))
+        self.assertEqual(index.index_feed(feed, "s"), (0, 0))
+        feed.items = [FeedItem(id="2", title="two bis"), FeedItem(id="3", title="three")]
+        self.assertEqual(index.index_feed(feed, "s"), (2, 1))
+        self.assertEqual(index.search("one"), [])
+        self.assertEqual(index.search("two"), ["s\n2"])
+        index.index_feed(feed, "t")
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.remove_feed("s"), 2)
+        self.assertEqual(index.search("three"), ["t\n3"])
+
+    def test_save_load(self):
+        index = InvertedIndex()
+        index.index_feed(rss.parse_file("tests/wikipedia-rss.xml"), "wikipedia")
+        index.remove(next(iter(index._docs)))
+        buffer = io.BytesIO()
+        index.save(buffer)
+        buffer.seek(0)
+        loaded = InvertedIndex.load(buffer)
+        self.assertEqual(loaded._postings, index._postings)
+        self.assertEqual(loaded._terms, index._terms)
+        self.assertEqual(loaded._docs, index._docs)
+        self.assertEqual(loaded.search("wiki*"), index.search("wiki*"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index")
+            index.save(path)
+            loaded = InvertedIndex.load(path)
+        self.assertEqual(
+            loaded.index_feed(rss.parse_file("tests/wikipedia-rss.xml"), "wikipedia"), (1, 0)
+        )
+        with self.assertRaises(ValueError):
+            InvertedIndex.load(io.BytesIO(b"nope"))
+
+    def test_varint(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, 2**32 - 1]
+        for value in values:
+            _write_varint(out, value)
+        self.assertEqual(len(out), 1 + 1 + 1 + 2 + 2 + 5)
+        pos, result = 0, []
+        for _ in values:
+            value, pos = _read_varint(memoryview(out), pos)
+            result.append(value)
+        self.assertEqual(result, values)
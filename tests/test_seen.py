@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+import feedendum.rss as rss
+from feedendum.feed import Feed, FeedItem
+from feedendum.seen import BloomFilter, SeenStore, digest
+
+
+class SeenTest(unittest.TestCase):
+    def test_bloom(self):
+        bloom = BloomFilter(1000, 0.01)
+        self.assertEqual(bloom.size, 9586)
+        self.assertEqual(bloom.hashes, 7)
+        for i in range(1000):
+            bloom.add(digest(str(i)))
+        self.assertFalse(bloom.add(digest("7")))
+        self.assertGreater(bloom.count, 990)
+        self.assertLessEqual(bloom.count, 1000)
+        self.assertTrue(all(digest(str(i)) in bloom for i in range(1000)))
+        false_positives = sum(digest(f"x{i}") in bloom for i in range(10000))
+        self.assertLess(false_positives, 200)
+        with self.assertRaises(ValueError):
+            BloomFilter(10, 1.5)
+
+    def test_filter_new(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        with SeenStore() as store:
+            self.assertEqual(store.filter_new(feed), feed.items)
+            self.assertEqual(len(store), len(feed.items))
+            self.assertEqual(store.filter_new(feed), [])
+            new = FeedItem(url="https://example.org/new")
+            anonymous = FeedItem()
+            feed.items += [new, new, anonymous]
+            self.assertEqual(store.filter_new(feed, mark=False), [new, anonymous])
+            self.assertNotIn(new, store)
+            self.assertEqual(store.filter_new(feed), [new, anonymous])
+            self.assertIn(new, store)
+            self.assertNotIn(anonymous, store)
+
+    def test_persistence(self):
+        feeds = [Feed(items=[FeedItem(id=f"{n}-{i}") for i in range(50)]) for n in range(20)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seen.db")
+            with SeenStore(path, capacity=5000) as store:
+                store.bulk_load(feeds)
+                bits = bytes(store.bloom.bits)
+            with SeenStore(path, capacity=5000) as store:
+                self.assertEqual(bytes(store.bloom.bits), bits)
+                self.assertEqual(store.bloom.count, 1000)
+                store.bulk_load(feeds)
+                store.add(feeds[0].items)
+                self.assertEqual(store.bloom.count, 1000)
+                self.assertIn(FeedItem(id="3-7"), store)
+                self.assertEqual(store.filter_new(feeds[0]), [])
+            with SeenStore(path, capacity=100, fp_rate=0.1) as store:
+                self.assertIn(FeedItem(id="3-7"), store)
+                self.assertNotIn(FeedItem(id="30-7"), store)
+                self.assertEqual(len(store), 1000)
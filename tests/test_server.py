@@ -0,0 +1,239 @@
+import asyncio
+import gzip
+import threading
+import unittest
+from datetime import datetime, timezone
+from wsgiref.util import setup_testing_defaults
+from wsgiref.validate import validator
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.feed import Feed, FeedItem
+from feedendum.fragments import FragmentCache
+from feedendum.server import CHUNK_SIZE, FeedApp
+
+
+def _feed(n: int = 3) -> Feed:
+    return Feed(
+        title="T",
+        url="https://example.org/",
+        update=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        items=[
+            FeedItem(id=str(i), title=f"Item {i}", url=f"https://example.org/{i}") for i in range(n)
+        ],
+    )
+
+
+def wsgi_get(app, path: str, method: str = "GET", **headers):
+    environ: dict = {
+        "PATH_INFO": path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": "",
+        "REQUEST_METHOD": method,
+    }
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper()] = value
+    setup_testing_defaults(environ)
+    response = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        response["status"] = int(status.split()[0])
+        response["headers"] = dict(response_headers)
+
+    result = validator(app)(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        result.close()
+    return response["status"], response["headers"], body
+
+
+def asgi_get(app, path: str, method: str = "GET", **headers):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app.asgi(scope, receive, send))
+    start, *bodies = messages
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    assert not bodies[-1]["more_body"]
+    return start["status"], headers, b"".join(m["body"] for m in bodies), len(bodies)
+
+
+class ServerTest(unittest.TestCase):
+    def test_wsgi(self):
+        feed = _feed()
+        app = FeedApp()
+        app.add("/feed.atom", feed)
+        app.add("/feed.rss", feed, "rss")
+        status, headers, body = wsgi_get(app, "/feed.atom")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/atom+xml; charset=utf-8")
+        self.assertEqual(headers["Last-Modified"], "Tue, 02 Jan 2024 03:04:05 GMT")
+        self.assertEqual(body, atom.generate_bytes(feed))
+        self.assertEqual(
+            rss.parse_text(wsgi_get(app, "/feed.rss")[2].decode()),
+            rss.parse_text(rss.generate(feed)),
+        )
+        self.assertEqual(wsgi_get(app, "/missing")[0], 404)
+        self.assertEqual(wsgi_get(app, "/feed.atom", "POST")[0], 405)
+        status, headers, body = wsgi_get(app, "/feed.atom", "HEAD")
+        self.assertEqual((status, body), (200, b""))
+        self.assertGreater(int(headers["Content-Length"]), 0)
+        with self.assertRaises(ValueError):
+            app.add("/x", feed, "json")
+
+    def test_conditional(self):
+        app = FeedApp()
+        app.add("/feed", _feed())
+        _, headers, _ = wsgi_get(app, "/feed")
+        etag = headers["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        status, headers, body = wsgi_get(app, "/feed", if_none_match=etag)
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(headers["ETag"], etag)
+        self.assertEqual(wsgi_get(app, "/feed", if_none_match=f'"x", W/{etag}')[0], 304)
+        self.assertEqual(wsgi_get(app, "/feed", if_none_match='"x"')[0], 200)
+        self.assertEqual(
+            wsgi_get(app, "/feed", if_modified_since="Tue, 02 Jan 2024 03:04:05 GMT")[0], 304
+        )
+        self.assertEqual(
+            wsgi_get(app, "/feed", if_modified_since="Mon, 01 Jan 2024 00:00:00 GMT")[0], 200
+        )
+        self.assertEqual(wsgi_get(app, "/feed", if_modified_since="garbage")[0], 200)
+        # If-None-Match takes precedence
+        status = wsgi_get(
+            app, "/feed", if_none_match='"x"', if_modified_since="Tue, 02 Jan 2024 03:04:05 GMT"
+        )[0]
+        self.assertEqual(status, 200)
+
+    def test_last_modified(self):
+        feed = _feed()
+        feed.update = None
+        app = FeedApp(check_interval=0)
+        app.add("/feed", feed)
+        _, headers, _ = wsgi_get(app, "/feed")
+        self.assertNotIn("Last-Modified", headers)
+        self.assertEqual(
+            wsgi_get(app, "/feed", if_modified_since="Tue, 02 Jan 2024 03:04:05 GMT")[0], 200
+        )
+        feed.items[1].update = datetime(2024, 3, 4, 5, 6, 7)
+        _, headers, _ = wsgi_get(app, "/feed")
+        self.assertEqual(headers["Last-Modified"], "Mon, 04 Mar 2024 05:06:07 GMT")
+        # changed without a newer date
+        del feed.items[0]
+        since = headers["Last-Modified"]
+        status, headers, _ = wsgi_get(app, "/feed", if_modified_since=since)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["Last-Modified"], since)
+        self.assertEqual(wsgi_get(app, "/feed", if_modified_since=headers["Last-Modified"])[0], 304)
+
+    def test_gzip(self):
+        feed = _feed()
+        app = FeedApp()
+        app.add("/feed", feed)
+        _, plain_headers, plain = wsgi_get(app, "/feed")
+        status, headers, body = wsgi_get(app, "/feed", accept_encoding="br, gzip;q=0.5")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertNotEqual(headers["ETag"], plain_headers["ETag"])
+        status, headers, _ = wsgi_get(
+            app, "/feed", accept_encoding="gzip", if_none_match=headers["ETag"]
+        )
+        self.assertEqual(status, 304)
+        self.assertEqual(wsgi_get(app, "/feed", if_none_match=headers["ETag"])[0], 200)
+        _, headers, _ = wsgi_get(app, "/feed", accept_encoding="gzip;q=0")
+        self.assertNotIn("Content-Encoding", headers)
+
+    def test_invalidation(self):
+        feed = _feed()
+        app = FeedApp(check_interval=0, fragments=FragmentCache())
+        app.add("/feed", feed)
+        _, headers, _ = wsgi_get(app, "/feed")
+        first = app._entries["/feed"]
+        wsgi_get(app, "/feed")
+        self.assertIs(app._entries["/feed"], first)
+        feed.items[0].title = "Changed"
+        status, new_headers, new_body = wsgi_get(app, "/feed", if_none_match=headers["ETag"])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_headers["ETag"], headers["ETag"])
+        self.assertIn(b"Changed", new_body)
+        app.add("/feed", _feed(1))
+        self.assertEqual(len(atom.parse_text(wsgi_get(app, "/feed")[2].decode()).items), 1)
+        app.remove("/feed")
+        self.assertEqual(wsgi_get(app, "/feed")[0], 404)
+
+    def test_check_interval(self):
+        feed = _feed()
+        app = FeedApp(check_interval=3600)
+        app.add("/feed", feed)
+        body = wsgi_get(app, "/feed")[2]
+        feed.title = "Changed"
+        self.assertEqual(wsgi_get(app, "/feed")[2], body)
+        app.invalidate("/feed")
+        self.assertIn(b"Changed", wsgi_get(app, "/feed")[2])
+        feed.title = "Again"
+        app.invalidate()
+        self.assertIn(b"Again", wsgi_get(app, "/feed")[2])
+
+    def test_asgi(self):
+        feed = _feed(2000)
+        app = FeedApp()
+        app.add("/feed", feed)
+        status, headers, body, chunks = asgi_get(app, "/feed")
+        self.assertEqual(status, 200)
+        self.assertEqual(body, atom.generate_bytes(feed))
+        self.assertEqual(int(headers["content-length"]), len(body))
+        self.assertEqual(chunks, -(-len(body) // CHUNK_SIZE))
+        self.assertGreater(chunks, 1)
+        status, _, body, chunks = asgi_get(app, "/feed", if_none_match=headers["etag"])
+        self.assertEqual((status, body, chunks), (304, b"", 1))
+        status, headers, body, _ = asgi_get(app, "/feed", accept_encoding="gzip")
+        self.assertEqual(headers["content-encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), atom.generate_bytes(feed))
+        self.assertEqual(asgi_get(app, "/nope")[0], 404)
+
+    def test_asgi_thread(self):
+        app = FeedApp(check_interval=3600)
+        app.add("/feed", _feed())
+        threads = []
+        respond = app.respond
+
+        def recording(*args):
+            threads.append(threading.get_ident())
+            return respond(*args)
+
+        app.respond = recording  # type: ignore[method-assign]
+        asgi_get(app, "/feed")
+        asgi_get(app, "/feed")
+        asgi_get(app, "/feed", accept_encoding="gzip")
+        asgi_get(app, "/feed", accept_encoding="gzip")
+        main = threading.get_ident()
+        # generated and compressed in a thread, then served from the event loop
+        self.assertEqual([t == main for t in threads], [False, True, False, True])
+
+    def test_asgi_lifespan(self):
+        app = FeedApp()
+        incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(app.asgi({"type": "lifespan"}, receive, send))
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
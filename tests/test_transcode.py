@@ -0,0 +1,78 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+import feedendum.atom as atom
+import feedendum.multi as multi
+import feedendum.rdf as rdf
+import feedendum.rss as rss
+from feedendum.exceptions import FeedParseError, FeedXMLError
+from feedendum.feed import Feed
+from feedendum.transcode import transcode
+
+
+class TranscodeTest(unittest.TestCase):
+    def test_equivalent(self):
+        for file in ("tests/wikipedia-rss.xml", "tests/martinfowler.atom"):
+            feed = multi.parse_file(file)
+            for fmt, module in multi.FORMATS.items():
+                with self.subTest(file=file, fmt=fmt):
+                    out = io.BytesIO()
+                    self.assertEqual(transcode(file, out, fmt), len(feed.items))
+                    self.assertEqual(
+                        module.parse_text(out.getvalue().decode()),
+                        module.parse_text(module.generate(feed)),
+                    )
+
+    def test_chain(self):
+        feed = atom.parse_file("tests/martinfowler.atom")
+        source = io.BytesIO(atom.generate_bytes(feed))
+        for fmt in ("rdf", "rss", "atom"):
+            out = io.BytesIO()
+            transcode(source, out, fmt)
+            source = io.BytesIO(out.getvalue())
+        for module in (rdf, rss):
+            feed = module.parse_text(module.generate(feed))
+        expected = atom.generate(feed)
+        self.assertEqual(atom.parse_text(out.getvalue().decode()), atom.parse_text(expected))
+
+    def test_options(self):
+        feed = rss.parse_file("tests/wikipedia-rss.xml")
+        out = io.BytesIO()
+        transcode("tests/wikipedia-rss.xml", out, "atom", compact_ns=True, with_data=False)
+        expected = atom.generate(rss.parse_file("tests/wikipedia-rss.xml", True), with_data=False)
+        self.assertEqual(atom.parse_text(out.getvalue().decode()), atom.parse_text(expected))
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "feed.xml.gz")
+            target = os.path.join(tmp, "feed.atom.xz")
+            rss.write_file(feed, source)
+            self.assertEqual(transcode(source, target, "atom"), len(feed.items))
+            self.assertEqual(atom.parse_file(target), atom.parse_text(atom.generate(feed)))
+            out = io.BytesIO()
+            transcode(source, out, "rss", compression="gzip")
+            self.assertEqual(
+                rss.parse_text(gzip.decompress(out.getvalue()).decode()),
+                rss.parse_text(rss.generate(feed)),
+            )
+
+    def test_no_items(self):
+        out = io.BytesIO()
+        data = atom.generate_bytes(Feed(title="Empty", url="https://example.org/"))
+        self.assertEqual(transcode(io.BytesIO(data), out, "rss"), 0)
+        self.assertEqual(rss.parse_text(out.getvalue().decode()).title, "Empty")
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            transcode("tests/wikipedia-rss.xml", io.BytesIO(), "json")
+        with self.assertRaises(FeedXMLError):
+            transcode(io.BytesIO(b"<rss><channel>"), io.BytesIO(), "atom")
+        with self.assertRaises(FeedParseError):
+            transcode(io.BytesIO(b"<html><body/></html>"), io.BytesIO(), "atom")
+        with self.assertRaises(FeedParseError):
+            transcode(
+                io.BytesIO(b'<rss version="0.9"><channel><item/></channel></rss>'),
+                io.BytesIO(),
+                "atom",
+            )
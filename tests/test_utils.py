@@ -0,0 +1,70 @@
+import unittest
+
+import lxml.etree as ET
+
+import feedendum.atom as atom
+import feedendum.rss as rss
+from feedendum.utils import dict_append_etree, element_data, etree_to_dict
+
+
+class UtilsTest(unittest.TestCase):
+    def test_etree_to_dict(self):
+        root = ET.fromstring(
+            '<a x="1"><b>text</b><b y="2">more</b><c><d/></c><e>  </e><!-- comment --> tail</a>'
+        )
+        self.assertEqual(
+            etree_to_dict(root),
+            {
+                "a": {
+                    "@x": "1",
+                    "b": ["text", {"@y": "2", "#text": "more"}],
+                    "c": {"d": None},
+                    "e": "",
+                }
+            },
+        )
+
+    def test_interned(self):
+        first = element_data(ET.fromstring('<a><b x="1"/></a>'))
+        second = element_data(ET.fromstring('<a><b x="2"/></a>'))
+        self.assertIs(next(iter(first)), next(iter(second)))
+        self.assertIs(next(iter(first["b"])), next(iter(second["b"])))
+
+    def test_compact_ns(self):
+        root = ET.fromstring(
+            '<a xmlns:media="http://search.yahoo.com/mrss/" xmlns:o="urn:other">'
+            '<media:group><media:content url="u"/></media:group><o:x o:y="1"/></a>'
+        )
+        self.assertEqual(
+            element_data(root, compact_ns=True),
+            {
+                "media:group": {"media:content": {"@url": "u"}},
+                "{urn:other}x": {"@{urn:other}y": "1"},
+            },
+        )
+        rebuilt = ET.Element("a")
+        dict_append_etree(element_data(root, compact_ns=True), rebuilt)
+        self.assertEqual(element_data(rebuilt), element_data(root))
+
+    def test_deep(self):
+        root = ET.Element("a")
+        elem = root
+        for _ in range(5000):
+            elem = ET.SubElement(elem, "a")
+        data = element_data(root)
+        rebuilt = ET.Element("a")
+        dict_append_etree(data, rebuilt)
+        self.assertEqual(len(list(rebuilt.iter())), 5001)
+
+    def test_parse_compact(self):
+        feed = atom.parse_file("tests/martinfowler.atom", compact_ns=True)
+        self.assertIn("atom:author", feed._data)
+        self.assertEqual(
+            atom.parse_text(atom.generate(feed)), atom.parse_file("tests/martinfowler.atom")
+        )
+        feed = rss.parse_file("tests/wikipedia-rss.xml", compact_ns=True)
+        self.assertIn("dc:creator", feed.items[0]._data)
+
+
+if __name__ == "__main__":
+    unittest.main()
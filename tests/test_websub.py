@@ -0,0 +1,203 @@
+import io
+import unittest
+from urllib.parse import parse_qs, urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+try:
+    import requests
+except ModuleNotFoundError:
+    requests = None  # type: ignore
+
+from utils import LocalServer, QuietHandler
+
+import feedendum.atom as atom
+from feedendum.feed import Feed, FeedItem
+from feedendum.paging import ATOM_LINK
+from feedendum.websub import Subscriber, discover, signature, verify_signature
+
+
+def _feed(hub: str, topic: str, ids) -> Feed:
+    return Feed(
+        title="Topic",
+        url="https://example.org/",
+        items=[FeedItem(id=f"urn:{i}", title=f"Item {i}") for i in ids],
+        _data={ATOM_LINK: [{"@rel": "hub", "@href": hub}, {"@rel": "self", "@href": topic}]},
+    )
+
+
+class Hub:
+    """A stand-in hub: verifies the intents at once and pushes signed contents."""
+
+    def __init__(self):
+        self.subscribers: dict[tuple[str, str], str | None] = {}
+        self.requests: list[dict[str, str]] = []
+        self.topic_body = b""
+        hub = self
+
+        class Handler(QuietHandler):
+            def do_GET(self):  # noqa: N802
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(hub.topic_body)))
+                self.end_headers()
+                self.wfile.write(hub.topic_body)
+
+            def do_POST(self):  # noqa: N802
+                length = int(self.headers["Content-Length"])
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                hub.requests.append(form)
+                query = {
+                    "hub.mode": form["hub.mode"],
+                    "hub.topic": form["hub.topic"],
+                    "hub.challenge": "challenge-123",
+                    "hub.lease_seconds": "60",
+                }
+                r = requests.get(form["hub.callback"] + "?" + urlencode(query), timeout=5)
+                key = (form["hub.topic"], form["hub.callback"])
+                if r.status_code == 200 and r.text == "challenge-123":
+                    if form["hub.mode"] == "subscribe":
+                        hub.subscribers[key] = form.get("hub.secret")
+                    else:
+                        hub.subscribers.pop(key, None)
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.server = LocalServer(Handler)
+        self.url = self.server.url + "/"
+
+    def publish(self, topic: str, body: bytes, secret: str | None = None) -> list[int]:
+        result = []
+        for (subscribed, callback), key in list(self.subscribers.items()):
+            if subscribed != topic:
+                continue
+            headers = {"Content-Type": "application/atom+xml"}
+            if key or secret:
+                headers["X-Hub-Signature"] = signature(secret or key, body)
+            result.append(requests.post(callback, data=body, headers=headers).status_code)
+        return result
+
+    def close(self):
+        self.server.close()
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class WebSubTest(unittest.TestCase):
+    def test_discover(self):
+        feed = _feed("https://hub.example/", "https://example.org/feed", [])
+        self.assertEqual(discover(feed), (["https://hub.example/"], "https://example.org/feed"))
+        parsed = atom.parse_text(atom.generate(feed))
+        self.assertEqual(discover(parsed), (["https://hub.example/"], "https://example.org/feed"))
+        parsed = atom.parse_text(atom.generate(feed), compact_ns=True)
+        self.assertEqual(discover(parsed), (["https://hub.example/"], "https://example.org/feed"))
+        self.assertEqual(discover(Feed()), ([], None))
+
+    def test_signature(self):
+        header = signature("key", b"body")
+        self.assertTrue(header.startswith("sha256="))
+        self.assertTrue(verify_signature("key", b"body", header))
+        self.assertTrue(verify_signature("key", b"body", signature("key", b"body", "sha1")))
+        self.assertFalse(verify_signature("key", b"body!", header))
+        self.assertFalse(verify_signature("other", b"body", header))
+        self.assertFalse(verify_signature("key", b"body", None))
+        self.assertFalse(verify_signature("key", b"body", "md5=abc"))
+        self.assertFalse(verify_signature("key", b"body", "sha256=é"))
+
+
+@unittest.skipUnless(requests, "requests not available")
+class WebSubHubTest(unittest.TestCase):
+    def setUp(self):
+        self.hub = Hub()
+        self.delivered: list[tuple[str, list[str]]] = []
+        self.server = LocalServer(_QuietHandler, WSGIServer)
+        callback = self.server.url + "/websub"
+        self.subscriber = Subscriber(
+            callback,
+            lambda sub, items: self.delivered.append((sub.topic, [i.id for i in items])),
+            lease_seconds=60,
+            renew_margin=10,
+        )
+        self.server.server.set_app(self.subscriber)
+        self.topic = self.hub.url + "topic"
+
+    def tearDown(self):
+        self.server.close()
+        self.hub.close()
+
+    def test_end_to_end(self):
+        sub = self.subscriber.subscribe(_feed(self.hub.url, self.topic, [0, 1]))
+        self.assertEqual((sub.state, sub.hub, sub.topic), ("active", self.hub.url, self.topic))
+        self.assertGreater(sub.expires, 0)
+        self.assertEqual(self.hub.requests[0]["hub.secret"], sub.secret)
+        body = atom.generate_bytes(_feed(self.hub.url, self.topic, [0, 1, 2, 3]))
+        self.assertEqual(self.hub.publish(self.topic, body), [200])
+        self.assertEqual(self.delivered, [(self.topic, ["urn:2", "urn:3"])])
+        body = atom.generate_bytes(_feed(self.hub.url, self.topic, [2, 3, 4]))
+        self.hub.publish(self.topic, body)
+        self.assertEqual(self.delivered[1:], [(self.topic, ["urn:4"])])
+        self.hub.publish(self.topic, body)
+        self.assertEqual(len(self.delivered), 2)
+
+    def test_signature(self):
+        self.subscriber.subscribe(_feed(self.hub.url, self.topic, []))
+        body = atom.generate_bytes(_feed(self.hub.url, self.topic, [1]))
+        self.assertEqual(self.hub.publish(self.topic, body, secret="wrong"), [202])
+        self.assertEqual((self.delivered, self.subscriber.rejected), ([], 1))
+        sub = self.subscriber.subscribe(topic=self.topic + "/open", hub=self.hub.url, secret=False)
+        self.assertNotIn("hub.secret", self.hub.requests[-1])
+        self.hub.publish(sub.topic, body)
+        self.assertEqual(self.delivered, [(sub.topic, ["urn:1"])])
+
+    def test_renew_unsubscribe(self):
+        sub = self.subscriber.subscribe(_feed(self.hub.url, self.topic, []))
+        self.assertEqual(self.subscriber.renew(), [])
+        self.assertEqual(self.subscriber.renew(now=sub.expires - 5), [sub])
+        self.assertEqual([r["hub.mode"] for r in self.hub.requests], ["subscribe", "subscribe"])
+        self.subscriber.unsubscribe(sub)
+        self.assertEqual(sub.state, "unsubscribed")
+        self.assertNotIn(sub.id, self.subscriber.subscriptions)
+        self.assertEqual(self.hub.subscribers, {})
+
+    def test_verification(self):
+        sub = self.subscriber.subscribe(_feed(self.hub.url, self.topic, []))
+        query = {"hub.mode": "subscribe", "hub.topic": "other", "hub.challenge": "x"}
+        r = requests.get(sub.callback + "?" + urlencode(query))
+        self.assertEqual(r.status_code, 404)
+        query = {"hub.mode": "unsubscribe", "hub.topic": self.topic, "hub.challenge": "x"}
+        self.assertEqual(requests.get(sub.callback + "?" + urlencode(query)).status_code, 404)
+        self.assertEqual(requests.get(sub.callback + "x?hub.challenge=x").status_code, 404)
+        query = {"hub.mode": "denied", "hub.topic": self.topic, "hub.reason": "spam"}
+        self.assertEqual(requests.get(sub.callback + "?" + urlencode(query)).status_code, 200)
+        self.assertEqual((sub.state, sub.reason), ("denied", "spam"))
+        self.assertEqual(requests.post(sub.callback, data=b"<feed").status_code, 202)
+        headers = {"X-Hub-Signature": "sha256=é"}
+        r = requests.post(sub.callback, data=b"<feed", headers=headers)
+        self.assertEqual(r.status_code, 202)
+        query = {"hub.mode": "subscribe", "hub.topic": self.topic, "hub.challenge": "x"}
+        query["hub.lease_seconds"] = "²"
+        self.assertEqual(requests.get(sub.callback + "?" + urlencode(query)).status_code, 200)
+        self.assertEqual((sub.state, sub.expires), ("active", None))
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": "/websub/" + sub.id,
+            "CONTENT_LENGTH": "²",
+            "wsgi.input": io.BytesIO(b"<feed"),
+        }
+        self.subscriber(environ, lambda status, headers: None)
+        self.assertEqual(self.subscriber.rejected, 3)
+
+    def test_poll(self):
+        sub = self.subscriber.subscribe(topic=self.topic, hub=self.hub.url, secret=False)
+        self.hub.topic_body = atom.generate_bytes(_feed(self.hub.url, self.topic, [7, 8]))
+        self.assertEqual([i.id for i in self.subscriber.poll(sub)], ["urn:7", "urn:8"])
+        self.assertEqual(self.subscriber.poll(sub), [])
+        self.assertEqual(self.delivered, [(self.topic, ["urn:7", "urn:8"])])
+        r = requests.post(sub.callback, data=b"<feed")
+        self.assertEqual(r.status_code, 400)
+
+    def test_no_hub(self):
+        with self.assertRaises(ValueError):
+            self.subscriber.subscribe(Feed(url="https://example.org/"))
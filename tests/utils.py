@@ -1,3 +1,6 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import lxml.etree as ET
 
 
@@ -61,3 +64,29 @@ def _iso_formatting_workaround(e1: ET.Element, e2: ET.Element) -> bool:
 def _rss_guid_workaround(e1: ET.Element, e2: ET.Element) -> bool:
     # We don't write guid.isPermalink in RSS
     return e1.tag == "guid" and len(e1.attrib) == 1 and "isPermaLink" in e1.attrib
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """A request handler that does not log the requests."""
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """A HTTP server on a free local port, served by a background thread until `close`."""
+
+    def __init__(self, handler, server_class=ThreadingHTTPServer):
+        self.server = server_class(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()